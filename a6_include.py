@@ -103,11 +103,13 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash_code: int = None) -> None:
+        """Initialize node given a key, value and optionally the key's hash."""
         self.key = key
         self.value = value
         self.next = next
+        self.hash_code = hash_code
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -168,20 +170,22 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hash_code: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, hash_code)
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def remove(self, key: str, hash_code: int = None) -> bool:
         """
         Remove first node with matching key.
+        When hash_code is given, nodes with a different hash are skipped
+        without comparing keys.
         Return True if removal was successful, False otherwise.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash_code is None or node.hash_code == hash_code) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
@@ -192,11 +196,15 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash_code: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        When hash_code is given, nodes with a different hash are skipped
+        without comparing keys.
+        """
         node = self._head
         while node:
-            if node.key == key:
+            if (hash_code is None or node.hash_code == hash_code) and node.key == key:
                 return node
             node = node.next
         return node
@@ -210,10 +218,11 @@ class LinkedList:
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
+    def __init__(self, key: str, value: object, hash_code: int = None) -> None:
         """Initialize an entry for use in a hash map."""
         self.key = key
         self.value = value
+        self.hash_code = hash_code
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
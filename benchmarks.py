@@ -0,0 +1,503 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - Hashmap Implementation
+# Description: Micro-benchmarks for the HashMap implementations.
+# Run every benchmark with "python benchmarks.py", or pick some by name,
+# for example "python benchmarks.py primes".
+
+
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+
+import frequency_sketches
+import hash_map_array_chaining
+import hash_map_concurrent
+import hash_map_cuckoo
+import hash_map_open_addressing
+import hash_map_separate_chaining
+import hash_map_sharded
+import hash_map_swiss_table
+import parallel_frequency
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_functions import batch_hash, get_hash_function
+from primes import PRIME_LADDER, grow_capacity, next_prime
+from probing import PROBE_STRATEGIES
+
+
+def _timed(function, *args, repeat: int = 3) -> float:
+    """Return the best wall-clock time in seconds over several calls"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _trial_division_next_prime(capacity: int) -> int:
+    """The prime search both HashMaps used before the prime ladder"""
+
+    def is_prime(number: int) -> bool:
+        if number == 2 or number == 3:
+            return True
+        if number == 1 or number % 2 == 0:
+            return False
+        factor = 3
+        while factor ** 2 <= number:
+            if number % factor == 0:
+                return False
+            factor += 2
+        return True
+
+    if capacity % 2 == 0:
+        capacity += 1
+    while not is_prime(capacity):
+        capacity += 2
+    return capacity
+
+
+def bench_primes() -> None:
+    """Compare the capacity search done on every resize"""
+    print("\nPrime sizing: time to pick the capacity for a table growing past n slots")
+    print(f"{'n':>14} {'trial division':>16} {'miller-rabin':>14} {'ladder':>10}")
+    for exponent in range(3, 11):
+        slots = 10 ** exponent
+        old = _timed(_trial_division_next_prime, slots * 2, repeat=1)
+        new = _timed(next_prime, slots * 2)
+        ladder = _timed(grow_capacity, PRIME_LADDER[bisect_left(PRIME_LADDER, slots)])
+        print(f"{slots:>14} {old * 1e3:>13.3f} ms {new * 1e3:>11.3f} ms {ladder * 1e3:>7.3f} ms")
+
+
+def _put_loop(hash_map, pairs: list) -> None:
+    for key, value in pairs:
+        hash_map.put(key, value)
+
+
+def _get_loop(hash_map, keys: list) -> None:
+    for key in keys:
+        hash_map.get(key)
+
+
+def _contains_loop(hash_map, keys: list) -> None:
+    for key in keys:
+        hash_map.contains_key(key)
+
+
+def _remove_loop(hash_map, keys: list) -> None:
+    for key in keys:
+        hash_map.remove(key)
+
+
+def bench_batch(count: int = 10000) -> None:
+    """Compare the batch methods with the equivalent per-key loops"""
+    pairs = [('key' + str(i), i) for i in range(count)]
+    keys = [key for key, _ in pairs]
+
+    print(f"\nBatch operations on {count} keys")
+    print(f"{'map':>18} {'operation':>10} {'per-key loop':>14} {'batch':>10}")
+    for name, module in (('separate chaining', hash_map_separate_chaining),
+                         ('open addressing', hash_map_open_addressing)):
+
+        def fresh():
+            return module.HashMap(11, hash_function_2)
+
+        loop = _timed(lambda: _put_loop(fresh(), pairs))
+        batch = _timed(lambda: fresh().put_many(pairs))
+        print(f"{name:>18} {'put':>10} {loop * 1e3:>11.1f} ms {batch * 1e3:>7.1f} ms")
+
+        filled = fresh()
+        filled.put_many(pairs)
+        for operation, loop_function, batch_function in (
+                ('get', _get_loop, filled.get_many),
+                ('contains', _contains_loop, filled.contains_many)):
+            loop = _timed(loop_function, filled, keys)
+            batch = _timed(batch_function, keys)
+            print(f"{name:>18} {operation:>10} {loop * 1e3:>11.1f} ms {batch * 1e3:>7.1f} ms")
+
+        def remove_loop():
+            hash_map = fresh()
+            hash_map.put_many(pairs)
+            start = time.perf_counter()
+            _remove_loop(hash_map, keys)
+            return time.perf_counter() - start
+
+        def remove_batch():
+            hash_map = fresh()
+            hash_map.put_many(pairs)
+            start = time.perf_counter()
+            hash_map.remove_many(keys)
+            return time.perf_counter() - start
+
+        loop, batch = remove_loop(), remove_batch()
+        print(f"{name:>18} {'remove':>10} {loop * 1e3:>11.1f} ms {batch * 1e3:>7.1f} ms")
+
+
+def bench_hashing(count: int = 200000) -> None:
+    """Compare scalar and vectorized hashing of a batch of string keys"""
+    keys = ['user-session-' + str(i * 7919) for i in range(count)]
+
+    print(f"\nHashing {count} keys")
+    print(f"{'function':>16} {'scalar':>10} {'batch':>10}")
+    for function in (hash_function_1, hash_function_2):
+        scalar = _timed(lambda: [function(key) for key in keys])
+        if batch_hash(function, keys[:1]) is None:
+            print(f"{function.__name__:>16} {scalar * 1e3:>7.1f} ms {'n/a (no NumPy)':>10}")
+            continue
+        batch = _timed(batch_hash, function, keys)
+        print(f"{function.__name__:>16} {scalar * 1e3:>7.1f} ms {batch * 1e3:>7.1f} ms")
+
+    # One long key must not pad every short key to its length
+    keys = keys[:2000] + ['x' * 20000]
+    print("\nHashing 2000 short keys and one 20000-character key")
+    print(f"{'function':>16} {'scalar':>10} {'batch':>10} {'batch peak':>12}")
+    for function in (hash_function_1, hash_function_2):
+        if batch_hash(function, keys[:1]) is None:
+            continue
+        scalar = _timed(lambda: [function(key) for key in keys])
+        batch = _timed(batch_hash, function, keys)
+        peak = _peak_memory(batch_hash, function, keys)
+        print(f"{function.__name__:>16} {scalar * 1e3:>7.1f} ms {batch * 1e3:>7.1f} ms {peak / 2 ** 20:>9.1f} MB")
+
+
+def bench_incremental(count: int = 100000) -> None:
+    """Compare the slowest single put with all-at-once and incremental resizing"""
+    keys = [str(i * 7919) for i in range(count)]
+
+    print(f"\nSlowest put while inserting {count} keys")
+    print(f"{'map':>18} {'all at once':>12} {'incremental':>12}")
+    for name, module in (('separate chaining', hash_map_separate_chaining),
+                         ('open addressing', hash_map_open_addressing)):
+        worst = []
+        for incremental in (False, True):
+            hash_map = module.HashMap(11, hash_function_2, incremental_resize=incremental)
+            slowest = 0.0
+            for key in keys:
+                start = time.perf_counter()
+                hash_map.put(key, None)
+                slowest = max(slowest, time.perf_counter() - start)
+            worst.append(slowest)
+        print(f"{name:>18} {worst[0] * 1e3:>9.2f} ms {worst[1] * 1e3:>9.2f} ms")
+
+
+def bench_probing(capacity: int = 16384) -> None:
+    """Compare probe strategies on a table filled to several load factors"""
+    hash_function = get_hash_function('builtin', seed=2022)
+    misses = ['absent' + str(i) for i in range(capacity // 4)]
+
+    print(f"\nProbe strategies on about {capacity} slots, without resizing")
+    print(f"{'strategy':>12} {'load':>5} {'put':>9} {'get hit':>9} {'get miss':>9} "
+          f"{'mean probe':>11} {'max probe':>10}")
+    for name in PROBE_STRATEGIES:
+        for robin_hood in (False, True) if name == 'linear' else (False,):
+            label = 'robin hood' if robin_hood else name
+            for load in (0.25, 0.5, 0.75, 0.9):
+
+                # Build a map whose capacity and max_load leave room for
+                # every key, so the timings never include a resize
+                try:
+                    hash_map = hash_map_open_addressing.HashMap(
+                        capacity, hash_function, max_load=0.5 if load <= 0.5 else 0.95,
+                        robin_hood=robin_hood, probing=name)
+                except ValueError:
+                    print(f"{label:>12} {load:>5} {'n/a':>9}")
+                    continue
+                count = int(hash_map.get_capacity() * load) - 1
+                keys = ['key' + str(i * 7919) for i in range(count)]
+
+                put = _timed(_put_loop, hash_map, [(key, None) for key in keys], repeat=1)
+                hit = _timed(_get_loop, hash_map, keys)
+                miss = _timed(_get_loop, hash_map, misses)
+                lengths = [hash_map.probe_length(key) for key in keys]
+                per_key = 1e6 / count
+                print(f"{label:>12} {load:>5} {put * per_key:>6.2f} us {hit * per_key:>6.2f} us "
+                      f"{miss * 1e6 / len(misses):>6.2f} us {sum(lengths) / count:>11.2f} {max(lengths):>10}")
+
+
+def bench_power_of_two(count: int = 100000) -> None:
+    """Compare prime capacities indexed by remainder with power-of-two
+    capacities indexed by bit mask"""
+    hash_function = get_hash_function('builtin', seed=2022)
+    pairs = [('key' + str(i * 7919), i) for i in range(count)]
+    keys = [key for key, _ in pairs]
+
+    print(f"\nPrime and power-of-two capacities, {count} keys")
+    print(f"{'map':>18} {'capacity':>12} {'put':>10} {'get':>10} {'final size':>11}")
+    for name, module in (('separate chaining', hash_map_separate_chaining),
+                         ('open addressing', hash_map_open_addressing)):
+        for power_of_two in (False, True):
+            hash_map = module.HashMap(11, hash_function, power_of_two=power_of_two)
+            put = _timed(_put_loop, hash_map, pairs, repeat=1)
+            get = _timed(_get_loop, hash_map, keys)
+            label = 'power of two' if power_of_two else 'prime'
+            print(f"{name:>18} {label:>12} {put * 1e3:>7.1f} ms {get * 1e3:>7.1f} ms "
+                  f"{hash_map.get_capacity():>11}")
+
+
+class _CountingKey(str):
+    """String key that counts how often it is compared for equality"""
+    comparisons = 0
+
+    def __eq__(self, other) -> bool:
+        _CountingKey.comparisons += 1
+        return str.__eq__(self, other)
+
+    __hash__ = str.__hash__
+
+
+def bench_swiss(count: int = 50000) -> None:
+    """Compare quadratic probing with the SwissTable map on long string keys"""
+    hash_function = get_hash_function('builtin', seed=2022)
+    prefix = 'https://example.com/' + 'a' * 200 + '/'
+    keys = [_CountingKey(prefix + str(i)) for i in range(count)]
+    misses = [_CountingKey(prefix + 'x' + str(i)) for i in range(count)]
+
+    print(f"\nLong string keys ({len(prefix)}+ characters), {count} keys")
+    print(f"{'map':>16} {'get hit':>10} {'get miss':>10} {'key compares per get':>22}")
+    for name, hash_map in (
+            ('quadratic', hash_map_open_addressing.HashMap(11, hash_function)),
+            ('swiss table', hash_map_swiss_table.HashMap(16, hash_function))):
+        hash_map.put_many((key, None) for key in keys)
+        hit = _timed(_get_loop, hash_map, keys)
+        miss = _timed(_get_loop, hash_map, misses)
+
+        _CountingKey.comparisons = 0
+        _get_loop(hash_map, keys)
+        _get_loop(hash_map, misses)
+        compares = _CountingKey.comparisons / (2 * count)
+        print(f"{name:>16} {hit * 1e3:>7.1f} ms {miss * 1e3:>7.1f} ms {compares:>22.3f}")
+
+
+def bench_cuckoo(count: int = 50000) -> None:
+    """Compare the lookup tail of probing maps with the cuckoo map"""
+    hash_function = get_hash_function('builtin', seed=2022)
+    keys = ['key' + str(i * 7919) for i in range(count)]
+    misses = ['absent' + str(i) for i in range(count)]
+
+    print(f"\nLookup tail with {count} keys")
+    print(f"{'map':>16} {'load':>5} {'get hit':>10} {'get miss':>10} {'mean probe':>11} {'max probe':>10}")
+    for name, hash_map in (
+            ('quadratic', hash_map_open_addressing.HashMap(11, hash_function)),
+            ('robin hood', hash_map_open_addressing.HashMap(11, hash_function, max_load=0.9, robin_hood=True)),
+            ('cuckoo', hash_map_cuckoo.HashMap(11, hash_function, max_load=0.9))):
+        hash_map.put_many((key, None) for key in keys)
+        hit = _timed(_get_loop, hash_map, keys)
+        miss = _timed(_get_loop, hash_map, misses)
+        lengths = [hash_map.probe_length(key) for key in keys]
+        print(f"{name:>16} {hash_map.table_load():>5.2f} {hit * 1e3:>7.1f} ms {miss * 1e3:>7.1f} ms "
+              f"{sum(lengths) / count:>11.2f} {max(lengths):>10}")
+
+
+def bench_chaining(count: int = 100000) -> None:
+    """Compare linked list buckets with flat list buckets"""
+    hash_function = get_hash_function('builtin', seed=2022)
+    pairs = [('key' + str(i * 7919), i) for i in range(count)]
+    keys = [key for key, _ in pairs]
+
+    print(f"\nChaining with {count} keys")
+    print(f"{'buckets':>12} {'create':>10} {'put':>10} {'get':>10} {'contains':>10} {'items':>10}")
+    for name, module in (('linked list', hash_map_separate_chaining),
+                         ('flat list', hash_map_array_chaining)):
+        create = _timed(module.HashMap, count * 2, hash_function)
+        hash_map = module.HashMap(11, hash_function)
+        put = _timed(_put_loop, hash_map, pairs, repeat=1)
+        get = _timed(_get_loop, hash_map, keys)
+        contains = _timed(_contains_loop, hash_map, keys)
+        items = _timed(hash_map.get_keys_and_values)
+        print(f"{name:>12} {create * 1e3:>7.1f} ms {put * 1e3:>7.1f} ms {get * 1e3:>7.1f} ms "
+              f"{contains * 1e3:>7.1f} ms {items * 1e3:>7.1f} ms")
+
+
+def _peak_memory(function, *args) -> int:
+    """Return the peak number of bytes allocated while function runs"""
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _walk_items(hash_map) -> None:
+    for _ in hash_map.items():
+        pass
+
+
+def bench_iteration(count: int = 200000) -> None:
+    """Compare copying the contents with get_keys_and_values and streaming them with items"""
+    pairs = [('key' + str(i), i) for i in range(count)]
+
+    print(f"\nWalking {count} entries")
+    print(f"{'map':>18} {'method':>20} {'time':>10} {'peak memory':>12}")
+    for name, module in (('separate chaining', hash_map_separate_chaining),
+                         ('open addressing', hash_map_open_addressing)):
+        hash_map = module.HashMap(11, hash_function_2)
+        hash_map.put_many(pairs)
+        for method, function in (('get_keys_and_values', hash_map.get_keys_and_values),
+                                 ('items', lambda: _walk_items(hash_map))):
+            elapsed = _timed(function)
+            peak = _peak_memory(function)
+            print(f"{name:>18} {method:>20} {elapsed * 1e3:>7.1f} ms {peak / 1024:>9.1f} KiB")
+
+
+def _clickstream(count: int):
+    """Yield page ids: a few popular pages and a long tail"""
+    for i in range(count):
+        yield 'page' + str(i % 7 if i % 5 == 0 else i * 7919 % 1000003)
+
+
+def bench_mode(count: int = 200000) -> None:
+    """Compare exact find_mode with the streaming and approximate versions"""
+    print(f"\nMode of {count} page ids")
+    print(f"{'method':>18} {'time':>10} {'peak memory':>12} {'frequency':>10}")
+    for name, function in (
+            ('find_mode', lambda: hash_map_separate_chaining.find_mode(DynamicArray(list(_clickstream(count))))),
+            ('find_mode_stream', lambda: hash_map_separate_chaining.find_mode_stream(_clickstream(count))),
+            ('  builtin hash', lambda: hash_map_separate_chaining.find_mode_stream(
+                _clickstream(count), get_hash_function('builtin'))),
+            ('approximate_mode', lambda: frequency_sketches.approximate_mode(_clickstream(count), counters=256))):
+        elapsed = _timed(function, repeat=1)
+        peak = _peak_memory(function)
+        print(f"{name:>18} {elapsed * 1e3:>7.1f} ms {peak / 1024:>9.1f} KiB {function()[1]:>10}")
+
+
+def bench_parallel(count: int = 400000) -> None:
+    """Compare serial find_mode with parallel_find_mode on 1, 2, 4, ... processes"""
+    elements = list(_clickstream(count))
+    serial = _timed(lambda: hash_map_separate_chaining.find_mode(DynamicArray(elements)), repeat=1)
+
+    print(f"\nMode of {count} page ids on {os.cpu_count()} CPUs")
+    print(f"{'method':>20} {'time':>10} {'speedup':>8}")
+    print(f"{'find_mode':>20} {serial * 1e3:>7.1f} ms {1:>7.2f}x")
+    workers = 1
+    while workers <= max(os.cpu_count() or 1, 2):
+        elapsed = _timed(parallel_frequency.parallel_find_mode, elements, workers, repeat=1)
+        print(f"{'parallel, ' + str(workers) + ' workers':>20} {elapsed * 1e3:>7.1f} ms {serial / elapsed:>7.2f}x")
+        workers *= 2
+
+
+def _copy_loop(destination, source) -> None:
+    pairs = source.get_keys_and_values()
+    for i in range(pairs.length()):
+        key, value = pairs[i]
+        destination.put(key, value)
+
+
+def bench_update(count: int = 100000) -> None:
+    """Compare copying a map pair by pair with update, with shared and different hash functions"""
+    pairs = [('key' + str(i * 7919), i) for i in range(count)]
+
+    print(f"\nMerging a map of {count} keys into an empty map")
+    print(f"{'map':>18} {'source hash':>12} {'put loop':>10} {'update':>10}")
+    for name, module in (('separate chaining', hash_map_separate_chaining),
+                         ('open addressing', hash_map_open_addressing)):
+        function = get_hash_function('builtin', seed=1)
+        source = module.HashMap(11, function)
+        source.put_many(pairs)
+        for source_name, function in (('same', function), ('different', get_hash_function('builtin', seed=2))):
+            loop = _timed(lambda: _copy_loop(module.HashMap(11, function), source), repeat=1)
+            update = _timed(lambda: module.HashMap(11, function).update(source), repeat=1)
+            print(f"{name:>18} {source_name:>12} {loop * 1e3:>7.1f} ms {update * 1e3:>7.1f} ms")
+
+
+class _GlobalLockMap:
+    """A HashMap behind one lock, the usual way to share a HashMap between threads"""
+
+    def __init__(self, hash_map) -> None:
+        self._map = hash_map
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> object:
+        with self._lock:
+            return self._map.get(key)
+
+    def put(self, key: str, value: object) -> None:
+        with self._lock:
+            self._map.put(key, value)
+
+
+def _mixed_workload(hash_map, keys: list, operations: int, seed: int) -> None:
+    """Nine gets for every put, on random keys"""
+    rng = random.Random(seed)
+    get, put = hash_map.get, hash_map.put
+    for _ in range(operations):
+        key = keys[rng.randrange(len(keys))]
+        if rng.random() < 0.1:
+            put(key, seed)
+        else:
+            get(key)
+
+
+def bench_concurrent(operations: int = 200000) -> None:
+    """Compare a HashMap behind a global lock with ConcurrentHashMap on 1, 2, 4 and 8 threads"""
+    function = get_hash_function('builtin', seed=2022)
+    keys = ['key' + str(i * 7919) for i in range(10000)]
+
+    print(f"\n{operations} mixed operations split over threads, on {os.cpu_count()} CPUs")
+    print(f"{'map':>18} {'threads':>8} {'ops/s':>10}")
+    for name, make in (('global lock', lambda: _GlobalLockMap(hash_map_separate_chaining.HashMap(11, function))),
+                       ('concurrent', lambda: hash_map_concurrent.ConcurrentHashMap(11, function))):
+        for count in (1, 2, 4, 8):
+            hash_map = make()
+            for key in keys:
+                hash_map.put(key, 0)
+            threads = [threading.Thread(target=_mixed_workload, args=(hash_map, keys, operations // count, seed))
+                       for seed in range(count)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            print(f"{name:>18} {count:>8} {operations / elapsed:>10.0f}")
+
+
+def bench_sharded(count: int = 200000) -> None:
+    """Compare one HashMap with ShardedHashMap: slowest put, total put time and batch put time.
+    Threads only change put_many, and only help where the shards' work releases the GIL."""
+    function = get_hash_function('builtin', seed=2022)
+    pairs = [('key' + str(i * 7919), i) for i in range(count)]
+
+    print(f"\nInserting {count} keys")
+    print(f"{'map':>20} {'slowest put':>12} {'put loop':>10} {'put_many':>10}")
+    for name, make in (('single map', lambda: hash_map_separate_chaining.HashMap(11, function)),
+                       ('8 shards', lambda: hash_map_sharded.ShardedHashMap(8, capacity=11, function=function)),
+                       ('8 shards, 4 threads', lambda: hash_map_sharded.ShardedHashMap(8, capacity=11, function=function,
+                                                                                     workers=4))):
+        hash_map = make()
+        slowest = 0.0
+        start = time.perf_counter()
+        for key, value in pairs:
+            put_start = time.perf_counter()
+            hash_map.put(key, value)
+            slowest = max(slowest, time.perf_counter() - put_start)
+        loop = time.perf_counter() - start
+        batch = _timed(lambda: make().put_many(pairs), repeat=1)
+        print(f"{name:>20} {slowest * 1e3:>9.2f} ms {loop * 1e3:>7.1f} ms {batch * 1e3:>7.1f} ms")
+
+
+BENCHMARKS = {
+    'primes': bench_primes,
+    'batch': bench_batch,
+    'hashing': bench_hashing,
+    'incremental': bench_incremental,
+    'probing': bench_probing,
+    'power_of_two': bench_power_of_two,
+    'swiss': bench_swiss,
+    'cuckoo': bench_cuckoo,
+    'chaining': bench_chaining,
+    'iteration': bench_iteration,
+    'mode': bench_mode,
+    'parallel': bench_parallel,
+    'update': bench_update,
+    'concurrent': bench_concurrent,
+    'sharded': bench_sharded,
+}
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
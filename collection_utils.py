@@ -0,0 +1,23 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - Hashmap Implementation
+# Description: Helpers that let the batch methods, iteration and mode finding
+# accept a DynamicArray or any other iterable alike.
+
+
+from a6_include import DynamicArray
+
+
+def as_list(items) -> list:
+    """Return the elements of a DynamicArray or any other iterable as a list."""
+    if isinstance(items, DynamicArray):
+        return [items.get_at_index(i) for i in range(items.length())]
+    if isinstance(items, list):
+        return items
+    return list(items)
+
+
+def iter_items(items):
+    """Return an iterator over a DynamicArray or any other iterable without copying it."""
+    if isinstance(items, DynamicArray):
+        return (items.get_at_index(i) for i in range(items.length()))
+    return iter(items)
@@ -0,0 +1,250 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - Hashmap Implementation
+# Description: Fixed-memory frequency counting for streams too large to count
+# exactly. MisraGries keeps at most k counters and undercounts each key by a
+# known amount, CountMinSketch keeps a depth x width grid of counters and
+# overcounts each key by at most e * n / width with probability
+# 1 - e^-depth. approximate_mode combines the two: Misra-Gries picks the
+# candidates and Count-Min tightens their counts from above.
+
+
+from math import ceil, e
+
+from a6_include import DynamicArray
+from collection_utils import iter_items
+from hash_functions import fibonacci_mix, get_hash_function
+from hash_map_separate_chaining import HashMap
+
+
+class MisraGries:
+    """
+    Heavy hitter summary keeping at most `counters` keys. Any key seen in
+    more than n / (counters + 1) of n elements is guaranteed to be kept.
+    A kept count is never more than the true count and never less than the
+    true count minus error_bound().
+    """
+
+    def __init__(self, counters: int = 1024, function: callable = None) -> None:
+        """
+        :param counters: int of keys kept at once, the memory cap
+        :param function: hash function for the counter HashMap,
+                         defaults to the seeded built-in hash
+        """
+        if counters < 1:
+            raise ValueError("counters must be at least 1")
+
+        self._counters = counters
+        self._counts = HashMap(counters * 2, function or get_hash_function('builtin'))
+        self._total = 0
+
+        # Each decrement round lowers every kept count by one, so the number
+        # of rounds bounds how far any count can fall behind
+        self._decrements = 0
+
+    def add(self, key: object) -> None:
+        """
+        Count one occurrence of key
+        :param key: hashable element of the stream
+        """
+        self._total += 1
+        counts = self._counts
+
+        count = counts.get(key)
+        if count is not None:
+            counts.put(key, count + 1)
+        elif counts.get_size() < self._counters:
+            counts.put(key, 1)
+
+        # No free counter: drop one from every key instead, which costs at
+        # most one decrement per earlier increment
+        else:
+            self._decrements += 1
+            for kept_key, kept_count in list(counts.items()):
+                if kept_count == 1:
+                    counts.remove(kept_key)
+                else:
+                    counts.put(kept_key, kept_count - 1)
+
+    def estimate(self, key: object) -> int:
+        """
+        Return the kept count of key, a lower bound on its true count
+        :param key: key to look up
+        :return: int of count, 0 if key is not kept
+        """
+        return self._counts.get(key) or 0
+
+    def error_bound(self) -> int:
+        """Return the most any key can be undercounted by"""
+        return self._decrements
+
+    def items(self):
+        """
+        Return a generator over the kept (key, count) pairs
+        :return: generator of tuples
+        """
+        return self._counts.items()
+
+    def total(self) -> int:
+        """Return the number of elements counted"""
+        return self._total
+
+
+class CountMinSketch:
+    """
+    Grid of depth rows of width counters. Each key adds to one counter per
+    row and its estimate is the smallest of them, so it is never below the
+    true count and, with probability 1 - e^-depth, at most
+    e * total / width above it.
+    """
+
+    def __init__(self, width: int = 4096, depth: int = 4, function: callable = None) -> None:
+        """
+        :param width: int of counters per row
+        :param depth: int of rows
+        :param function: hash function applied to keys,
+                         defaults to the seeded built-in hash
+        """
+        if width < 1 or depth < 1:
+            raise ValueError("width and depth must be at least 1")
+
+        self._width = width
+        self._depth = depth
+        self._function = function or get_hash_function('builtin')
+        self._rows = [[0] * width for _ in range(depth)]
+        self._total = 0
+
+    def _indices(self, key: object):
+        """
+        Return the counter index of key in each row. Two hashes derived from
+        one call of the hash function give every row its own index.
+        :param key: hashable key
+        :return: generator of int indices, one per row
+        """
+        hashed = self._function(key)
+        first = fibonacci_mix(hashed)
+        second = fibonacci_mix(hashed ^ first) | 1
+        width = self._width
+        return ((first + row * second) % width for row in range(self._depth))
+
+    def add(self, key: object, count: int = 1) -> None:
+        """
+        Count occurrences of key
+        :param key: hashable element of the stream
+        :param count: int of occurrences to add
+        """
+        self._total += count
+        for row, index in zip(self._rows, self._indices(key)):
+            row[index] += count
+
+    def estimate(self, key: object) -> int:
+        """
+        Return the estimated count of key, an upper bound on its true count
+        with high probability
+        :param key: key to look up
+        :return: int of count
+        """
+        return min(row[index] for row, index in zip(self._rows, self._indices(key)))
+
+    def error_bound(self) -> int:
+        """Return the most an estimate exceeds the true count, with probability 1 - e^-depth"""
+        return ceil(e * self._total / self._width)
+
+
+def approximate_mode(iterable, counters: int = 1024, width: int = 4096, depth: int = 4,
+                     function: callable = None) -> (DynamicArray, int, int):
+    """
+    Find the mode of a stream in one pass and fixed memory: counters keys
+    plus width * depth ints, however many distinct elements the stream has.
+    The mode is found whenever it makes up more than 1 / (counters + 1) of
+    the stream.
+    :param iterable: DynamicArray, list, generator or any other iterable
+    :param counters: int of Misra-Gries counters
+    :param width: int of Count-Min counters per row
+    :param depth: int of Count-Min rows
+    :param function: hash function for both sketches
+    :return: tuple of (dynamic array with the modes, int upper bound on their
+             frequency, int error): each mode occurs between frequency - error
+             and frequency times
+    """
+    heavy_hitters = MisraGries(counters, function)
+    sketch = CountMinSketch(width, depth, function)
+    for key in iter_items(iterable):
+        heavy_hitters.add(key)
+        sketch.add(key)
+
+    # Count-Min never undercounts, and neither does a kept count plus the
+    # Misra-Gries error; rank the candidates by the tighter of the two
+    modes = DynamicArray()
+    mode_freq, lowest = 0, 0
+    mg_error = heavy_hitters.error_bound()
+    for key, count in heavy_hitters.items():
+        upper = min(sketch.estimate(key), count + mg_error)
+        if upper > mode_freq:
+            modes = DynamicArray([key])
+            mode_freq, lowest = upper, count
+        elif upper == mode_freq:
+            modes.append(key)
+            lowest = min(lowest, count)
+
+    return modes, mode_freq, mode_freq - lowest
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nMisra-Gries example")
+    print("-------------------")
+    summary = MisraGries(3)
+    for key in "abacabadabacabae":
+        summary.add(key)
+    print(sorted(summary.items()), summary.error_bound(), summary.total())
+
+    print("\nCount-Min example")
+    print("-----------------")
+    sketch = CountMinSketch(64, 4)
+    for i in range(1000):
+        sketch.add('key' + str(i % 50))
+    print(sketch.estimate('key7'), sketch.estimate('absent'), sketch.error_bound())
+
+    print("\napproximate_mode example")
+    print("------------------------")
+
+    def clickstream(length: int, seed: int):
+        """Yield page ids with a few popular pages and a long tail"""
+        import random
+        rng = random.Random(seed)
+        for _ in range(length):
+            if rng.random() < 0.2:
+                yield 'page' + str(rng.randint(0, 4))
+            else:
+                yield 'page' + str(rng.randint(5, 100000))
+
+    mode, frequency, error = approximate_mode(clickstream(100000, 1), counters=64, width=1024)
+    print(f"Mode : {mode}, Frequency: {frequency} (at least {frequency - error})")
+
+    print("\nRandomized bounds check")
+    print("-----------------------")
+    import random
+    from collections import Counter
+    for seed in range(20):
+        rng = random.Random(seed)
+        stream = [rng.choice('abcdefghij') * rng.randint(1, 3) if rng.random() < 0.5
+                  else str(rng.randint(0, 2000)) for _ in range(rng.randint(0, 5000))]
+        exact = Counter(stream)
+        summary = MisraGries(rng.choice([1, 8, 32]))
+        sketch = CountMinSketch(rng.choice([16, 256]), rng.choice([1, 4]))
+        for key in stream:
+            summary.add(key)
+            sketch.add(key)
+
+        # Misra-Gries is exact within its bound, Count-Min never undercounts
+        result = all(exact[key] - summary.error_bound() <= count <= exact[key]
+                     for key, count in summary.items())
+        result &= all(sketch.estimate(key) >= count for key, count in exact.items())
+        mode, frequency, error = approximate_mode(stream, counters=32)
+        # A mode making up more than 1/33 of the stream is always a candidate
+        result &= all(frequency - error <= exact[mode[i]] <= frequency for i in range(mode.length()))
+        if exact and max(exact.values()) > len(stream) / 33:
+            result &= frequency >= max(exact.values())
+        print(seed, result)
@@ -0,0 +1,204 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - Hashmap Implementation
+# Description: Diagnostics for choosing a hash function. hash_distribution
+# inserts a sample of keys into a HashMap and reports how the keys spread
+# over the buckets: an occupancy histogram, the longest chain and the
+# distribution of probe lengths needed to find each key again.
+# HashMapStats holds the counters the HashMaps maintain for cheap polling.
+
+
+from a6_include import DynamicArray
+from collection_utils import as_list
+from hash_functions import HASH_FUNCTIONS, get_hash_function
+
+
+def _histogram(counts: list) -> DynamicArray:
+    """
+    Turn a list of counts into a histogram
+    :param counts: list of non-negative ints
+    :return: DynamicArray where index k holds how many counts equal k
+    """
+    histogram = [0] * (max(counts, default=0) + 1)
+    for count in counts:
+        histogram[count] += 1
+    return DynamicArray(histogram)
+
+
+class HashDistributionReport:
+    """
+    Layout of the keys in a HashMap
+    occupancy: index k holds the number of buckets that k keys hash to
+    probe_lengths: index k holds the number of keys found after examining
+    k slots (open addressing) or k chain nodes (separate chaining)
+    """
+
+    def __init__(self, capacity: int, size: int,
+                 occupancy: DynamicArray, probe_lengths: DynamicArray) -> None:
+        """Initialize report from the two histograms"""
+        self.capacity = capacity
+        self.size = size
+        self.occupancy = occupancy
+        self.probe_lengths = probe_lengths
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output"""
+        return (f"size {self.size}, capacity {self.capacity}, "
+                f"empty buckets {self.occupancy[0]}, "
+                f"max chain {self.max_chain_length()}, "
+                f"max probe {self.max_probe_length()}, "
+                f"mean probe {round(self.mean_probe_length(), 2)}")
+
+    def max_chain_length(self) -> int:
+        """Return the largest number of keys sharing one home bucket"""
+        return self.occupancy.length() - 1
+
+    def max_probe_length(self) -> int:
+        """Return the most slots examined to find any one key"""
+        return self.probe_lengths.length() - 1
+
+    def mean_probe_length(self) -> float:
+        """Return the average number of slots examined to find a key"""
+        if self.size == 0:
+            return 0.0
+        total = 0
+        for length in range(self.probe_lengths.length()):
+            total += length * self.probe_lengths[length]
+        return total / self.size
+
+
+class HashMapStats:
+    """
+    Counters a HashMap keeps up to date as it changes, so reading them
+    costs O(1) however large the table is
+    capacity: int of buckets in the current table
+    size: int of live entries
+    empty_buckets: int of empty buckets in the current table
+    tombstones: int of removed entries still occupying a slot,
+    None for separate chaining
+    max_probe_length: longest probe sequence seen since the table was last
+    rebuilt (open addressing), None for separate chaining
+    max_chain_length: longest chain seen since the table was last rebuilt
+    (separate chaining), None for open addressing
+    Removals do not lower the two maxima, so they are upper bounds.
+    """
+
+    def __init__(self, capacity: int, size: int, empty_buckets: int,
+                 tombstones: int = None, max_probe_length: int = None,
+                 max_chain_length: int = None) -> None:
+        """Initialize statistics from the map's counters"""
+        self.capacity = capacity
+        self.size = size
+        self.empty_buckets = empty_buckets
+        self.tombstones = tombstones
+        self.max_probe_length = max_probe_length
+        self.max_chain_length = max_chain_length
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output"""
+        out = f"size {self.size}, capacity {self.capacity}, empty buckets {self.empty_buckets}"
+        if self.tombstones is not None:
+            out += f", tombstones {self.tombstones}"
+        if self.max_probe_length is not None:
+            out += f", max probe {self.max_probe_length}"
+        if self.max_chain_length is not None:
+            out += f", max chain {self.max_chain_length}"
+        return out
+
+    def table_load(self) -> float:
+        """Return the load factor the counters describe"""
+        return self.size / self.capacity
+
+
+def _chaining_layout(hash_map) -> (list, list):
+    """
+    Measure a separate chaining HashMap
+    :return: tuple of (keys per bucket, nodes walked per key)
+    """
+    buckets = hash_map.get_buckets()
+    occupancy, probe_lengths = [], []
+    for index in range(buckets.length()):
+        position = 0
+
+        # Buckets that were never used may be None
+        for _ in buckets[index] or ():
+            position += 1
+            probe_lengths.append(position)
+        occupancy.append(position)
+    return occupancy, probe_lengths
+
+
+def _open_addressing_layout(hash_map) -> (list, list):
+    """
+    Measure an open addressing HashMap
+    :return: tuple of (keys per home bucket, slots probed per key)
+    """
+    array = hash_map.get_array()
+    capacity = array.length()
+    occupancy, probe_lengths = [0] * capacity, []
+
+    for index in range(capacity):
+        entry = array[index]
+        if entry is None or entry.is_tombstone:
+            continue
+
+        home = hash_map.get_hash(entry.key) % capacity
+        occupancy[home] += 1
+        probe_lengths.append(hash_map.probe_length(entry.key))
+
+    return occupancy, probe_lengths
+
+
+def hash_distribution(hash_map, keys) -> HashDistributionReport:
+    """
+    Put every sample key into hash_map, then report the layout of the map
+    :param hash_map: separate chaining or open addressing HashMap,
+                     normally empty
+    :param keys: DynamicArray or iterable of sample keys
+    :return: HashDistributionReport
+    """
+    hash_map.put_many((key, None) for key in as_list(keys))
+
+    if hasattr(hash_map, 'get_buckets'):
+        occupancy, probe_lengths = _chaining_layout(hash_map)
+    else:
+        occupancy, probe_lengths = _open_addressing_layout(hash_map)
+
+    return HashDistributionReport(hash_map.get_capacity(), hash_map.get_size(),
+                                  _histogram(occupancy), _histogram(probe_lengths))
+
+
+def compare_hash_functions(map_class, capacity: int, keys, names=None, seed: int = 0) -> DynamicArray:
+    """
+    Report the distribution of the same keys under several hash functions
+    :param map_class: HashMap class taking (capacity, function)
+    :param capacity: int of initial capacity for each map
+    :param keys: DynamicArray or iterable of sample keys
+    :param names: names of registered hash functions, defaults to all
+    :param seed: int seed for the seeded functions
+    :return: DynamicArray of (name, HashDistributionReport) tuples
+    """
+    keys = as_list(keys)
+    reports = DynamicArray()
+    for name in names or HASH_FUNCTIONS:
+        hash_map = map_class(capacity, get_hash_function(name, seed))
+        reports.append((name, hash_distribution(hash_map, keys)))
+    return reports
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    import hash_map_open_addressing
+    import hash_map_separate_chaining
+
+    keys = ['str' + str(i) for i in range(2000)]
+
+    for title, module in (("separate chaining", hash_map_separate_chaining),
+                          ("open addressing", hash_map_open_addressing)):
+        print(f"\n{title}")
+        print("-" * len(title))
+        reports = compare_hash_functions(module.HashMap, 53, keys, seed=2022)
+        for i in range(reports.length()):
+            name, report = reports[i]
+            print(f"{name:>16}: {report}")
@@ -0,0 +1,289 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - Hashmap Implementation
+# Description: Hash functions for the HashMaps. A registry maps names to
+# factories for stronger alternatives to the sample hash functions (FNV-1a,
+# SipHash-2-4 and Python's built-in hash, the latter two seeded).
+# Batch versions of the sample hash functions hash a whole batch of string
+# keys in one NumPy pass and give the same results as calling
+# hash_function_1 / hash_function_2 on each key. NumPy is optional; without
+# it batch_hash returns None and callers fall back to the scalar functions.
+# fibonacci_mix spreads a hash over all 64 bits for tables indexed by bit mask.
+
+
+from a6_include import hash_function_1, hash_function_2
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Keys are hashed in chunks of at most this many padded code points. A batch
+# whose lengths vary widely is split by length first, so one long key never
+# widens the rows of short ones.
+_CHUNK_CODE_POINTS = 1 << 20
+
+_MASK_64 = (1 << 64) - 1
+
+# 2^64 divided by the golden ratio, rounded to an odd number
+_FIBONACCI = 0x9e3779b97f4a7c15
+
+_FNV_OFFSET_BASIS = 0xcbf29ce484222325
+_FNV_PRIME = 0x100000001b3
+
+
+# ------------------- Scalar hash functions -------------------------------- #
+
+def _as_bytes(key) -> bytes:
+    """Encode a key for the byte-oriented hash functions"""
+    if isinstance(key, bytes):
+        return key
+    return str(key).encode('utf-8', 'surrogatepass')
+
+
+def make_fnv1a(seed: int = 0):
+    """
+    Build a 64-bit FNV-1a hash function over the UTF-8 bytes of a key
+    :param seed: int mixed into the offset basis
+    :return: hash function
+    """
+    basis = (_FNV_OFFSET_BASIS ^ seed) & _MASK_64
+
+    def fnv1a_hash(key: str) -> int:
+        hash = basis
+        for byte in _as_bytes(key):
+            hash = ((hash ^ byte) * _FNV_PRIME) & _MASK_64
+        return hash
+
+    return fnv1a_hash
+
+
+fnv1a_hash = make_fnv1a()
+
+
+def _rotate(value: int, bits: int) -> int:
+    """Rotate a 64-bit value left"""
+    return ((value << bits) | (value >> (64 - bits))) & _MASK_64
+
+
+def _sip_rounds(v0: int, v1: int, v2: int, v3: int, rounds: int) -> (int, int, int, int):
+    """Apply SipRound to the four state words"""
+    for _ in range(rounds):
+        v0 = (v0 + v1) & _MASK_64
+        v1 = _rotate(v1, 13) ^ v0
+        v0 = _rotate(v0, 32)
+        v2 = (v2 + v3) & _MASK_64
+        v3 = _rotate(v3, 16) ^ v2
+        v0 = (v0 + v3) & _MASK_64
+        v3 = _rotate(v3, 21) ^ v0
+        v2 = (v2 + v1) & _MASK_64
+        v1 = _rotate(v1, 17) ^ v2
+        v2 = _rotate(v2, 32)
+    return v0, v1, v2, v3
+
+
+def siphash24(key_0: int, key_1: int, data: bytes) -> int:
+    """
+    SipHash-2-4 of data under the 128-bit key (key_0, key_1)
+    :param key_0: low 64 bits of the key
+    :param key_1: high 64 bits of the key
+    :param data: bytes to hash
+    :return: int of 64-bit hash
+    """
+    v0 = key_0 ^ 0x736f6d6570736575
+    v1 = key_1 ^ 0x646f72616e646f6d
+    v2 = key_0 ^ 0x6c7967656e657261
+    v3 = key_1 ^ 0x7465646279746573
+
+    # Compress each full 8-byte word
+    length = len(data)
+    end = length - length % 8
+    for start in range(0, end, 8):
+        word = int.from_bytes(data[start:start + 8], 'little')
+        v3 ^= word
+        v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 2)
+        v0 ^= word
+
+    # The last word holds the leftover bytes and the length
+    word = int.from_bytes(data[end:], 'little') | ((length & 0xff) << 56)
+    v3 ^= word
+    v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 2)
+    v0 ^= word
+
+    v2 ^= 0xff
+    v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 4)
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+def make_siphash(seed: int = 0):
+    """
+    Build a seeded SipHash-2-4 hash function over the UTF-8 bytes of a key
+    :param seed: int whose low 128 bits are the SipHash key
+    :return: hash function
+    """
+    key_0, key_1 = seed & _MASK_64, (seed >> 64) & _MASK_64
+
+    def siphash(key: str) -> int:
+        return siphash24(key_0, key_1, _as_bytes(key))
+
+    return siphash
+
+
+def make_builtin_hash(seed: int = 0):
+    """
+    Build a hash function from Python's built-in hash, salted with a seed.
+    String hashes are randomized per process unless PYTHONHASHSEED is set,
+    so these hashes must not be stored or shared between processes.
+    :param seed: int salt
+    :return: hash function
+    """
+
+    def builtin_hash(key: str) -> int:
+        return hash((seed, key)) & _MASK_64
+
+    return builtin_hash
+
+
+def fibonacci_mix(hash: int) -> int:
+    """
+    Mix a hash so that its low bits depend on all of its bits.
+    Multiplying by the golden ratio constant moves the entropy into the high
+    bits, and the high half is then folded back onto the low half. Tables
+    indexed with hash & (capacity - 1) need this, since hash_function_1 and
+    hash_function_2 only differ in their low bits for similar keys.
+    :param hash: int hash from any hash function
+    :return: int of 64-bit mixed hash
+    """
+    mixed = (hash * _FIBONACCI) & _MASK_64
+    return mixed ^ (mixed >> 32)
+
+
+# Factories taking a seed and returning a hash function
+HASH_FUNCTIONS = {
+    'hash_function_1': lambda seed: hash_function_1,
+    'hash_function_2': lambda seed: hash_function_2,
+    'fnv1a': make_fnv1a,
+    'siphash': make_siphash,
+    'builtin': make_builtin_hash,
+}
+
+
+def register_hash_function(name: str, factory) -> None:
+    """
+    Add a hash function to the registry
+    :param name: str to look the function up by
+    :param factory: callable taking an int seed and returning a hash function
+    """
+    if name in HASH_FUNCTIONS:
+        raise ValueError(f"hash function {name!r} is already registered")
+    HASH_FUNCTIONS[name] = factory
+
+
+def get_hash_function(name: str, seed: int = 0):
+    """
+    Look up a registered hash function
+    :param name: str the function was registered under
+    :param seed: int passed to the factory; unseeded functions ignore it
+    :return: hash function
+    """
+    if name not in HASH_FUNCTIONS:
+        raise KeyError(f"unknown hash function {name!r}, "
+                       f"choose from {', '.join(HASH_FUNCTIONS)}")
+    return HASH_FUNCTIONS[name](seed)
+
+
+# ------------------- Vectorized hash functions ---------------------------- #
+
+def _code_points(keys) -> "numpy.ndarray":
+    """
+    Return the code points of a batch of strings as a 2-D array,
+    one row per key, padded with zeros to the longest key
+    :param keys: list or NumPy array of str
+    :return: uint32 array of shape (len(keys), longest key)
+    """
+    array = numpy.asarray(keys, dtype=numpy.str_)
+    width = array.dtype.itemsize // 4
+
+    # NumPy stores str_ as UTF-32, so each 4-byte unit is one ord() value
+    return array.view(numpy.uint32).reshape(len(array), width)
+
+
+def hash_function_1_batch(keys) -> "numpy.ndarray":
+    """
+    Vectorized hash_function_1: sum of the ordinals of each key
+    :param keys: list or NumPy array of str
+    :return: int64 array of hashes
+    """
+    codes = _code_points(keys)
+    return codes.sum(axis=1, dtype=numpy.int64)
+
+
+def hash_function_2_batch(keys) -> "numpy.ndarray":
+    """
+    Vectorized hash_function_2: sum of (position + 1) * ordinal of each key.
+    Padding is zero so it does not change the sum.
+    :param keys: list or NumPy array of str
+    :return: int64 array of hashes
+    """
+    codes = _code_points(keys)
+    weights = numpy.arange(1, codes.shape[1] + 1, dtype=numpy.int64)
+    return codes.astype(numpy.int64) @ weights
+
+
+# Scalar hash functions that have a vectorized equivalent
+BATCH_HASH_FUNCTIONS = {
+    hash_function_1: hash_function_1_batch,
+    hash_function_2: hash_function_2_batch,
+}
+
+
+def _hash_chunks(batch_function, keys: list, longest: int) -> list:
+    """
+    Hash keys in chunks of at most _CHUNK_CODE_POINTS padded code points
+    :param batch_function: vectorized hash function
+    :param keys: list of str
+    :param longest: int length of the longest key, or an upper bound on it
+    :return: list of int hashes
+    """
+    rows = max(_CHUNK_CODE_POINTS // max(longest, 1), 1)
+    hashes = []
+    for start in range(0, len(keys), rows):
+        hashes.extend(batch_function(keys[start:start + rows]).tolist())
+    return hashes
+
+
+def batch_hash(function, keys: list) -> list:
+    """
+    Hash a batch of keys with the vectorized equivalent of function
+    :param function: scalar hash function used by a HashMap
+    :param keys: list of keys
+    :return: list of int hashes, or None if NumPy is not installed,
+             function has no vectorized equivalent or a key is not a str
+    """
+    batch_function = BATCH_HASH_FUNCTIONS.get(function)
+    if numpy is None or batch_function is None:
+        return None
+
+    if not all(type(key) is str for key in keys):
+        return None
+
+    lengths = list(map(len, keys))
+    longest = max(lengths, default=0)
+
+    # When padding every key to the longest at most doubles the characters
+    # hashed, the batch is hashed in order
+    if longest * len(keys) <= 2 * sum(lengths):
+        return _hash_chunks(batch_function, keys, longest)
+
+    # Otherwise group keys by the bit length of their length, so each group
+    # padded to its longest key is less than twice its characters
+    classes = {}
+    for position, length in enumerate(lengths):
+        classes.setdefault(length.bit_length(), []).append(position)
+
+    hashes = [0] * len(keys)
+    for length_class, positions in classes.items():
+        group = [keys[position] for position in positions]
+        for position, hashed in zip(positions, _hash_chunks(batch_function, group, (1 << length_class) - 1)):
+            hashes[position] = hashed
+    return hashes
@@ -0,0 +1,486 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - Hashmap Implementation
+# Description: Separate chaining HashMap whose buckets are flat Python lists
+# instead of linked lists of SLNodes. A bucket holds its entries back to back
+# as hash, key, value, hash, key, value, ... so a chain is one allocation
+# walked by index, and an empty bucket is None and allocates nothing. It has
+# the same public methods as hash_map_separate_chaining.HashMap.
+
+
+from a6_include import (DynamicArray,
+                        hash_function_1, hash_function_2)
+from collection_utils import as_list
+from hash_functions import batch_hash
+from primes import grow_capacity, is_prime, next_prime, shrink_capacity
+
+
+# Each entry takes three consecutive items of its bucket
+_STRIDE = 3
+
+
+def _position(bucket: list, key: str, hashed: int) -> int:
+    """
+    Find an entry in a bucket, comparing cached hashes before keys
+    :param bucket: flat list of hash, key, value triples
+    :param key: key to find
+    :param hashed: hash of key
+    :return: index of the entry's hash in the bucket, or -1
+    """
+    for position in range(0, len(bucket), _STRIDE):
+        if bucket[position] == hashed and bucket[position + 1] == key:
+            return position
+    return -1
+
+
+class HashMap:
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 max_load: float = 1.0,
+                 min_load: float = 0.0) -> None:
+        """
+        Initialize new HashMap that uses
+        separate chaining for collision resolution
+        :param capacity: initial number of buckets, rounded up to a prime
+        :param function: hash function applied to keys
+        :param max_load: load factor above which put doubles the table
+        :param min_load: load factor below which remove halves the table,
+                         0 disables shrinking
+        """
+        # Shrinking must leave the table below max_load and growing must leave
+        # it above min_load, otherwise the table would flip between two sizes
+        if max_load <= 0:
+            raise ValueError("max_load must be positive")
+        if min_load < 0 or min_load * 2 >= max_load:
+            raise ValueError("min_load must be at least 0 and less than half of max_load")
+
+        # capacity must be a prime number
+        self._capacity = next_prime(capacity)
+        self._buckets = [None] * self._capacity
+        self._empty = self._capacity
+
+        self._hash_function = function
+        self._size = 0
+
+        self._max_load = max_load
+        self._min_load = min_load
+        self._min_capacity = self._capacity
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i, bucket in enumerate(self._buckets):
+            pairs = [] if bucket is None else [f"({bucket[x + 1]}: {bucket[x + 2]})"
+                                               for x in range(0, len(bucket), _STRIDE)]
+            out += str(i) + ': [' + ' -> '.join(pairs) + ']\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def get_buckets(self) -> DynamicArray:
+        """Build a DynamicArray with the (key, value) tuples of each bucket,
+        or None for an empty bucket. This copies the whole table and is only
+        meant for inspection.
+        :return: DynamicArray of lists of tuples or None"""
+
+        return DynamicArray([None if bucket is None else
+                             [(bucket[x + 1], bucket[x + 2]) for x in range(0, len(bucket), _STRIDE)]
+                             for bucket in self._buckets])
+
+    def get_hash(self, key: str) -> int:
+        """Hash a key
+        :param key: string of key to hash
+        :return: int of hash"""
+        return self._hash_function(key)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update key/value pair in hash map
+        :param key: key of new element
+        :param value: value of new element
+        """
+        self._put_hashed(key, self.get_hash(key), value)
+
+    def _put_hashed(self, key: str, hashed: int, value: object) -> None:
+        """
+        Update key/value pair in hash map given the key's hash
+        :param key: key of new element
+        :param hashed: hash of key
+        :param value: value of new element
+        """
+        index = hashed % self._capacity
+        bucket = self._buckets[index]
+
+        # First entry of the bucket: allocate it now
+        if bucket is None:
+            self._buckets[index] = [hashed, key, value]
+            self._empty -= 1
+
+        else:
+            # Replace value if key already exists, otherwise append the entry
+            position = _position(bucket, key, hashed)
+            if position != -1:
+                bucket[position + 2] = value
+                return
+            bucket += (hashed, key, value)
+
+        self._size += 1
+
+        # Double the table once the load factor passes max_load
+        if self._size > self._capacity * self._max_load:
+            self.resize_table(grow_capacity(self._capacity))
+
+    def empty_buckets(self) -> int:
+        """
+        Return number of empty buckets in hash table
+        :return: int of empty buckets
+        """
+        return self._empty
+
+    def table_load(self) -> float:
+        """
+        Return current hash table factor
+        :return: float of hash table factor
+        """
+        return self._size / self._capacity
+
+    def clear(self) -> None:
+        """
+        Clear contents of hash map without changing capacity
+        """
+        self._buckets = [None] * self._capacity
+        self._empty = self._capacity
+        self._size = 0
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change capacity of hash table
+        :param new_capacity: int of new hash table capacity
+        """
+
+        # Check if new_capacity is less than 1
+        if new_capacity < 1:
+            return
+
+        # Check if new_capacity is prime
+        if is_prime(new_capacity) is False:
+            new_capacity = next_prime(new_capacity)
+
+        # Move each entry to its new bucket using its cached hash;
+        # only buckets that receive an entry are allocated
+        resized = [None] * new_capacity
+        empty = new_capacity
+        for bucket in self._buckets:
+            if bucket is None:
+                continue
+            for x in range(0, len(bucket), _STRIDE):
+                index = bucket[x] % new_capacity
+                if resized[index] is None:
+                    resized[index] = bucket[x:x + _STRIDE]
+                    empty -= 1
+                else:
+                    resized[index] += bucket[x:x + _STRIDE]
+
+        self._buckets = resized
+        self._capacity = new_capacity
+        self._empty = empty
+
+    def get(self, key: str) -> object:
+        """
+        Return value associated with key
+        :param key: key to find value
+        :return: key's value
+        """
+        hashed = self.get_hash(key)
+        bucket = self._buckets[hashed % self._capacity]
+        if bucket is None:
+            return None
+        position = _position(bucket, key, hashed)
+        return None if position == -1 else bucket[position + 2]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if key is in hash map, otherwise return False
+        :param key: key to find
+        :return: bool whether key is present
+        """
+        hashed = self.get_hash(key)
+        bucket = self._buckets[hashed % self._capacity]
+        return bucket is not None and _position(bucket, key, hashed) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Remove given key and value from hash map
+        :param key: key of element to remove
+        """
+        if self._remove_hashed(key, self.get_hash(key)):
+            self._shrink_if_sparse()
+
+    def _remove_hashed(self, key: str, hashed: int) -> bool:
+        """
+        Remove given key from hash map given its hash, without shrinking
+        :param key: key of element to remove
+        :param hashed: hash of key
+        :return: bool whether key was present
+        """
+        index = hashed % self._capacity
+        bucket = self._buckets[index]
+        if bucket is None:
+            return False
+        position = _position(bucket, key, hashed)
+        if position == -1:
+            return False
+
+        # Order within a bucket does not matter, so move the last entry
+        # into the gap; the last entry of a bucket frees the whole bucket
+        if len(bucket) == _STRIDE:
+            self._buckets[index] = None
+            self._empty += 1
+        else:
+            bucket[position:position + _STRIDE] = bucket[-_STRIDE:]
+            del bucket[-_STRIDE:]
+
+        self._size -= 1
+        return True
+
+    def _shrink_if_sparse(self) -> None:
+        """
+        Halve the table while the load factor is below min_load,
+        never going below the capacity the map was created with,
+        then resize once
+        """
+        if self._min_load == 0:
+            return
+
+        capacity = self._capacity
+        while capacity > self._min_capacity and self._size < capacity * self._min_load:
+            capacity = max(shrink_capacity(capacity), self._min_capacity)
+
+        if capacity != self._capacity:
+            self.resize_table(capacity)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return Dynamic Array where each index has a tuple of pair stored there
+        :return: dynamic array object
+        """
+        keys_and_values = []
+        for bucket in self._buckets:
+            if bucket is not None:
+                keys_and_values.extend(zip(bucket[1::_STRIDE], bucket[2::_STRIDE]))
+        return DynamicArray(keys_and_values)
+
+    def _hash_many(self, keys: list) -> list:
+        """Hash a batch of keys, using the vectorized hash function when available
+        :param keys: list of keys
+        :return: list of int hashes"""
+
+        hashes = batch_hash(self._hash_function, keys)
+        if hashes is None:
+            hash_function = self._hash_function
+            hashes = [hash_function(key) for key in keys]
+        return hashes
+
+    def put_many(self, pairs) -> None:
+        """
+        Update every key/value pair from an iterable, growing the table
+        at most once for the whole batch
+        :param pairs: DynamicArray or iterable of (key, value) tuples
+        """
+        pairs = as_list(pairs)
+
+        # Grow once so the batch fits under max_load even if every key is new
+        capacity = self._capacity
+        while self._size + len(pairs) > capacity * self._max_load:
+            capacity = grow_capacity(capacity)
+        if capacity != self._capacity:
+            self.resize_table(capacity)
+
+        put_hashed = self._put_hashed
+        for (key, value), hashed in zip(pairs, self._hash_many([pair[0] for pair in pairs])):
+            put_hashed(key, hashed, value)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Return the value of every key, or None for missing keys
+        :param keys: DynamicArray or iterable of keys
+        :return: DynamicArray of values in the same order as keys
+        """
+        keys = as_list(keys)
+        buckets, capacity = self._buckets, self._capacity
+        values = []
+
+        for key, hashed in zip(keys, self._hash_many(keys)):
+            bucket = buckets[hashed % capacity]
+            position = -1 if bucket is None else _position(bucket, key, hashed)
+            values.append(None if position == -1 else bucket[position + 2])
+
+        return DynamicArray(values)
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Return whether each key is in the hash map
+        :param keys: DynamicArray or iterable of keys
+        :return: DynamicArray of bools in the same order as keys
+        """
+        keys = as_list(keys)
+        buckets, capacity = self._buckets, self._capacity
+        found = []
+
+        for key, hashed in zip(keys, self._hash_many(keys)):
+            bucket = buckets[hashed % capacity]
+            found.append(bucket is not None and _position(bucket, key, hashed) != -1)
+
+        return DynamicArray(found)
+
+    def remove_many(self, keys) -> None:
+        """
+        Remove every given key, shrinking the table at most once afterwards
+        :param keys: DynamicArray or iterable of keys
+        """
+        keys = as_list(keys)
+        remove_hashed = self._remove_hashed
+        for key, hashed in zip(keys, self._hash_many(keys)):
+            remove_hashed(key, hashed)
+
+        self._shrink_if_sparse()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - put example 2")
+    print("-------------------")
+    m = HashMap(41, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - empty_buckets example 1")
+    print("-----------------------------")
+    m = HashMap(101, hash_function_1)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key2', 20)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key1', 30)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key4', 40)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+
+    print("\nPDF - clear example 2")
+    print("---------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    print(m.get_size(), m.get_capacity())
+    m.put('key2', 20)
+    print(m.get_size(), m.get_capacity())
+    m.resize_table(100)
+    print(m.get_size(), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\nPDF - resize example 2")
+    print("----------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nPDF - get_keys_and_values example 1")
+    print("------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+
+    m.resize_table(1)
+    print(m.get_keys_and_values())
+
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+
+    print("\nMemory per entry")
+    print("----------------")
+    import sys
+    import hash_map_separate_chaining
+    keys = ['key' + str(i) for i in range(1000)]
+    for name, module in (("linked list", hash_map_separate_chaining), ("flat list", sys.modules[__name__])):
+        m = module.HashMap(1000, hash_function_2)
+        m.put_many((key, None) for key in keys)
+        if name == "linked list":
+            buckets = m.get_buckets()
+            lists = [buckets[i] for i in range(buckets.length()) if buckets[i] is not None]
+            nodes = [node for linked_list in lists for node in linked_list]
+            size = (sum(sys.getsizeof(linked_list) + sys.getsizeof(linked_list.__dict__) for linked_list in lists)
+                    + sum(sys.getsizeof(node) + sys.getsizeof(node.__dict__) for node in nodes))
+        else:
+            size = sum(sys.getsizeof(bucket) for bucket in m._buckets if bucket is not None)
+        print(name, round(size / len(keys), 1), "bytes")
+
+    print("\nRemoval within one bucket example")
+    print("---------------------------------")
+    # Every key hashes to bucket 0, so removals from the front, middle and
+    # back of one flat list each move the last entry into the gap
+    m = HashMap(11, lambda key: 0, max_load=100)
+    keys = ['key' + str(i) for i in range(10)]
+    for key in keys:
+        m.put(key, key)
+    for key in ('key0', 'key5', 'key9'):
+        m.remove(key)
+        keys.remove(key)
+        print(len(m._buckets[0]) // _STRIDE, all(m.get(key) == key for key in keys), m.get(key))
+    for key in keys:
+        m.remove(key)
+    print(m.get_size(), m.empty_buckets(), m._buckets[0])
+
+    from hash_map_checks import print_dict_comparison
+
+    def random_map(rng):
+        return HashMap(rng.choice([3, 11, 53]), rng.choice([hash_function_1, hash_function_2]),
+                       max_load=rng.choice([0.75, 1.0, 2.0]), min_load=rng.choice([0.0, 0.25]))
+
+    print_dict_comparison(random_map, check=lambda m: m.empty_buckets() == m._buckets.count(None))
@@ -0,0 +1,136 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - Hashmap Implementation
+# Description: Randomized check shared by the test blocks of the HashMap
+# modules. compare_with_dict runs a random mix of put, get, contains_key and
+# remove against a map and a dict, then compares whichever batch methods the
+# map has and get_keys_and_values, so each module only supplies a factory
+# for its maps and any invariant of its own. compare_during_rehash does the
+# same while an incremental resize has entries in both tables.
+
+
+import random
+from itertools import count
+
+
+def compare_with_dict(factory, seed: int, steps: int = 2000, key_range: int = 200,
+                      check=None) -> bool:
+    """
+    Run random operations against a map and a dict and compare them
+    :param factory: callable taking a random.Random and returning an empty
+                    map, so the configuration can vary with the seed
+    :param seed: int seed for the configuration and the operations
+    :param steps: int of random operations
+    :param key_range: int of distinct keys the operations draw from
+    :param check: optional callable taking the map, called after every
+                  operation, returning False if an invariant is broken
+    :return: bool whether the map matched the dict throughout
+    """
+    rng = random.Random(seed)
+    hash_map = factory(rng)
+    expected = {}
+    result = True
+
+    for _ in range(steps):
+        key = 'k' + str(rng.randrange(key_range))
+        operation = rng.random()
+        if operation < 0.5:
+            hash_map.put(key, operation)
+            expected[key] = operation
+        elif operation < 0.8:
+            hash_map.remove(key)
+            expected.pop(key, None)
+        else:
+            result &= hash_map.get(key) == expected.get(key)
+        result &= hash_map.contains_key(key) == (key in expected)
+        result &= hash_map.get_size() == len(expected)
+        if check is not None:
+            result &= check(hash_map)
+
+    # Batch methods, where the map has them, over present and missing keys
+    keys = list(expected) + ['missing' + str(i) for i in range(20)]
+    if hasattr(hash_map, 'put_many'):
+        hash_map.put_many((key, len(key)) for key in keys)
+        expected.update((key, len(key)) for key in keys)
+    if hasattr(hash_map, 'remove_many'):
+        hash_map.remove_many(keys[::3])
+        for key in keys[::3]:
+            del expected[key]
+    if hasattr(hash_map, 'get_many'):
+        values = hash_map.get_many(keys)
+        result &= [values[i] for i in range(len(keys))] == [expected.get(key) for key in keys]
+    if hasattr(hash_map, 'contains_many'):
+        found = hash_map.contains_many(keys)
+        result &= [found[i] for i in range(len(keys))] == [key in expected for key in keys]
+
+    pairs = hash_map.get_keys_and_values()
+    result &= sorted(pairs[i] for i in range(pairs.length())) == sorted(expected.items())
+    result &= hash_map.get_size() == len(expected)
+    if check is not None:
+        result &= check(hash_map)
+    return result
+
+
+def print_dict_comparison(factory, seeds=range(20), **options) -> None:
+    """
+    Print whether compare_with_dict passes for each seed
+    :param factory: callable taking a random.Random and returning an empty map
+    :param seeds: iterable of int seeds
+    :param options: further keyword arguments for compare_with_dict
+    """
+    print("\nRandomized comparison with dict")
+    print("-------------------------------")
+    for seed in seeds:
+        print(seed, compare_with_dict(factory, seed, **options))
+
+
+def compare_during_rehash(hash_map, seed: int) -> (bool, int):
+    """
+    Fill a map until an incremental resize starts, then run random operations
+    while its entries are split between the old and the new table, and
+    finally start an iteration in the middle of another resize
+    :param hash_map: empty map created with incremental_resize=True
+    :param seed: int seed for the operations
+    :return: tuple of (bool whether the map matched a dict throughout,
+             int of operations run while the old table was in use)
+    """
+    rng = random.Random(seed)
+    expected = {}
+    result = True
+    fill_keys = ('fill' + str(i) for i in count())
+
+    def fill_until_resizing():
+        while hash_map._old_buckets is None:
+            key = next(fill_keys)
+            hash_map.put(key, key)
+            expected[key] = key
+
+    fill_until_resizing()
+    during = 0
+    while hash_map._old_buckets is not None:
+        during += 1
+
+        # About half of the keys drawn are present, in either table
+        if expected and rng.random() < 0.5:
+            key = rng.choice(list(expected))
+        else:
+            key = 'k' + str(rng.randrange(1000))
+        operation = rng.random()
+        if operation < 0.3:
+            hash_map.put(key, operation)
+            expected[key] = operation
+        elif operation < 0.5:
+            hash_map.remove(key)
+            expected.pop(key, None)
+        elif operation < 0.7:
+            result &= hash_map.get(key) == expected.get(key)
+        elif operation < 0.9:
+            result &= hash_map.contains_key(key) == (key in expected)
+        else:
+            pairs = hash_map.get_keys_and_values()
+            result &= sorted(pairs[i] for i in range(pairs.length())) == sorted(expected.items())
+        result &= hash_map.get_size() == len(expected)
+
+    # An iteration started halfway through a resize sees every entry once
+    fill_until_resizing()
+    result &= sorted(hash_map.items()) == sorted(expected.items())
+    return result, during
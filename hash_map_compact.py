@@ -0,0 +1,375 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - Hashmap Implementation
+# Description: Open addressing HashMap with quadratic probing that stores its
+# table as parallel arrays instead of one HashEntry object per slot.
+# Cached hashes, keys and values each live in their own array, and a byte
+# array records whether each slot is empty, live or a tombstone. It is a
+# limited variant for comparing memory layouts: it has the assignment's
+# methods (put, get, contains_key, remove, clear, empty_buckets, table_load,
+# resize_table, get_keys_and_values) but none of the later additions to
+# hash_map_open_addressing.HashMap, such as probe, stats, iteration, the
+# batch methods or update/merge.
+
+
+from array import array
+
+from a6_include import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2)
+from primes import grow_capacity, next_prime
+
+
+# Slot states kept in the byte array
+EMPTY = 0
+LIVE = 1
+TOMBSTONE = 2
+
+# Hashes are stored as unsigned 64-bit integers
+_HASH_MASK = (1 << 64) - 1
+
+# Quadratic probing of a prime table reaches a free slot whenever at most
+# half of the slots are taken, so the table is kept at or below this load
+MAX_LOAD = 0.5
+
+
+class HashMap:
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that uses
+        quadratic probing for collision resolution
+        """
+        # capacity must be a prime number
+        self._capacity = next_prime(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                tombstone = self._states[i] == TOMBSTONE
+                out += f"{i}: K: {self._keys[i]} V: {self._values[i]} TS: {tombstone}\n"
+        return out
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replace the table with empty arrays of the given capacity
+        :param capacity: int of slots to allocate
+        """
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._states = bytearray(capacity)
+        self._tombstones = 0
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def get_array(self) -> DynamicArray:
+        """Build a DynamicArray of HashEntry objects mirroring the table.
+        This copies the whole table and is only meant for inspection.
+        :return: DynamicArray of HashEntry or None per slot"""
+
+        entries = DynamicArray()
+        for x in range(self._capacity):
+            if self._states[x] == EMPTY:
+                entries.append(None)
+            else:
+                entry = HashEntry(self._keys[x], self._values[x])
+                entry.is_tombstone = self._states[x] == TOMBSTONE
+                entries.append(entry)
+        return entries
+
+    def get_hash(self, key: str) -> int:
+        """Run the hash function
+        :param key: key to hash
+        :return: int of hash, reduced to 64 bits"""
+
+        return self._hash_function(key) & _HASH_MASK
+
+    def _find_slot(self, key: str, hashed: int) -> (int, int):
+        """Probe for key, stopping at the first empty slot
+        :param key: key to search for
+        :param hashed: cached hash of key
+        :return: tuple of (index holding key or -1,
+                           first reusable index or -1 if none was reached)"""
+
+        states, hashes, keys = self._states, self._hashes, self._keys
+        capacity = self._capacity
+        home = hashed % capacity
+        free = -1
+
+        for j in range(capacity):
+            index = (home + j * j) % capacity
+            state = states[index]
+
+            # An empty slot ends the probe sequence
+            if state == EMPTY:
+                return -1, index if free == -1 else free
+
+            # Compare cached hashes before comparing keys
+            if state == LIVE:
+                if hashes[index] == hashed and keys[index] == key:
+                    return index, free
+
+            # Remember the first tombstone for reuse
+            elif free == -1:
+                free = index
+
+        return -1, free
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update key/value pair in hash map
+        :param key: key to update
+        :param value: value to update
+        """
+
+        hashed = self.get_hash(key)
+        index, free = self._find_slot(key, hashed)
+
+        # Overwrite in place when the key already exists
+        if index != -1:
+            self._values[index] = value
+            return
+
+        # Rehash once live entries or tombstones reach half the table,
+        # growing only when the live entries alone need the room
+        if (self._size + self._tombstones + 1) / self._capacity > MAX_LOAD or free == -1:
+            if (self._size + 1) / self._capacity > MAX_LOAD:
+                self.resize_table(grow_capacity(self._capacity))
+            else:
+                self.resize_table(self._capacity)
+            index, free = self._find_slot(key, hashed)
+
+        if self._states[free] == TOMBSTONE:
+            self._tombstones -= 1
+        self._states[free] = LIVE
+        self._hashes[free] = hashed
+        self._keys[free] = key
+        self._values[free] = value
+        self._size += 1
+
+    def table_load(self) -> float:
+        """
+        Return current hash table load factor
+        :return: float of load factor
+        """
+
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Return number of empty buckets
+        :return: int of empty buckets
+        """
+
+        return self._capacity - self._size - self._tombstones
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change capacity of hash table and rehash live entries
+        using their cached hashes. The capacity is raised as far as needed
+        to keep the load factor at or below MAX_LOAD.
+        :param new_capacity: int of new capacity
+        """
+
+        # Check if new_capacity is less than number of elements
+        if new_capacity < self._size:
+            return
+
+        new_capacity = next_prime(new_capacity)
+
+        # Past half full the quadratic probe sequence may miss every free slot
+        while self._size > new_capacity * MAX_LOAD:
+            new_capacity = grow_capacity(new_capacity)
+
+        old_states, old_hashes = self._states, self._hashes
+        old_keys, old_values = self._keys, self._values
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+
+        states, hashes = self._states, self._hashes
+        keys, values = self._keys, self._values
+
+        # The new table has no tombstones or duplicate keys,
+        # so each entry goes in the first empty slot of its probe sequence
+        for x in range(len(old_states)):
+            if old_states[x] != LIVE:
+                continue
+
+            hashed = old_hashes[x]
+            home = hashed % new_capacity
+            for j in range(new_capacity):
+                index = (home + j * j) % new_capacity
+                if states[index] == EMPTY:
+                    break
+            else:
+                raise RuntimeError("quadratic probe found no free slot while resizing")
+
+            states[index] = LIVE
+            hashes[index] = hashed
+            keys[index] = old_keys[x]
+            values[index] = old_values[x]
+
+    def get(self, key: str) -> object:
+        """
+        Return value associated with key
+        :param key: key to find value
+        :return: object of value found
+        """
+
+        index, _ = self._find_slot(key, self.get_hash(key))
+        if index == -1:
+            return None
+        return self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if key is in hash map. Otherwise return False
+        :param key: key to search for
+        :return: bool if key is present
+        """
+
+        index, _ = self._find_slot(key, self.get_hash(key))
+        return index != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes given key and value from hash map
+        :param key: key of element to remove
+        """
+
+        index, _ = self._find_slot(key, self.get_hash(key))
+        if index == -1:
+            return
+
+        # Leave a tombstone so later probe sequences stay intact
+        self._states[index] = TOMBSTONE
+        self._keys[index] = None
+        self._values[index] = None
+        self._tombstones += 1
+        self._size -= 1
+
+    def clear(self) -> None:
+        """
+        Clear contents of hash map. Does not change capacity.
+        """
+
+        self._allocate(self._capacity)
+        self._size = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return DynamicArray where each index is a tuple of a key/value pair
+        :return: DynamicArray object of key/value tuples
+        """
+
+        keys_values = DynamicArray()
+        states, keys, values = self._states, self._keys, self._values
+        for x in range(self._capacity):
+            if states[x] == LIVE:
+                keys_values.append((keys[x], values[x]))
+
+        return keys_values
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - resize example 2")
+    print("----------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nPDF - remove example 1")
+    print("----------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\nPDF - get_keys_and_values example 1")
+    print("------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
+
+    print("\nSmall resize example")
+    print("--------------------")
+    # Asking for a table the entries would more than half fill grows the
+    # target capacity instead of probing forever
+    for count in (6, 7):
+        m = HashMap(11, hash_function_1)
+        for i in range(count):
+            m.put('key' + str(i), i)
+        for capacity in (count, count + 1, 1):
+            m.resize_table(capacity)
+            result = all(m.get('key' + str(i)) == i for i in range(count))
+            print(count, capacity, m.get_capacity(), round(m.table_load(), 2), result)
+
+    print("\nMemory per entry")
+    print("----------------")
+    import sys
+    m = HashMap(1000, hash_function_1)
+    entry = HashEntry('key', 'value')
+    table = (sys.getsizeof(m._hashes) + sys.getsizeof(m._keys)
+             + sys.getsizeof(m._values) + sys.getsizeof(m._states))
+    print("compact slot:", round(table / m.get_capacity(), 1), "bytes")
+    print("HashEntry slot:", 8 + sys.getsizeof(entry) + sys.getsizeof(entry.__dict__), "bytes")
@@ -0,0 +1,511 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - Hashmap Implementation
+# Description: Thread-safe separate chaining HashMap. Keys are split over a
+# power-of-two number of segments, each an independent table with its own
+# lock, so threads writing to different segments do not wait for each other
+# and each segment resizes on its own. Reads take no lock: a segment keeps a
+# version number that writers make odd while they change it, and a read that
+# overlaps a write is retried under the lock. Buckets are tuples of
+# hash, key, value triples that writers replace rather than change, so an
+# unlocked reader always sees a whole bucket.
+
+
+from threading import Lock
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from collection_utils import as_list
+from hash_functions import fibonacci_mix
+from primes import grow_capacity, next_prime
+
+
+# Each entry takes three consecutive items of its bucket
+_STRIDE = 3
+
+# Returned by lookups for an absent key, since None is a valid value
+_MISSING = object()
+
+
+def _position(bucket: tuple, key: str, hashed: int) -> int:
+    """
+    Find an entry in a bucket, comparing cached hashes before keys
+    :param bucket: tuple of hash, key, value triples
+    :param key: key to find
+    :param hashed: hash of key
+    :return: index of the entry's hash in the bucket, or -1
+    """
+    for position in range(0, len(bucket), _STRIDE):
+        if bucket[position] == hashed and bucket[position + 1] == key:
+            return position
+    return -1
+
+
+class _Segment:
+    """
+    One independently locked table of a ConcurrentHashMap.
+    Every change happens under lock, between two increments of version.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        :param capacity: int of buckets, a prime
+        """
+        self.lock = Lock()
+        self.version = 0
+        self.buckets = [None] * capacity
+        self.size = 0
+        self.empty = capacity
+
+    def lookup(self, key: str, hashed: int) -> object:
+        """
+        Return the value of key in the current table, or _MISSING. Safe without
+        the lock: the table and bucket are read once and never change in place.
+        :param key: key to find
+        :param hashed: hash of key
+        :return: value or _MISSING
+        """
+        buckets = self.buckets
+        bucket = buckets[hashed % len(buckets)]
+        if bucket is not None:
+            position = _position(bucket, key, hashed)
+            if position != -1:
+                return bucket[position + 2]
+        return _MISSING
+
+    def read(self, key: str, hashed: int) -> object:
+        """
+        Look up key without locking, retrying under the lock if a write
+        was in progress or finished during the lookup
+        :param key: key to find
+        :param hashed: hash of key
+        :return: value or _MISSING
+        """
+        version = self.version
+        if version & 1 == 0:
+            value = self.lookup(key, hashed)
+            if self.version == version:
+                return value
+
+        with self.lock:
+            return self.lookup(key, hashed)
+
+    def store(self, key: str, hashed: int, value: object) -> bool:
+        """
+        Put key/value into the current table. Call with lock held and
+        version odd.
+        :param key: key of new element
+        :param hashed: hash of key
+        :param value: value of new element
+        :return: True if key was added, False if its value was replaced
+        """
+        buckets = self.buckets
+        index = hashed % len(buckets)
+        bucket = buckets[index]
+
+        if bucket is None:
+            buckets[index] = (hashed, key, value)
+            self.empty -= 1
+        else:
+            position = _position(bucket, key, hashed)
+            if position != -1:
+                buckets[index] = bucket[:position + 2] + (value,) + bucket[position + 3:]
+                return False
+            buckets[index] = bucket + (hashed, key, value)
+
+        self.size += 1
+        return True
+
+    def delete(self, key: str, hashed: int) -> bool:
+        """
+        Remove key from the current table. Call with lock held and
+        version odd.
+        :param key: key of element to remove
+        :param hashed: hash of key
+        :return: True if key was removed
+        """
+        buckets = self.buckets
+        index = hashed % len(buckets)
+        bucket = buckets[index]
+        position = -1 if bucket is None else _position(bucket, key, hashed)
+        if position == -1:
+            return False
+
+        bucket = bucket[:position] + bucket[position + _STRIDE:]
+        if not bucket:
+            bucket = None
+            self.empty += 1
+        buckets[index] = bucket
+        self.size -= 1
+        return True
+
+    def grow(self, max_load: float) -> None:
+        """
+        Move every entry into a new table once the load factor passes
+        max_load. Call with lock held and version odd; readers wait on the
+        lock until the new table is in place.
+        :param max_load: load factor above which the table doubles
+        """
+        capacity = len(self.buckets)
+        if self.size <= capacity * max_load:
+            return
+
+        new_capacity = grow_capacity(capacity)
+        new_buckets = [None] * new_capacity
+        empty = new_capacity
+        for bucket in self.buckets:
+            if bucket is None:
+                continue
+            for position in range(0, len(bucket), _STRIDE):
+                hashed = bucket[position]
+                index = hashed % new_capacity
+                if new_buckets[index] is None:
+                    new_buckets[index] = bucket[position:position + _STRIDE]
+                    empty -= 1
+                else:
+                    new_buckets[index] += bucket[position:position + _STRIDE]
+
+        self.buckets = new_buckets
+        self.empty = empty
+
+
+class ConcurrentHashMap:
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 segments: int = 16,
+                 max_load: float = 0.75) -> None:
+        """
+        Initialize new thread-safe HashMap
+        :param capacity: initial number of buckets over all segments
+        :param function: hash function applied to keys
+        :param segments: number of independently locked segments,
+                         a power of two
+        :param max_load: load factor above which a segment doubles its table
+        """
+        if segments < 1 or segments & (segments - 1) != 0:
+            raise ValueError("segments must be a power of two")
+        if max_load <= 0:
+            raise ValueError("max_load must be positive")
+
+        # Segment capacities must be prime numbers
+        segment_capacity = next_prime(max(capacity // segments, 1))
+        self._segments = [_Segment(segment_capacity) for _ in range(segments)]
+        self._segment_mask = segments - 1
+        self._hash_function = function
+        self._max_load = max_load
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for number, segment in enumerate(self._segments):
+            with segment.lock:
+                for i, bucket in enumerate(segment.buckets):
+                    pairs = [] if bucket is None else [f"({bucket[x + 1]}: {bucket[x + 2]})"
+                                                       for x in range(0, len(bucket), _STRIDE)]
+                    out += f"{number}.{i}: [" + ' -> '.join(pairs) + ']\n'
+        return out
+
+    def get_hash(self, key: str) -> int:
+        """Hash a key
+        :param key: string of key to hash
+        :return: int of hash"""
+        return self._hash_function(key)
+
+    def _segment(self, hashed: int) -> _Segment:
+        """Return the segment a hash falls in. The hash is mixed first, so the
+        segment does not depend on the same bits as the bucket index.
+        :param hashed: hash from get_hash
+        :return: _Segment"""
+        return self._segments[fibonacci_mix(hashed) & self._segment_mask]
+
+    def get_size(self) -> int:
+        """
+        Return size of map. Writes in progress in other threads may or may
+        not be counted.
+        """
+        return sum(segment.size for segment in self._segments)
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map, the buckets of every segment together
+        """
+        return sum(len(segment.buckets) for segment in self._segments)
+
+    def table_load(self) -> float:
+        """
+        Return current hash table load factor
+        :return: float of load factor
+        """
+        return self.get_size() / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        Return number of empty buckets
+        :return: int of empty buckets
+        """
+        return sum(segment.empty for segment in self._segments)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update key/value pair in hash map
+        :param key: key of new element
+        :param value: value of new element
+        """
+        hashed = self.get_hash(key)
+        segment = self._segment(hashed)
+        with segment.lock:
+            segment.version += 1
+            try:
+                if segment.store(key, hashed, value):
+                    segment.grow(self._max_load)
+            finally:
+                segment.version += 1
+
+    def compute(self, key: str, function: callable) -> object:
+        """
+        Replace the value of key with function(current value), atomically,
+        for example to increment a counter shared between threads
+        :param key: key to update
+        :param function: function of the current value, or None if key is
+                         absent, returning the new value
+        :return: the new value
+        """
+        hashed = self.get_hash(key)
+        segment = self._segment(hashed)
+        with segment.lock:
+            current = segment.lookup(key, hashed)
+            value = function(None if current is _MISSING else current)
+            segment.version += 1
+            try:
+                if segment.store(key, hashed, value):
+                    segment.grow(self._max_load)
+            finally:
+                segment.version += 1
+        return value
+
+    def get(self, key: str) -> object:
+        """
+        Return value associated with key
+        :param key: key to find value
+        :return: key's value, or None if key is absent
+        """
+        hashed = self.get_hash(key)
+        value = self._segment(hashed).read(key, hashed)
+        return None if value is _MISSING else value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if key is in hash map, otherwise return False
+        :param key: key to find
+        :return: bool whether key is present
+        """
+        hashed = self.get_hash(key)
+        return self._segment(hashed).read(key, hashed) is not _MISSING
+
+    def remove(self, key: str) -> None:
+        """
+        Remove given key and value from hash map
+        :param key: key of element to remove
+        """
+        hashed = self.get_hash(key)
+        segment = self._segment(hashed)
+        with segment.lock:
+            segment.version += 1
+            try:
+                segment.delete(key, hashed)
+            finally:
+                segment.version += 1
+
+    def clear(self) -> None:
+        """
+        Clear contents of hash map without changing capacity. Segments are
+        cleared one at a time, so a concurrent put may survive.
+        """
+        for segment in self._segments:
+            with segment.lock:
+                segment.version += 1
+                segment.buckets = [None] * len(segment.buckets)
+                segment.size = 0
+                segment.empty = len(segment.buckets)
+                segment.version += 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return Dynamic Array where each index has a tuple of pair stored there.
+        Each segment's bucket list is copied under its lock, one segment at
+        a time; the buckets themselves never change in place.
+        :return: dynamic array object
+        """
+        keys_and_values = DynamicArray()
+        for segment in self._segments:
+            with segment.lock:
+                buckets = list(segment.buckets)
+            for bucket in buckets:
+                if bucket is not None:
+                    for position in range(0, len(bucket), _STRIDE):
+                        keys_and_values.append((bucket[position + 1], bucket[position + 2]))
+        return keys_and_values
+
+    def put_many(self, pairs) -> None:
+        """
+        Update every key/value pair from an iterable, taking each segment's
+        lock once for all of its pairs
+        :param pairs: DynamicArray or iterable of (key, value) tuples
+        """
+        by_segment = [[] for _ in self._segments]
+        get_hash, mask = self.get_hash, self._segment_mask
+        for key, value in as_list(pairs):
+            hashed = get_hash(key)
+            by_segment[fibonacci_mix(hashed) & mask].append((key, hashed, value))
+
+        for segment, triples in zip(self._segments, by_segment):
+            if not triples:
+                continue
+            with segment.lock:
+                segment.version += 1
+                try:
+                    for key, hashed, value in triples:
+                        if segment.store(key, hashed, value):
+                            segment.grow(self._max_load)
+                finally:
+                    segment.version += 1
+
+    def __len__(self) -> int:
+        """Return size of map"""
+        return self.get_size()
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if key is in hash map"""
+        return self.contains_key(key)
+
+    def __getitem__(self, key: str) -> object:
+        """
+        Return value associated with key
+        :param key: key to find value
+        :return: key's value
+        :raises KeyError: if key is not in hash map
+        """
+        hashed = self.get_hash(key)
+        value = self._segment(hashed).read(key, hashed)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = ConcurrentHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - remove example 1")
+    print("----------------------")
+    m = ConcurrentHashMap(53, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\ncompute and clear example")
+    print("-------------------------")
+    m = ConcurrentHashMap(11, hash_function_1, segments=4)
+    for key in ('a', 'b', 'a', 'c', 'a'):
+        m.compute(key, lambda value: (value or 0) + 1)
+    print(m.get('a'), m.get('b'), m.get_size())
+    m.clear()
+    print(m.get('a'), m.get_size(), m.compute('a', lambda value: value), m.contains_key('a'))
+
+    from hash_map_checks import print_dict_comparison
+
+    def random_map(rng):
+        return ConcurrentHashMap(rng.choice([1, 11, 53]), rng.choice([hash_function_1, hash_function_2]),
+                                 segments=rng.choice([1, 4, 16]), max_load=rng.choice([0.5, 1.0, 3.0]))
+
+    print_dict_comparison(random_map, seeds=range(10),
+                          check=lambda m: m.empty_buckets() == sum(segment.buckets.count(None)
+                                                                    for segment in m._segments))
+
+    print("\nMultithreaded stress test")
+    print("-------------------------")
+    import random
+    import sys
+    import threading
+
+    # Switch threads as often as possible so operations interleave
+    sys.setswitchinterval(1e-6)
+    threads, increments, keys = 8, 3000, 64
+    m = ConcurrentHashMap(1, hash_function_2, segments=4)
+    torn = []
+
+    def writer(number: int) -> None:
+        rng = random.Random(number)
+        for _ in range(increments):
+            key = 'counter' + str(rng.randrange(keys))
+            m.compute(key, lambda value: (value or 0) + 1)
+
+            # Values always pair a key with itself, so a torn read would show
+            m.put('pair' + str(rng.randrange(keys)), ('pair', number))
+            m.remove('scratch' + str(rng.randrange(keys)))
+            m.put('scratch' + str(rng.randrange(keys)), number)
+
+    def reader() -> None:
+        rng = random.Random(0)
+        for _ in range(increments * 4):
+            value = m.get('pair' + str(rng.randrange(keys)))
+            if value is not None and (value[0] != 'pair' or not 0 <= value[1] < threads):
+                torn.append(value)
+
+    workers = [threading.Thread(target=writer, args=(number,)) for number in range(threads)]
+    workers += [threading.Thread(target=reader) for _ in range(2)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    sys.setswitchinterval(0.005)
+
+    total = sum(m.get('counter' + str(i)) or 0 for i in range(keys))
+    pairs = m.get_keys_and_values()
+    print(total == threads * increments, not torn,
+          m.get_size() == pairs.length() == len({pairs[i][0] for i in range(pairs.length())}))
+
+    print("\nGrow during concurrent reads")
+    print("----------------------------")
+    # Readers look up keys that are never removed while a writer adds enough
+    # keys to make every segment replace its table several times
+    sys.setswitchinterval(1e-6)
+    m = ConcurrentHashMap(1, hash_function_2, segments=2, max_load=0.75)
+    stable = ['stable' + str(i) for i in range(32)]
+    m.put_many((key, key) for key in stable)
+    capacity = m.get_capacity()
+    missed = []
+
+    done = threading.Event()
+
+    def grower() -> None:
+        for i in range(5000):
+            m.put('grow' + str(i), i)
+        done.set()
+
+    def stable_reader() -> None:
+        while not done.is_set():
+            missed.extend(key for key in stable if m.get(key) != key)
+            pairs = m.get_keys_and_values()
+            if len({pairs[i][0] for i in range(pairs.length())} & set(stable)) != len(stable):
+                missed.append('get_keys_and_values')
+
+    workers = [threading.Thread(target=grower)] + [threading.Thread(target=stable_reader) for _ in range(3)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    sys.setswitchinterval(0.005)
+    print(m.get_capacity() > 8 * capacity, not missed, m.get_size() == len(stable) + 5000)
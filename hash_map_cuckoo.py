@@ -0,0 +1,671 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - Hashmap Implementation
+# Description: Bucketized cuckoo HashMap. Every key has exactly two candidate
+# buckets of four slots, one from each of two seeded hash functions, plus a
+# small stash shared by the whole table, so a lookup touches at most two
+# buckets and the stash. An insert that finds both buckets full evicts a
+# resident to its other bucket, and so on along a bounded path; if the path
+# runs out the homeless entry goes to the stash, and once the stash is full
+# the table is rebuilt with fresh seeds or grown. It has the same public
+# methods as hash_map_open_addressing.HashMap.
+
+
+import random
+
+from a6_include import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2)
+from collection_utils import as_list
+from hash_functions import batch_hash, fibonacci_mix, make_fnv1a
+from primes import next_power_of_two
+
+
+# Slots per bucket
+BUCKET_SIZE = 4
+
+# Entries that may wait in the stash before the table is rebuilt
+STASH_SIZE = 4
+
+# Rebuilds with fresh seeds before a failing table is grown instead
+REBUILDS_PER_SIZE = 3
+
+# A rebuild stops growing the table once it has this many slots per entry,
+# and keeps any entries still without a slot in the stash
+MAX_SLOTS_PER_ENTRY = 8
+
+# Marks an empty slot in the key array
+_EMPTY = object()
+
+
+class HashMap:
+    def __init__(self, capacity: int, function, function_2=None,
+                 max_load: float = 0.9, seed: int = 0) -> None:
+        """
+        Initialize new HashMap that uses
+        cuckoo hashing for collision resolution
+        :param capacity: initial number of slots, rounded up to a power of
+                         two number of buckets
+        :param function: hash function picking the first bucket of a key
+        :param function_2: hash function picking the second bucket. Defaults
+                           to FNV-1a with a seed drawn from seed, so keys
+                           colliding under function still get different
+                           second buckets. Each hash is also mixed with its
+                           own per-table seed.
+        :param max_load: load factor at which put grows the table
+        :param seed: int seeding the choice of per-table hash seeds
+        """
+        if not 0 < max_load < 1:
+            raise ValueError("max_load must be between 0 and 1")
+        if function_2 is function:
+            raise ValueError("function_2 must differ from function")
+
+        self._random = random.Random(seed)
+        self._hash_function = function
+        self._hash_function_2 = function_2 or make_fnv1a(self._random.getrandbits(64))
+        self._max_load = max_load
+
+        self._size = 0
+        self._allocate(self._bucket_count_for(capacity))
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._keys[i] is _EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                out += f"{i}: K: {self._keys[i]} V: {self._values[i]}\n"
+        for key, value, _, _ in self._stash:
+            out += f"stash: K: {key} V: {value}\n"
+        return out
+
+    @staticmethod
+    def _bucket_count_for(capacity: int) -> int:
+        """
+        Return the power-of-two number of buckets holding at least capacity slots
+        """
+        return next_power_of_two(max(1, -(-capacity // BUCKET_SIZE)))
+
+    def _allocate(self, bucket_count: int) -> None:
+        """
+        Replace the table with empty buckets and pick fresh seeds
+        :param bucket_count: int of buckets, a power of two
+        """
+        capacity = bucket_count * BUCKET_SIZE
+        self._keys = [_EMPTY] * capacity
+        self._values = [None] * capacity
+        self._hashes_1 = [0] * capacity
+        self._hashes_2 = [0] * capacity
+        self._stash = []
+        self._stash_limit = STASH_SIZE
+
+        self._capacity = capacity
+        self._bucket_mask = bucket_count - 1
+        self._seed_1 = self._random.getrandbits(64)
+        self._seed_2 = self._random.getrandbits(64)
+
+        # Longest eviction path tried before giving up on an insert
+        self._max_kicks = 16 + 4 * bucket_count.bit_length()
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def get_array(self) -> DynamicArray:
+        """Build a DynamicArray of HashEntry objects mirroring the table,
+        leaving out the stash. This copies the whole table and is only
+        meant for inspection.
+        :return: DynamicArray of HashEntry or None per slot"""
+
+        entries = DynamicArray()
+        for x in range(self._capacity):
+            if self._keys[x] is _EMPTY:
+                entries.append(None)
+            else:
+                entries.append(HashEntry(self._keys[x], self._values[x], self._hashes_1[x]))
+        return entries
+
+    def get_hash(self, key: str) -> int:
+        """Run the first hash function
+        :param key: key to hash
+        :return: int of hash"""
+
+        return self._hash_function(key)
+
+    def _get_hashes(self, key: str) -> (int, int):
+        """Run both hash functions
+        :param key: key to hash
+        :return: tuple of the two hashes"""
+
+        return self._hash_function(key), self._hash_function_2(key)
+
+    def _buckets_of(self, hashed_1: int, hashed_2: int) -> (int, int):
+        """Return the first slot of each of the two buckets of a key
+        :param hashed_1: hash from the first function
+        :param hashed_2: hash from the second function
+        :return: tuple of two slot indices"""
+
+        mask = self._bucket_mask
+        return ((fibonacci_mix(hashed_1 ^ self._seed_1) & mask) * BUCKET_SIZE,
+                (fibonacci_mix(hashed_2 ^ self._seed_2) & mask) * BUCKET_SIZE)
+
+    def _find_slot(self, key: str, hashed_1: int, hashed_2: int = None) -> int:
+        """Look for key in its two buckets and then in the stash
+        :param key: key to search for
+        :param hashed_1: hash from the first function
+        :param hashed_2: hash from the second function, or None to compute
+                         it only if key is not in its first bucket
+        :return: index of the slot holding key, -1 - position in the stash,
+                 or None if key is absent"""
+
+        keys, hashes_1 = self._keys, self._hashes_1
+        start = (fibonacci_mix(hashed_1 ^ self._seed_1) & self._bucket_mask) * BUCKET_SIZE
+        for index in range(start, start + BUCKET_SIZE):
+            if hashes_1[index] == hashed_1 and keys[index] == key:
+                return index
+
+        # Most keys sit in their first bucket, so the second hash
+        # is often not needed at all
+        if hashed_2 is None:
+            hashed_2 = self._hash_function_2(key)
+        start = (fibonacci_mix(hashed_2 ^ self._seed_2) & self._bucket_mask) * BUCKET_SIZE
+        for index in range(start, start + BUCKET_SIZE):
+            if hashes_1[index] == hashed_1 and keys[index] == key:
+                return index
+
+        for position, (stashed_key, _, stashed_hash, _) in enumerate(self._stash):
+            if stashed_hash == hashed_1 and stashed_key == key:
+                return -1 - position
+
+        return None
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update key/value pair in hash map
+        :param key: key to update
+        :param value: value to update
+        """
+        hashed_1, hashed_2 = self._get_hashes(key)
+        self._put_hashed(key, hashed_1, hashed_2, value)
+
+    def _put_hashed(self, key: str, hashed_1: int, hashed_2: int, value: object) -> None:
+        """
+        Update key/value pair in hash map given both of the key's hashes
+        :param key: key to update
+        :param hashed_1: hash from the first function
+        :param hashed_2: hash from the second function
+        :param value: value to update
+        """
+
+        # Overwrite in place when the key already exists
+        index = self._find_slot(key, hashed_1, hashed_2)
+        if index is not None:
+            if index >= 0:
+                self._values[index] = value
+            else:
+                stashed = self._stash[-1 - index]
+                self._stash[-1 - index] = (key, value, stashed[2], stashed[3])
+            return
+
+        self._size += 1
+        entry = (key, value, hashed_1, hashed_2)
+
+        if self._size > self._capacity * self._max_load:
+            self._rebuild(self._bucket_count_for(self._capacity * 2), [entry])
+            return
+
+        homeless = self._insert(entry)
+        if homeless is None:
+            return
+        if len(self._stash) < self._stash_limit:
+            self._stash.append(homeless)
+            return
+
+        # The stash is full: rebuild with new seeds at the same size
+        self._rebuild(self._capacity // BUCKET_SIZE, [homeless])
+
+    def _insert(self, entry: tuple) -> tuple:
+        """
+        Place an entry whose key is not in the table, evicting residents to
+        their other bucket along a path of bounded length
+        :param entry: tuple of (key, value, hash 1, hash 2)
+        :return: None if every entry found a slot, otherwise the entry
+                 left without one, which may differ from the one passed in
+        """
+        keys, values = self._keys, self._values
+        hashes_1, hashes_2 = self._hashes_1, self._hashes_2
+
+        first, second = self._buckets_of(entry[2], entry[3])
+        start = first
+        for kick in range(self._max_kicks + 1):
+
+            # Take a free slot in either bucket if there is one
+            for bucket in (first, second) if kick == 0 else (start,):
+                for index in range(bucket, bucket + BUCKET_SIZE):
+                    if keys[index] is _EMPTY:
+                        keys[index], values[index], hashes_1[index], hashes_2[index] = entry
+                        return None
+
+            # Both full: evict a random resident, which then tries its other bucket
+            if kick == 0:
+                start = self._random.choice((first, second))
+            index = start + self._random.randrange(BUCKET_SIZE)
+            evicted = (keys[index], values[index], hashes_1[index], hashes_2[index])
+            keys[index], values[index], hashes_1[index], hashes_2[index] = entry
+            entry = evicted
+
+            first, second = self._buckets_of(entry[2], entry[3])
+            start = second if first == start else first
+
+        return entry
+
+    def _rebuild(self, bucket_count: int, extra: list) -> None:
+        """
+        Reinsert every entry into a new table with fresh seeds, growing it
+        after repeated failures
+        :param bucket_count: int of buckets to try first, a power of two
+        :param extra: list of entries to add that are not in the table yet
+        """
+        entries = extra
+        for x in range(self._capacity):
+            if self._keys[x] is not _EMPTY:
+                entries.append((self._keys[x], self._values[x], self._hashes_1[x], self._hashes_2[x]))
+        entries.extend(self._stash)
+
+        most_buckets = max(len(entries) * MAX_SLOTS_PER_ENTRY // BUCKET_SIZE, 1)
+        largest = max(bucket_count, 1 << (most_buckets.bit_length() - 1))
+        attempts = 0
+        while not self._fill(bucket_count, entries, STASH_SIZE):
+            attempts += 1
+            if attempts % REBUILDS_PER_SIZE == 0:
+                bucket_count *= 2
+            if bucket_count > largest:
+                # Only keys sharing both hashes with many others fail this
+                # often, and no table separates them, so they stay in the
+                # stash until the next time the table grows
+                self._fill(largest, entries, len(entries))
+                return
+
+    def _fill(self, bucket_count: int, entries: list, stash_limit: int) -> bool:
+        """
+        Allocate a new table and insert entries into it
+        :param bucket_count: int of buckets, a power of two
+        :param entries: list of (key, value, hash 1, hash 2) tuples
+        :param stash_limit: int of entries the stash may take, here and
+                            in later puts
+        :return: bool whether every entry was placed
+        """
+        self._allocate(bucket_count)
+        self._stash_limit = stash_limit
+
+        for entry in entries:
+            homeless = self._insert(entry)
+            if homeless is not None:
+                if len(self._stash) >= stash_limit:
+                    return False
+                self._stash.append(homeless)
+        return True
+
+    def table_load(self) -> float:
+        """
+        Return current hash table load factor
+        :return: float of load factor
+        """
+
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Return number of empty slots
+        :return: int of empty slots
+        """
+
+        return self._capacity - self._size + len(self._stash)
+
+    def stash_size(self) -> int:
+        """
+        Return number of entries waiting in the stash. It only passes
+        STASH_SIZE when many keys share both of their hashes.
+        :return: int of stashed entries
+        """
+
+        return len(self._stash)
+
+    def probe_length(self, key: str) -> int:
+        """
+        Return number of places examined to find key: 1 or 2 for its
+        buckets, 3 for the stash
+        :param key: key to search for
+        :return: int of places examined, or 0 if key is absent
+        """
+
+        hashed_1, hashed_2 = self._get_hashes(key)
+        index = self._find_slot(key, hashed_1, hashed_2)
+        if index is None:
+            return 0
+        if index < 0:
+            return 3
+
+        first, _ = self._buckets_of(hashed_1, hashed_2)
+        return 1 if first <= index < first + BUCKET_SIZE else 2
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change capacity of hash table and reinsert every entry
+        :param new_capacity: int of new capacity
+        """
+
+        # Check if new_capacity is less than number of elements
+        if new_capacity < self._size:
+            return
+
+        # Keep the load factor at or below max_load once every entry is back in
+        bucket_count = self._bucket_count_for(new_capacity)
+        while self._size > bucket_count * BUCKET_SIZE * self._max_load:
+            bucket_count *= 2
+
+        self._rebuild(bucket_count, [])
+
+    def get(self, key: str) -> object:
+        """
+        Return value associated with key
+        :param key: key to find value
+        :return: object of value found
+        """
+
+        index = self._find_slot(key, self._hash_function(key))
+        if index is None:
+            return None
+        if index < 0:
+            return self._stash[-1 - index][1]
+        return self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if key is in hash map. Otherwise return False
+        :param key: key to search for
+        :return: bool if key is present
+        """
+
+        return self._find_slot(key, self._hash_function(key)) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes given key and value from hash map
+        :param key: key of element to remove
+        """
+        self._remove_hashed(key, self._hash_function(key))
+
+    def _remove_hashed(self, key: str, hashed_1: int, hashed_2: int = None) -> None:
+        """
+        Removes given key and value from hash map given its hashes
+        :param key: key of element to remove
+        :param hashed_1: hash from the first function
+        :param hashed_2: hash from the second function, or None to compute
+                         it only if needed
+        """
+
+        index = self._find_slot(key, hashed_1, hashed_2)
+        if index is None:
+            return
+
+        # No probe sequence passes through a slot, so it is simply emptied
+        if index < 0:
+            del self._stash[-1 - index]
+        else:
+            self._keys[index] = _EMPTY
+            self._values[index] = None
+        self._size -= 1
+
+    def clear(self) -> None:
+        """
+        Clear contents of hash map. Does not change capacity.
+        """
+
+        self._allocate(self._capacity // BUCKET_SIZE)
+        self._size = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return DynamicArray where each index is a tuple of a key/value pair
+        :return: DynamicArray object of key/value tuples
+        """
+
+        keys_values = DynamicArray()
+        keys, values = self._keys, self._values
+        for x in range(self._capacity):
+            if keys[x] is not _EMPTY:
+                keys_values.append((keys[x], values[x]))
+        for key, value, _, _ in self._stash:
+            keys_values.append((key, value))
+
+        return keys_values
+
+    def _hash_many(self, keys: list) -> list:
+        """Hash a batch of keys with both hash functions, using the vectorized
+        hash functions when available
+        :param keys: list of keys
+        :return: list of (hash 1, hash 2) tuples"""
+
+        hashes = []
+        for function in (self._hash_function, self._hash_function_2):
+            batch = batch_hash(function, keys)
+            hashes.append(batch if batch is not None else [function(key) for key in keys])
+
+        return list(zip(*hashes))
+
+    def put_many(self, pairs) -> None:
+        """
+        Update every key/value pair from an iterable, growing the table
+        at most once for the whole batch
+        :param pairs: DynamicArray or iterable of (key, value) tuples
+        """
+        pairs = as_list(pairs)
+
+        # Grow once so the batch fits under max_load even if every key is new
+        if self._size + len(pairs) > self._capacity * self._max_load:
+            self.resize_table(self._size + len(pairs))
+
+        put_hashed = self._put_hashed
+        for (key, value), (hashed_1, hashed_2) in zip(pairs, self._hash_many([pair[0] for pair in pairs])):
+            put_hashed(key, hashed_1, hashed_2, value)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Return the value of every key, or None for missing keys
+        :param keys: DynamicArray or iterable of keys
+        :return: DynamicArray of values in the same order as keys
+        """
+        keys = as_list(keys)
+        find_slot, values, stash = self._find_slot, self._values, self._stash
+        found = []
+
+        for key, (hashed_1, hashed_2) in zip(keys, self._hash_many(keys)):
+            index = find_slot(key, hashed_1, hashed_2)
+            if index is None:
+                found.append(None)
+            elif index < 0:
+                found.append(stash[-1 - index][1])
+            else:
+                found.append(values[index])
+
+        return DynamicArray(found)
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Return whether each key is in the hash map
+        :param keys: DynamicArray or iterable of keys
+        :return: DynamicArray of bools in the same order as keys
+        """
+        keys = as_list(keys)
+        find_slot = self._find_slot
+        return DynamicArray([find_slot(key, hashed_1, hashed_2) is not None
+                             for key, (hashed_1, hashed_2) in zip(keys, self._hash_many(keys))])
+
+    def remove_many(self, keys) -> None:
+        """
+        Remove every given key
+        :param keys: DynamicArray or iterable of keys
+        """
+        keys = as_list(keys)
+        remove_hashed = self._remove_hashed
+        for key, (hashed_1, hashed_2) in zip(keys, self._hash_many(keys)):
+            remove_hashed(key, hashed_1, hashed_2)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1, hash_function_2)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - put example 2")
+    print("-------------------")
+    m = HashMap(41, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - empty_buckets example 1")
+    print("-----------------------------")
+    m = HashMap(101, hash_function_1, hash_function_2)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key2', 20)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key1', 30)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key4', 40)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+
+    print("\nPDF - resize example 2")
+    print("----------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nPDF - contains_key example 1")
+    print("----------------------------")
+    m = HashMap(11, hash_function_1, hash_function_2)
+    print(m.contains_key('key1'))
+    m.put('key1', 10)
+    m.put('key2', 20)
+    m.put('key3', 30)
+    print(m.contains_key('key1'))
+    print(m.contains_key('key4'))
+    print(m.contains_key('key2'))
+    print(m.contains_key('key3'))
+    m.remove('key3')
+    print(m.contains_key('key3'))
+
+    print("\nPDF - remove example 1")
+    print("----------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\nPDF - get_keys_and_values example 1")
+    print("------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
+
+    print("\nWorst-case lookup example")
+    print("-------------------------")
+    from hash_functions import fnv1a_hash
+    m = HashMap(11, fnv1a_hash, max_load=0.95)
+    for i in range(20000):
+        m.put('user' + str(i), i)
+    lengths = [m.probe_length('user' + str(i)) for i in range(20000)]
+    print(m.get_capacity(), round(m.table_load(), 2), m.stash_size(), max(lengths))
+
+    print("\nStash overflow example")
+    print("----------------------")
+    # All 720 anagrams share one hash_function_1 hash and so their first
+    # bucket. The default second hash still spreads them, so the table grows
+    # or picks new seeds whenever the stash would overflow, instead of
+    # stashing them.
+    import time
+    from itertools import permutations
+    anagrams = [''.join(letters) for letters in permutations('abcdef')]
+    m = HashMap(11, hash_function_1)
+    start = time.perf_counter()
+    for key in anagrams:
+        m.put(key, key)
+    seconds = time.perf_counter() - start
+    print(m.get_size(), m.stash_size() <= STASH_SIZE, seconds < 1,
+          all(m.get(key) == key for key in anagrams))
+
+    # A second hash that also ignores letter order leaves nothing to separate
+    # them, so the table stops growing at MAX_SLOTS_PER_ENTRY slots per key
+    # and keeps the rest in the stash
+    anagrams = anagrams[:24]
+    m = HashMap(11, hash_function_1, len)
+    for key in anagrams:
+        m.put(key, key)
+    print(m.get_size(), m.stash_size() > STASH_SIZE, m.get_capacity() <= MAX_SLOTS_PER_ENTRY * len(anagrams),
+          all(m.get(key) == key for key in anagrams))
+
+    try:
+        HashMap(11, hash_function_1, hash_function_1)
+    except ValueError as error:
+        print(error)
+
+    from hash_map_checks import print_dict_comparison
+
+    def random_map(rng):
+        function = rng.choice([hash_function_1, hash_function_2])
+        return HashMap(rng.choice([3, 11, 53]), function,
+                       rng.choice([None, hash_function_2 if function is hash_function_1 else hash_function_1]),
+                       max_load=rng.choice([0.5, 0.9]), seed=rng.randrange(1000))
+
+    print_dict_comparison(random_map, check=lambda m: m.stash_size() <= STASH_SIZE)
@@ -4,32 +4,121 @@
 # Assignment: 6 - Hashmap Implementation
 # Due Date: 9 August 2022 (two free days used)
 # Description: This program uses a dynamic array to store a hash table.
-# It resolves collisions by chaining through open addressing and quadratic probing.
+# It resolves collisions by chaining through open addressing, by default with
+# quadratic probing. Other probe sequences can be chosen from probing.py, and
+# Robin Hood hashing can be used over a linear probe sequence.
 # Functions include put, get, remove, contains_key, clear,
 # empty_buckets, resize_table, table_load, and get_keys.
 
 
 from a6_include import (DynamicArray, HashEntry,
                         hash_function_1, hash_function_2)
+from collection_utils import as_list
+from hash_diagnostics import HashMapStats
+from hash_functions import batch_hash, fibonacci_mix
+from primes import grow_capacity, is_prime, next_power_of_two, next_prime
+from probing import ProbeStrategy, get_probe_strategy
+
+
+# Left in the old table in place of each entry an incremental resize has moved
+_MOVED = HashEntry(None, None)
+_MOVED.is_tombstone = True
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    def __init__(self, capacity: int, function, tombstone_limit: float = 0.25,
+                 incremental_resize: bool = False, rehash_step: int = 4,
+                 max_load: float = 0.5, robin_hood: bool = False,
+                 probing: ProbeStrategy = None, power_of_two: bool = False) -> None:
         """
         Initialize new HashMap that uses
         quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        :param capacity: initial number of buckets, rounded up to a prime
+                         or to a power of two if the probe strategy needs one
+        :param function: hash function applied to keys
+        :param tombstone_limit: fraction of the buckets that may hold tombstones
+                                before remove rehashes the table at the same capacity
+        :param incremental_resize: when True, growing the table moves the
+                                   entries over a little at a time instead of
+                                   all at once
+        :param rehash_step: number of old buckets moved by each put, get,
+                            contains_key and remove during an incremental resize
+        :param max_load: load factor at which put grows the table
+        :param robin_hood: when True, use Robin Hood hashing over a linear probe
+                           sequence instead of quadratic probing. Removes shift
+                           later entries back instead of leaving tombstones, and
+                           max_load may go up to 0.9 or so.
+        :param probing: ProbeStrategy or name of a registered one, defaults to
+                        quadratic probing, linear probing for Robin Hood or
+                        triangular probing in power-of-two mode
+        :param power_of_two: when True, keep the capacity a power of two, mix
+                             each hash with fibonacci_mix and find home slots
+                             with a bit mask instead of a remainder
         """
+        if rehash_step < 1:
+            raise ValueError("rehash_step must be at least 1")
+        if not 0 < max_load < 1:
+            raise ValueError("max_load must be between 0 and 1")
+
+        if probing is None:
+            if robin_hood:
+                probing = 'linear'
+            else:
+                probing = 'triangular' if power_of_two else 'quadratic'
+        if isinstance(probing, str):
+            probing = get_probe_strategy(probing)
+
+        power_of_two = power_of_two or probing.power_of_two
+        if power_of_two and probing.prime:
+            raise ValueError(f"{probing.name} probing needs a prime capacity")
+
+        # Robin Hood ordering relies on consecutive probe distances
+        if robin_hood and probing.name != 'linear':
+            raise ValueError("Robin Hood hashing needs linear probing")
+
+        # Quadratic probing on a prime table only reaches half of the slots
+        # and says so through its max_load
+        if max_load > probing.max_load:
+            raise ValueError(f"{probing.name} probing needs max_load of at most {probing.max_load}")
+
+        self._probing = probing
+        self._power_of_two = power_of_two
         self._buckets = DynamicArray()
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
+        # capacity must be a prime number, or a power of two in power-of-two mode
+        if self._power_of_two:
+            self._capacity = next_power_of_two(capacity)
+        else:
+            self._capacity = self._next_prime(capacity)
         for _ in range(self._capacity):
             self._buckets.append(None)
 
         self._hash_function = function
         self._size = 0
 
+        self._tombstones = 0
+        self._tombstone_limit = tombstone_limit
+
+        # _used counts the slots of the current table holding an entry or a
+        # tombstone, and _max_probe is the longest probe sequence an insert
+        # into the current table has needed
+        self._used = 0
+        self._max_probe = 0
+
+        # Bumped by every insert, removal, resize and clear so iterators can
+        # detect that the map changed under them
+        self._mod_count = 0
+
+        # During an incremental resize the old table stays here until every
+        # bucket below _rehash_index has been moved into _buckets
+        self._incremental_resize = incremental_resize
+        self._rehash_step = rehash_step
+        self._old_buckets = None
+        self._rehash_index = 0
+
+        self._max_load = max_load
+        self._robin_hood = robin_hood
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -43,35 +132,34 @@ class HashMap:
     def _next_prime(self, capacity: int) -> int:
         """
         Increment from given number to find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
+        return next_prime(capacity)
 
     @staticmethod
     def _is_prime(capacity: int) -> bool:
         """
         Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity == 2 or capacity == 3:
-            return True
-
-        if capacity == 1 or capacity % 2 == 0:
-            return False
+        return is_prime(capacity)
 
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
+    def _round_capacity(self, capacity: int) -> int:
+        """
+        Round a capacity up to a prime, or to a power of two in power-of-two mode
+        """
+        if self._power_of_two:
+            return next_power_of_two(capacity)
+        if self._is_prime(capacity) is not True:
+            return self._next_prime(capacity)
+        return capacity
 
-        return True
+    def _grow_capacity(self, capacity: int) -> int:
+        """
+        Return the capacity to grow a table to: exactly double in
+        power-of-two mode, otherwise the first prime past double
+        """
+        if self._power_of_two:
+            return capacity * 2
+        return grow_capacity(capacity)
 
     def get_size(self) -> int:
         """
@@ -96,60 +184,213 @@ class HashMap:
         return self._buckets
 
     def get_hash(self, key: str) -> int:
-        """Run the hash function
+        """Run the hash function, mixing the hash in power-of-two mode
         :param key: key to hash
         :return: int of new index"""
 
+        if self._power_of_two:
+            return fibonacci_mix(self._hash_function(key))
         return self._hash_function(key)
 
-    def probe(self, arr: DynamicArray, hash_index: int, key: str, value: object) -> bool:
-        """Probe for an empty spot in the array
+    def _bucket_index(self, hashed: int, number_buckets: int) -> int:
+        """Return the home slot of a hash
+        :param hashed: hash from get_hash
+        :param number_buckets: int of slots in the table
+        :return: int of index"""
+
+        if self._power_of_two:
+            return hashed & (number_buckets - 1)
+        return hashed % number_buckets
+
+    def _find_slot(self, arr: DynamicArray, hash_index: int, key: str, hashed: int) -> (int, int, int):
+        """Walk the probe sequence of a key, stopping at the first empty slot.
+        Shared by put, get, contains_key and remove.
+        :param arr: DynamicArray to probe
+        :param hash_index: home index of key
+        :param key: key to search for
+        :param hashed: full hash of key
+        :return: tuple of (index of the live entry holding key or -1,
+                           first tombstone or empty index to insert at or -1,
+                           number of slots examined to reach that free index)"""
+
+        get_at_index = arr.get_at_index
+        free = -1
+        free_length = 0
+
+        for length, probed_index in enumerate(self._probing.sequence(hash_index, key, arr.length(), hashed), 1):
+            probed_element = get_at_index(probed_index)
+
+            # An empty slot ends the probe sequence: the key is absent
+            if probed_element is None:
+                if free == -1:
+                    free, free_length = probed_index, length
+                return -1, free, free_length
+
+            # Remember the first tombstone so an insert can reuse it,
+            # but keep looking in case the key lives further along
+            if probed_element.is_tombstone:
+                if free == -1:
+                    free, free_length = probed_index, length
+
+            # Compare cached hashes before comparing keys
+            elif probed_element.hash_code == hashed and probed_element.key == key:
+                return probed_index, free, free_length
+
+        return -1, free, free_length
+
+    @staticmethod
+    def _robin_hood_find(arr: DynamicArray, hash_index: int, key: str, hashed: int) -> int:
+        """Walk the linear probe sequence of a key in a Robin Hood table.
+        Entries are ordered by distance from home, so the walk stops at the first
+        live entry that sits closer to its home than the key would.
+        :param arr: DynamicArray to probe
+        :param hash_index: home index of key
+        :param key: key to search for
+        :param hashed: full hash of key
+        :return: index of the live entry holding key or -1"""
+
+        get_at_index = arr.get_at_index
+        number_buckets = arr.length()
+        probed_index = hash_index
+
+        for distance in range(number_buckets):
+            probed_element = get_at_index(probed_index)
+
+            # An empty slot ends the probe sequence: the key is absent
+            if probed_element is None:
+                return -1
+
+            # Only the old table of an incremental resize holds tombstones;
+            # they keep their place in the order, so step over them
+            if probed_element.is_tombstone is False:
+                if probed_element.hash_code == hashed and probed_element.key == key:
+                    return probed_index
+
+                # The key would have taken this slot on insert: it is absent
+                home = probed_element.hash_code % number_buckets
+                if (probed_index - home) % number_buckets < distance:
+                    return -1
+
+            probed_index += 1
+            if probed_index == number_buckets:
+                probed_index = 0
+
+        return -1
+
+    @staticmethod
+    def _robin_hood_insert(arr: DynamicArray, entry: HashEntry) -> int:
+        """Insert an entry whose key is not in a Robin Hood table. Walking from
+        its home, the entry takes the slot of the first resident that is closer
+        to its own home, and the displaced resident carries on the same way.
+        :param arr: DynamicArray without tombstones and with an empty slot
+        :param entry: HashEntry to insert
+        :return: longest probe length of the entries placed"""
+
+        get_at_index, set_at_index = arr.get_at_index, arr.set_at_index
+        number_buckets = arr.length()
+        probed_index = entry.hash_code % number_buckets
+        distance = 0
+        longest = 0
+
+        while True:
+            resident = get_at_index(probed_index)
+            if resident is None:
+                set_at_index(probed_index, entry)
+                return max(longest, distance + 1)
+
+            # Take from the rich: swap with a resident nearer its home
+            resident_distance = (probed_index - resident.hash_code % number_buckets) % number_buckets
+            if resident_distance < distance:
+                set_at_index(probed_index, entry)
+                longest = max(longest, distance + 1)
+                entry, distance = resident, resident_distance
+
+            probed_index += 1
+            if probed_index == number_buckets:
+                probed_index = 0
+            distance += 1
+
+    @staticmethod
+    def _robin_hood_delete(arr: DynamicArray, index: int) -> None:
+        """Empty a slot of a Robin Hood table by shifting each following entry
+        back one slot, until an empty slot or an entry already at its home.
+        This keeps the table free of tombstones.
+        :param arr: DynamicArray to delete from
+        :param index: index of the entry to delete"""
+
+        get_at_index, set_at_index = arr.get_at_index, arr.set_at_index
+        number_buckets = arr.length()
+
+        for _ in range(number_buckets - 1):
+            next_index = index + 1
+            if next_index == number_buckets:
+                next_index = 0
+
+            next_element = get_at_index(next_index)
+            if next_element is None or next_element.hash_code % number_buckets == next_index:
+                break
+
+            set_at_index(index, next_element)
+            index = next_index
+
+        set_at_index(index, None)
+
+    def probe(self, arr: DynamicArray, hash_index: int, key: str, value: object,
+              hashed: int = None) -> bool:
+        """Insert key/value into the array, or replace the value if key exists
         :param arr: DynamicArray to probe
         :param hash_index: first index calculated with hash
         :param key: key of inserted element
         :param value: value of inserted element
-        :return: True if inserted, False if replaced or otherwise"""
-
-        # If key already exists in hash map, replace with new value
-        if arr.get_at_index(hash_index) is not None and arr.get_at_index(hash_index).key == key:
-            tombstone = arr.get_at_index(hash_index).is_tombstone
-            arr.set_at_index(hash_index, HashEntry(key, value))
-            if tombstone is True:
-                return True
+        :param hashed: full hash of key, cached on the entry
+        :return: True if inserted, False if replaced
+        :raises RuntimeError: if arr is not the map's table and its probe
+                              sequence for key reaches no free slot"""
+
+        if hashed is None:
+            hashed = self.get_hash(key)
+
+        if self._robin_hood:
+            index = self._robin_hood_find(arr, hash_index, key, hashed)
+            if index != -1:
+                arr.get_at_index(index).value = value
+                return False
+            self._note_insert(False, self._robin_hood_insert(arr, HashEntry(key, value, hashed)))
+            return True
+
+        index, free, free_length = self._find_slot(arr, hash_index, key, hashed)
+
+        # If key already exists in hash map, replace its value in place
+        if index != -1:
+            arr.get_at_index(index).value = value
             return False
 
-        # If initial index is empty, insert element there
-        elif arr.get_at_index(hash_index) is None:
-            arr.set_at_index(hash_index, HashEntry(key, value))
-            return True
+        # Every slot the probe sequence reaches is taken: grow the table and
+        # probe again rather than drop the write
+        if free == -1:
+            if arr is not self.get_array():
+                raise RuntimeError("probe sequence reached no free slot")
+            self.resize_table(self._grow_capacity(arr.length()))
+            arr = self.get_array()
+            return self.probe(arr, self._bucket_index(hashed, arr.length()), key, value, hashed)
+
+        # Otherwise, insert at the first tombstone or empty slot found
+        self._note_insert(arr.get_at_index(free) is not None, free_length)
+        arr.set_at_index(free, HashEntry(key, value, hashed))
+        return True
+
+    def _note_insert(self, reused_tombstone: bool, length: int) -> None:
+        """Update the counters for an entry inserted into the current table
+        :param reused_tombstone: True if the entry took a tombstone's slot
+        :param length: int of slots probed to place the entry"""
 
-        # Otherwise, probe for index
+        self._mod_count += 1
+        if reused_tombstone:
+            self._tombstones -= 1
         else:
-            number_buckets = arr.length()
-
-            for j in range(1, number_buckets):
-                probed_index = (hash_index + (j * j)) % number_buckets
-
-                # Check if replacing at key which already exists
-                if arr.get_at_index(probed_index) is not None and arr.get_at_index(probed_index).key == key:
-                    tombstone = arr.get_at_index(probed_index).is_tombstone
-                    arr.set_at_index(probed_index, HashEntry(key, value))
-                    if tombstone is True:
-                        return True
-                    return False
-
-                # Check if insertion at empty index is possible
-                elif arr.get_at_index(probed_index) is None:
-                    arr.set_at_index(probed_index, HashEntry(key, value))
-                    return True
-
-                # Check if insertion at tombstone is possible
-                elif arr.get_at_index(probed_index).is_tombstone is True:
-                    arr.set_at_index(probed_index, HashEntry(key, value))
-                    return True
-
-            # Otherwise, return False
-            return False
+            self._used += 1
+        if length > self._max_probe:
+            self._max_probe = length
 
     def put(self, key: str, value: object) -> None:
         """
@@ -157,17 +398,35 @@ class HashMap:
         :param key: key to update
         :param value: value to update
         """
+        self._put_hashed(key, self.get_hash(key), value)
+
+    def _put_hashed(self, key: str, hashed: int, value: object) -> None:
+        """
+        Update key/value pair in hash map given the key's hash
+        :param key: key to update
+        :param hashed: hash of key
+        :param value: value to update
+        """
+
+        if self._old_buckets is not None:
+            self._rehash_some()
 
-        # Check load factor more than or equal to 0.5
-        if self.table_load() >= 0.5:
-            # Resize table to double current size
+        # Check load factor more than or equal to max_load
+        if self.table_load() >= self._max_load:
+            # Resize table to the first prime past double the current size
             length = self.get_array().length()
-            self.resize_table(length * 2)
+            self._resize(self._grow_capacity(length))
 
-        # Get hash for element's key. Compute hash index. Probe and insert.
-        hashed = self.get_hash(key)
-        hash_index = hashed % self.get_array().length()
-        inserted = self.probe(self.get_array(), hash_index, key, value)
+        if self._old_buckets is not None:
+            # A key still in the old table is updated where it is
+            entry = self._find_in(self._old_buckets, key, hashed)
+            if entry is not None:
+                entry.value = value
+                return
+
+        # Compute hash index. Probe and insert.
+        hash_index = self._bucket_index(hashed, self.get_array().length())
+        inserted = self.probe(self.get_array(), hash_index, key, value, hashed)
 
         # Check if element was inserted or swapped. Increment size if inserted.
         if inserted is True:
@@ -188,21 +447,62 @@ class HashMap:
 
     def empty_buckets(self) -> int:
         """
-        Return number of empty buckets
+        Return number of empty buckets. During an incremental resize this
+        is the new table, which is still filling up.
         :return: int of empty buckets
         """
-
-        # Initialize array size and return variable
         array_size = self.get_array().length()
-        empty = 0
 
-        # Iterate through dynamic array
-        # If array element is None, increment return variable
-        for x in range(array_size):
-            if self.get_array().get_at_index(x) is None:
-                empty += 1
+        # Every slot that is not None holds an entry or a tombstone, and
+        # moving an entry over counts it like any other insert
+        return array_size - self._used
+
+    def tombstone_count(self) -> int:
+        """
+        Return number of buckets holding a removed entry
+        :return: int of tombstones
+        """
+
+        return self._tombstones
+
+    def stats(self) -> HashMapStats:
+        """
+        Return the maintained counters without touching the table. During an
+        incremental resize they describe the new table, which is still filling up.
+        :return: HashMapStats
+        """
+        capacity = self.get_capacity()
+        return HashMapStats(capacity, self.get_size(), capacity - self._used,
+                            self._tombstones, self._max_probe)
+
+    def probe_length(self, key: str) -> int:
+        """
+        Return number of slots examined to find key
+        :param key: key to search for
+        :return: int of slots probed, or 0 if key is absent
+        """
+
+        self._finish_rehash()
 
-        return empty
+        hashed = self.get_hash(key)
+        array = self.get_array()
+        number_buckets = array.length()
+        home = self._bucket_index(hashed, number_buckets)
+
+        if self._robin_hood:
+            index = self._robin_hood_find(array, home, key, hashed)
+            if index == -1:
+                return 0
+            return (index - home) % number_buckets + 1
+
+        index, _, _ = self._find_slot(array, home, key, hashed)
+        if index == -1:
+            return 0
+
+        # Walk the probe sequence until it reaches the key
+        for length, probed_index in enumerate(self._probing.sequence(home, key, number_buckets, hashed), 1):
+            if probed_index == index:
+                return length
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -215,72 +515,139 @@ class HashMap:
         if new_capacity < self.get_size():
             return
 
-        # Check if new_capacity is prime. If not, reassign it next prime
-        if self._is_prime(new_capacity) is not True:
-            new_capacity = self._next_prime(new_capacity)
+        # Finish any incremental resize so every entry is in one table
+        self._finish_rehash()
 
-        # Create new dynamic array with desired capacity
-        resized_array = DynamicArray()
+        # Check if new_capacity is prime (or a power of two). If not, round it up
+        new_capacity = self._round_capacity(new_capacity)
 
-        # Populate new dynamic array with None
-        for _ in range(new_capacity):
-            resized_array.append(None)
+        # Keep the load factor at or below max_load once every entry is back in
+        while self.get_size() > new_capacity * self._max_load:
+            new_capacity = self._grow_capacity(new_capacity)
+
+        # Create new dynamic array with desired capacity, populated with None
+        resized_array = DynamicArray([None] * new_capacity)
 
         # Store old buckets. Reassign buckets, capacity, and size
         old_data = self._buckets
         self._buckets = resized_array
         self._capacity = new_capacity
-        self._size = 0
+        self._tombstones = 0
+        self._used = 0
+        self._max_probe = 0
+        self._mod_count += 1
 
         # Begin rehashing elements from old array
         array_length = old_data.length()
         for x in range(array_length):
             old_element = old_data.get_at_index(x)
 
-            # Put the old element in the new array
+            # Move the old entry itself into the new array, using its cached hash
             if old_element is not None and old_element.is_tombstone is False:
-                self.put(old_element.key, old_element.value)
+                self._place(old_element)
 
-    def get(self, key: str) -> object:
+    def _place(self, entry: HashEntry) -> None:
+        """Put an entry whose key is not in the table into the first free slot
+        of its probe sequence
+        :param entry: HashEntry to move into the table"""
+
+        array = self.get_array()
+        if self._robin_hood:
+            self._note_insert(False, self._robin_hood_insert(array, entry))
+            return
+        home = self._bucket_index(entry.hash_code, array.length())
+        _, free, free_length = self._find_slot(array, home, entry.key, entry.hash_code)
+        self._note_insert(array.get_at_index(free) is not None, free_length)
+        array.set_at_index(free, entry)
+
+    def _resize(self, new_capacity: int) -> None:
         """
-        Return value associated with key
-        :param key: key to find value
-        :return: object of value found
+        Grow the table automatically, all at once or incrementally
+        :param new_capacity: int of new capacity
         """
+        if not self._incremental_resize:
+            self.resize_table(new_capacity)
+            return
 
-        # Get hash of key. Find hash index. Store initial element
-        hashed = self.get_hash(key)
-        hash_index = hashed % self.get_array().length()
-        initial_element = self.get_array().get_at_index(hash_index)
+        # Only one incremental resize runs at a time
+        self._finish_rehash()
 
-        # Check if element exists
-        if initial_element is None:
-            return None
+        new_capacity = self._round_capacity(new_capacity)
 
-        # Check if element is tombstone
-        elif initial_element is not None and initial_element.is_tombstone is True:
-            return None
+        self._old_buckets = self._buckets
+        self._rehash_index = 0
+        self._buckets = DynamicArray([None] * new_capacity)
+        self._capacity = new_capacity
+        self._tombstones = 0
+        self._used = 0
+        self._max_probe = 0
+        self._mod_count += 1
+
+    def _rehash_some(self, count: int = None) -> None:
+        """
+        Move the live entries in the next few buckets of the old table into the new table
+        :param count: number of old buckets to move, defaults to rehash_step
+        """
+        old_buckets = self._old_buckets
+        end = min(self._rehash_index + (count or self._rehash_step), old_buckets.length())
+
+        for x in range(self._rehash_index, end):
+            old_element = old_buckets.get_at_index(x)
+            if old_element is not None and old_element.is_tombstone is False:
+                self._place(old_element)
 
-        # Check if element exists and key matches
-        elif initial_element is not None and initial_element.key == key:
-            if initial_element.is_tombstone is False:
-                return initial_element.value
+                # Leave a tombstone behind so probes of the old table still pass this slot
+                old_buckets.set_at_index(x, _MOVED)
 
-        # Otherwise, continue probing until key is found
+        self._rehash_index = end
+        if end == old_buckets.length():
+            self._old_buckets = None
+
+    def _finish_rehash(self) -> None:
+        """Move every remaining bucket of an incremental resize"""
+        if self._old_buckets is not None:
+            self._rehash_some(self._old_buckets.length())
+
+    def _find_in(self, array: DynamicArray, key: str, hashed: int) -> HashEntry:
+        """Return the live entry holding key in the given array, or None
+        :param array: DynamicArray to search
+        :param key: key to search for
+        :param hashed: full hash of key
+        :return: HashEntry or None"""
+
+        home = self._bucket_index(hashed, array.length())
+        if self._robin_hood:
+            index = self._robin_hood_find(array, home, key, hashed)
         else:
-            number_buckets = self.get_array().length()
-
-            for j in range(1, number_buckets):
-                probed_index = (hash_index + (j * j)) % number_buckets
-                probed_element = self.get_array().get_at_index(probed_index)
-
-                # Check if key exists at probed element and is tombstone
-                if probed_element is not None and probed_element.key == key:
-                    if probed_element.is_tombstone is False:
-                        return probed_element.value
-                elif probed_element is not None and probed_element.is_tombstone is True:
-                    return None
+            index, _, _ = self._find_slot(array, home, key, hashed)
+        if index == -1:
+            return None
+        return array.get_at_index(index)
+
+    def _find(self, key: str, hashed: int) -> HashEntry:
+        """Return the live entry holding key, or None. During an incremental
+        resize the key may still be in the old table, so both are checked.
+        :param key: key to search for
+        :param hashed: full hash of key
+        :return: HashEntry or None"""
+
+        if self._old_buckets is not None:
+            entry = self._find_in(self._old_buckets, key, hashed)
+            if entry is not None:
+                return entry
+        return self._find_in(self.get_array(), key, hashed)
+
+    def get(self, key: str) -> object:
+        """
+        Return value associated with key
+        :param key: key to find value
+        :return: object of value found
+        """
+
+        entry = self._find_hashed(key, self.get_hash(key))
+        if entry is None:
             return None
+        return entry.value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -289,74 +656,69 @@ class HashMap:
         :return: bool if key is present
         """
 
-        # Check if map is empty
-        if self.get_array().length() == 0:
-            return False
-
-        # Get hash of key. Find hash index. Store initial element
-        hashed = self.get_hash(key)
-        hash_index = hashed % self.get_array().length()
-        initial_element = self.get_array().get_at_index(hash_index)
-
-        # Check if element exists and key matches
-        if initial_element is not None and initial_element.key == key:
-            return True
-
-        # Otherwise, continue probing until key is found
-        else:
-            number_buckets = self.get_array().length()
+        return self._find_hashed(key, self.get_hash(key)) is not None
 
-            for j in range(1, number_buckets):
-                probed_index = (hash_index + (j * j)) % number_buckets
-                probed_element = self.get_array().get_at_index(probed_index)
+    def _find_hashed(self, key: str, hashed: int) -> HashEntry:
+        """Return the live entry holding key, or None, given the key's hash,
+        moving a few buckets first if an incremental resize is running
+        :param key: key to search for
+        :param hashed: full hash of key
+        :return: HashEntry or None"""
 
-                # Check if key exists at probed element
-                if probed_element is not None and probed_element.key == key:
-                    return True
+        if self._old_buckets is not None:
+            self._rehash_some()
 
-            # Otherwise, the key was not found
-            return False
+        return self._find(key, hashed)
 
     def remove(self, key: str) -> None:
         """
         Removes given key and value from hash map
         :param key: key of element to remove
         """
+        self._remove_hashed(key, self.get_hash(key))
 
-        # Get hash of key. Find hash index. Store initial element
-        hashed = self.get_hash(key)
-        hash_index = hashed % self.get_array().length()
-        initial_element = self.get_array().get_at_index(hash_index)
+    def _remove_hashed(self, key: str, hashed: int) -> None:
+        """
+        Removes given key and value from hash map given the key's hash
+        :param key: key of element to remove
+        :param hashed: full hash of key
+        """
 
-        # Check if initial_element does not exist
-        if initial_element is None:
-            return
+        if self._old_buckets is not None:
+            self._rehash_some()
 
-        # Check if initial_element exists and key matches. If so, remove element
-        if initial_element is not None and initial_element.key == key:
-            if initial_element.is_tombstone is False:
-                initial_element.is_tombstone = True
+        if self._old_buckets is not None:
+            # Tombstones in the old table are dropped with it, so they are not counted
+            entry = self._find_in(self._old_buckets, key, hashed)
+            if entry is not None:
+                entry.is_tombstone = True
+                self._size -= 1
+                self._mod_count += 1
+                return
+
+        # Robin Hood tables shift the entries after it back instead
+        array = self.get_array()
+        if self._robin_hood:
+            index = self._robin_hood_find(array, self._bucket_index(hashed, array.length()), key, hashed)
+            if index != -1:
+                self._robin_hood_delete(array, index)
                 self._size -= 1
+                self._used -= 1
+                self._mod_count += 1
             return
 
-        # Otherwise, continue probing until key is found
-        else:
-            number_buckets = self.get_array().length()
-
-            for j in range(1, number_buckets):
-                probed_index = (hash_index + (j * j)) % number_buckets
-                probed_element = self.get_array().get_at_index(probed_index)
-
-                # Check if probed_element does not exist
-                if probed_element is None:
-                    return
+        # Leave a tombstone so later probe sequences stay intact
+        entry = self._find_in(array, key, hashed)
+        if entry is not None:
+            entry.is_tombstone = True
+            self._size -= 1
+            self._tombstones += 1
+            self._mod_count += 1
 
-                # If key found, remove element at probed_index
-                elif probed_element is not None and probed_element.key == key:
-                    if probed_element.is_tombstone is False:
-                        self.get_array().get_at_index(probed_index).is_tombstone = True
-                        self._size -= 1
-                    return
+            # Too many tombstones make probe sequences long even at a low load,
+            # so rehash at the same capacity to clear them out
+            if self._tombstones > self._tombstone_limit * self.get_capacity():
+                self.resize_table(self.get_capacity())
 
     def clear(self) -> None:
         """
@@ -371,6 +733,13 @@ class HashMap:
 
         # Decrement size
         self._size -= self.get_size()
+        self._tombstones = 0
+        self._used = 0
+        self._max_probe = 0
+        self._mod_count += 1
+
+        # Drop any table an incremental resize was moving out of
+        self._old_buckets = None
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -378,19 +747,264 @@ class HashMap:
         :return: DynamicArray object of key/value tuples
         """
 
-        array_length = self.get_array().length()
-
         # Create return array
         keys_values = DynamicArray()
 
+        # Include the old table while an incremental resize is running
+        arrays = [self.get_array()]
+        if self._old_buckets is not None:
+            arrays.append(self._old_buckets)
+
         # For each element in hash map, append tuple of its key and value to keys_values
-        for x in range(array_length):
-            element = self.get_array().get_at_index(x)
-            if element is not None and element.is_tombstone is False:
-                keys_values.append((element.key, element.value))
+        for array in arrays:
+            for x in range(array.length()):
+                element = array.get_at_index(x)
+                if element is not None and element.is_tombstone is False:
+                    keys_values.append((element.key, element.value))
 
         return keys_values
 
+    def _entries(self):
+        """
+        Yield every live entry, finishing any incremental resize first.
+        Raise RuntimeError if the map is modified before the walk ends.
+        """
+        self._finish_rehash()
+        mod_count = self._mod_count
+        array = self.get_array()
+        for x in range(array.length()):
+            entry = array.get_at_index(x)
+            if entry is not None and entry.is_tombstone is False:
+                yield entry
+                if self._mod_count != mod_count:
+                    raise RuntimeError("HashMap changed during iteration")
+
+    def keys(self):
+        """
+        Return a generator over the keys, without copying them
+        :return: generator of keys
+        """
+        return (entry.key for entry in self._entries())
+
+    def values(self):
+        """
+        Return a generator over the values, without copying them
+        :return: generator of values
+        """
+        return (entry.value for entry in self._entries())
+
+    def items(self):
+        """
+        Return a generator over the (key, value) pairs, without copying them
+        :return: generator of tuples
+        """
+        return ((entry.key, entry.value) for entry in self._entries())
+
+    def __iter__(self):
+        """Iterate over the keys, like a dict"""
+        return self.keys()
+
+    def __len__(self) -> int:
+        """Return size of map"""
+        return self.get_size()
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if key is in hash map"""
+        return self.contains_key(key)
+
+    def __getitem__(self, key: str) -> object:
+        """
+        Return value associated with key
+        :param key: key to find value
+        :return: key's value
+        :raises KeyError: if key is not in hash map
+        """
+        entry = self._find_hashed(key, self.get_hash(key))
+        if entry is None:
+            raise KeyError(key)
+        return entry.value
+
+    def _hash_many(self, keys: list) -> list:
+        """Hash a batch of keys, using the vectorized hash function when available
+        :param keys: list of keys
+        :return: list of int hashes"""
+
+        hashes = batch_hash(self._hash_function, keys)
+        if hashes is None:
+            hash_function = self._hash_function
+            hashes = [hash_function(key) for key in keys]
+        if self._power_of_two:
+            hashes = [fibonacci_mix(hashed) for hashed in hashes]
+        return hashes
+
+    def put_many(self, pairs) -> None:
+        """
+        Update every key/value pair from an iterable, growing the table
+        at most once for the whole batch
+        :param pairs: DynamicArray or iterable of (key, value) tuples
+        """
+        self._finish_rehash()
+        pairs = as_list(pairs)
+
+        # Grow once so the load stays under max_load even if every key is new
+        capacity = self.get_capacity()
+        while self.get_size() + len(pairs) >= capacity * self._max_load:
+            capacity = self._grow_capacity(capacity)
+        if capacity != self.get_capacity():
+            self.resize_table(capacity)
+
+        # Hash the whole batch up front and hoist lookups out of the loop;
+        # no load check is needed per pair
+        hashes = self._hash_many([pair[0] for pair in pairs])
+        probe = self.probe
+        bucket_index = self._bucket_index
+        array = self.get_array()
+        array_size = array.length()
+        added = 0
+
+        for (key, value), hashed in zip(pairs, hashes):
+            if probe(array, bucket_index(hashed, array_size), key, value, hashed) is True:
+                added += 1
+
+        self._size += added
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Return the value of every key, or None for missing keys
+        :param keys: DynamicArray or iterable of keys
+        :return: DynamicArray of values in the same order as keys
+        """
+        keys = as_list(keys)
+        return self._get_many_hashed(keys, self._hash_many(keys))
+
+    def _get_many_hashed(self, keys: list, hashes: list) -> DynamicArray:
+        """
+        Return the value of every key given the keys' hashes
+        :param keys: list of keys
+        :param hashes: list of full hashes, in the same order
+        :return: DynamicArray of values in the same order as keys
+        """
+        find = self._find
+        values = []
+
+        for key, hashed in zip(keys, hashes):
+            entry = find(key, hashed)
+            values.append(entry.value if entry is not None else None)
+
+        return DynamicArray(values)
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Return whether each key is in the hash map
+        :param keys: DynamicArray or iterable of keys
+        :return: DynamicArray of bools in the same order as keys
+        """
+        keys = as_list(keys)
+        return self._contains_many_hashed(keys, self._hash_many(keys))
+
+    def _contains_many_hashed(self, keys: list, hashes: list) -> DynamicArray:
+        """
+        Return whether each key is in the hash map given the keys' hashes
+        :param keys: list of keys
+        :param hashes: list of full hashes, in the same order
+        :return: DynamicArray of bools in the same order as keys
+        """
+        find = self._find
+        return DynamicArray([find(key, hashed) is not None
+                             for key, hashed in zip(keys, hashes)])
+
+    def remove_many(self, keys) -> None:
+        """
+        Remove every given key
+        :param keys: DynamicArray or iterable of keys
+        """
+        keys = as_list(keys)
+        self._remove_many_hashed(keys, self._hash_many(keys))
+
+    def _remove_many_hashed(self, keys: list, hashes: list) -> None:
+        """
+        Remove every given key given the keys' hashes
+        :param keys: list of keys
+        :param hashes: list of full hashes, in the same order
+        """
+        remove_hashed = self._remove_hashed
+        for key, hashed in zip(keys, hashes):
+            remove_hashed(key, hashed)
+
+    def update(self, other) -> None:
+        """
+        Put every key/value pair of another map, replacing existing values.
+        The table grows at most once, and when other is a HashMap hashing
+        keys the same way its cached hashes are reused.
+        :param other: HashMap of either kind, dict or other object with items()
+        """
+        self._put_hashed_items(self._hashed_items_of(other), len(other))
+
+    def merge(self, other, combine_fn: callable) -> None:
+        """
+        Put every key/value pair of another map, combining values of keys
+        present in both, for example with operator.add to sum counters
+        :param other: HashMap of either kind, dict or other object with items()
+        :param combine_fn: function of (value in this map, value in other)
+                           returning the merged value
+        """
+        self._put_hashed_items(self._hashed_items_of(other), len(other), combine_fn)
+
+    def _hashed_items(self):
+        """
+        Yield (key, value, hash) for every live entry, for another map to reuse
+        :return: generator of tuples
+        """
+        return ((entry.key, entry.value, entry.hash_code) for entry in self._entries())
+
+    def _hashed_items_of(self, other):
+        """
+        Return (key, value, hash) for every pair of other, taking the hashes
+        from other when it hashes keys exactly as this map does
+        :param other: HashMap of either kind, dict or other object with items()
+        :return: iterator of tuples
+        """
+        if (hasattr(other, '_hashed_items') and other._hash_function is self._hash_function
+                and other._power_of_two == self._power_of_two):
+            return other._hashed_items()
+        get_hash = self.get_hash
+        return ((key, value, get_hash(key)) for key, value in other.items())
+
+    def _put_hashed_items(self, triples, count: int, combine_fn: callable = None) -> None:
+        """
+        Put (key, value, hash) tuples, growing the table at most once
+        :param triples: iterable of (key, value, hash) tuples with distinct keys
+        :param count: int of tuples, used to size the table
+        :param combine_fn: function merging the existing and new value of a
+                           key, None to replace the value
+        """
+        self._finish_rehash()
+
+        # Grow once so the load stays under max_load even if every key is new
+        capacity = self.get_capacity()
+        while self.get_size() + count >= capacity * self._max_load:
+            capacity = self._grow_capacity(capacity)
+        if capacity != self.get_capacity():
+            self.resize_table(capacity)
+
+        probe = self.probe
+        find_in = self._find_in
+        bucket_index = self._bucket_index
+        array = self.get_array()
+        array_size = array.length()
+        added = 0
+
+        for key, value, hashed in triples:
+            if combine_fn is not None:
+                entry = find_in(array, key, hashed)
+                if entry is not None:
+                    entry.value = combine_fn(entry.value, value)
+                    continue
+            if probe(array, bucket_index(hashed, array_size), key, value, hashed) is True:
+                added += 1
+
+        self._size += added
+
 
 # ------------------- BASIC TESTING ---------------------------------------- #
 
@@ -585,3 +1199,122 @@ if __name__ == "__main__":
     m.remove('1')
     m.resize_table(12)
     print(m.get_keys_and_values())
+
+    print("\nTombstone compaction example")
+    print("----------------------------")
+    m = HashMap(101, hash_function_2)
+    for i in range(2000):
+        m.put('session' + str(i), i)
+        if i >= 40:
+            m.remove('session' + str(i - 40))
+        if i % 400 == 399:
+            print(m.get_size(), m.tombstone_count(), m.empty_buckets(), m.get_capacity())
+
+    print("\nRobin Hood example")
+    print("------------------")
+    from hash_functions import fnv1a_hash
+    keys = ['user' + str(i) for i in range(5000)]
+    for robin_hood, max_load in ((False, 0.5), (True, 0.5), (True, 0.9)):
+        m = HashMap(11, fnv1a_hash, max_load=max_load, robin_hood=robin_hood)
+        m.put_many((key, None) for key in keys)
+        lengths = sorted(m.probe_length(key) for key in keys)
+        print(robin_hood, max_load, round(m.table_load(), 2), m.get_capacity(),
+              round(sum(lengths) / len(lengths), 2), lengths[len(lengths) * 99 // 100], lengths[-1])
+
+    print("\nStatistics example")
+    print("------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(100):
+        m.put('str' + str(i), i)
+    print(m.stats())
+    for i in range(0, 100, 2):
+        m.remove('str' + str(i))
+    print(m.stats())
+    print(m.stats().empty_buckets == m.empty_buckets(), round(m.stats().table_load(), 2))
+
+    # Polling the counters leaves an incremental resize where it is
+    m = HashMap(11, hash_function_2, incremental_resize=True, rehash_step=1)
+    i = 0
+    while m._old_buckets is None:
+        m.put('str' + str(i), i)
+        i += 1
+    print(m.stats(), m.empty_buckets(), m._old_buckets is not None)
+
+    print("\nIteration example")
+    print("-----------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(5):
+        m.put('key' + str(i), i * 10)
+    print(len(m), 'key3' in m, 'key9' in m, m['key3'], sorted(m), sorted(m.values()))
+    try:
+        m['key9']
+    except KeyError as error:
+        print("KeyError:", error)
+    try:
+        for key in m:
+            m.remove(key)
+    except RuntimeError as error:
+        print("RuntimeError:", error, len(m))
+
+    print("\nupdate / merge example")
+    print("----------------------")
+    from operator import add
+    m = HashMap(11, hash_function_2)
+    partition = HashMap(11, hash_function_2)
+    for i in range(6):
+        m.put('key' + str(i), 1)
+        partition.put('key' + str(i + 3), 10)
+    m.merge(partition, add)
+    print(sorted(m.items()))
+    m.update({'key0': 0, 'new': 5})
+    print(sorted(m.items()), m.get_size())
+
+    print("\nPower-of-two example")
+    print("--------------------")
+    for power_of_two in (False, True):
+        m = HashMap(8, hash_function_1, power_of_two=power_of_two)
+        capacities = [m.get_capacity()]
+        for i in range(500):
+            m.put('str' + str(i), i)
+            if m.get_capacity() != capacities[-1]:
+                capacities.append(m.get_capacity())
+        lengths = [m.probe_length('str' + str(i)) for i in range(500)]
+        print(power_of_two, capacities, round(sum(lengths) / len(lengths), 2), max(lengths))
+
+    print("\nFull probe sequence example")
+    print("---------------------------")
+    # Calling probe directly skips put's load check, so the table fills up.
+    # Once a key's probe sequence reaches no free slot the table grows
+    # instead of the write being dropped.
+    m = HashMap(7, hash_function_1)
+    inserted = []
+    for i in range(10):
+        key = 'key' + str(i)
+        hashed = m.get_hash(key)
+        inserted.append(m.probe(m.get_array(), m._bucket_index(hashed, m.get_capacity()), key, i, hashed))
+        m._size += inserted[-1]
+    print(inserted.count(True), m.get_capacity(), all(m.get('key' + str(i)) == i for i in range(10)))
+
+    from hash_map_checks import compare_during_rehash, print_dict_comparison
+
+    print("\nMixed operations during an incremental resize")
+    print("---------------------------------------------")
+    for seed, (robin_hood, probing) in enumerate(((False, 'quadratic'), (True, 'linear'), (False, 'double'))):
+        m = HashMap(53, hash_function_2, incremental_resize=True, rehash_step=1,
+                    robin_hood=robin_hood, probing=probing)
+        print(probing, robin_hood, *compare_during_rehash(m, seed))
+
+    def random_map(rng):
+        """Build a map with a random probe strategy and resizing mode"""
+        robin_hood = rng.random() < 0.5
+        probing = 'linear' if robin_hood else rng.choice(['quadratic', 'linear', 'triangular', 'double'])
+        return HashMap(rng.choice([3, 11, 53]), rng.choice([hash_function_1, hash_function_2]),
+                       incremental_resize=rng.random() < 0.5, rehash_step=rng.choice([1, 4]),
+                       max_load=0.5 if probing == 'quadratic' else rng.choice([0.5, 0.9]),
+                       robin_hood=robin_hood, probing=probing,
+                       power_of_two=probing != 'quadratic' and rng.random() < 0.5)
+
+    # Checking the slot counts only between resizes leaves the old and new
+    # tables of an incremental resize as they are
+    print_dict_comparison(random_map, check=lambda m: m._old_buckets is not None or (
+        m.tombstone_count() + m.get_size() + m.empty_buckets() == m.get_capacity()))
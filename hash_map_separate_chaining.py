@@ -9,29 +9,186 @@
 # resize_table, table_load, get_keys, and find_mode.
 
 
-from a6_include import (DynamicArray, LinkedList,
+from bisect import bisect_left, bisect_right
+
+from a6_include import (DynamicArray, LinkedList, SLNode,
                         hash_function_1, hash_function_2)
+from collection_utils import as_list, iter_items
+from hash_diagnostics import HashMapStats
+from hash_functions import batch_hash, fibonacci_mix
+from primes import grow_capacity, is_prime, next_power_of_two, next_prime, shrink_capacity
+
+
+# A chain longer than TREEIFY_THRESHOLD becomes a TreeBucket with O(log n)
+# lookups, and turns back into a LinkedList once it is no longer than
+# UNTREEIFY_THRESHOLD. The gap stops a bucket flipping on every put/remove.
+TREEIFY_THRESHOLD = 8
+UNTREEIFY_THRESHOLD = 6
+
+
+# Keys of one of these types can be sorted among themselves, so a
+# TreeBucket whose keys all share one of them orders equal hashes by key
+_ORDERED_KEY_TYPES = (str, bytes, int)
+
+
+class TreeBucket:
+    """
+    Bucket keeping its nodes in a sorted array for binary search,
+    used in place of a LinkedList once a chain grows long.
+    Nodes are ordered by hash, and by key among equal hashes while every
+    key has the same str, bytes or int type. Other keys, such as a mix of
+    types or frozensets, are compared with == across the run of equal
+    hashes instead, as Java does for keys that are not Comparable.
+    Supported methods match LinkedList: insert, remove, contains, length, iterator
+    """
+
+    def __init__(self, nodes=()) -> None:
+        """Initialize the bucket from an iterable of SLNodes with cached hashes."""
+        nodes = list(nodes)
+        key_types = {type(node.key) for node in nodes}
+        self._key_type = key_types.pop() if len(key_types) == 1 else None
+        if self._key_type in _ORDERED_KEY_TYPES:
+            self._nodes = sorted(nodes, key=lambda node: (node.hash_code, node.key))
+            self._index = [(node.hash_code, node.key) for node in self._nodes]
+        else:
+            self._key_type = None
+            self._nodes = sorted(nodes, key=lambda node: node.hash_code)
+            self._index = [(node.hash_code,) for node in self._nodes]
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'TREE [' + ' -> '.join(str(node) for node in self._nodes) + ']'
+
+    def __iter__(self):
+        """Return an iterator over the nodes in sorted order."""
+        return iter(self._nodes)
+
+    def _position(self, key: str, hash_code: int) -> int:
+        """Return the index of the node with matching key, or -1."""
+        index = self._index
+        if type(key) is self._key_type:
+            position = bisect_left(index, (hash_code, key))
+            if position < len(index) and index[position] == (hash_code, key):
+                return position
+            return -1
+
+        # (hash_code,) sorts before every entry with that hash
+        nodes = self._nodes
+        for position in range(bisect_left(index, (hash_code,)), len(index)):
+            if index[position][0] != hash_code:
+                break
+            if nodes[position].key == key:
+                return position
+        return -1
+
+    def insert(self, key: str, value: object, hash_code: int) -> None:
+        """Insert new node in sorted position."""
+        if self._key_type is not None and type(key) is not self._key_type:
+            # Keys of another type cannot be ordered against the others,
+            # so from now on only the hashes are
+            self._key_type = None
+            self._index = [(hashed,) for hashed, _ in self._index]
+
+        if self._key_type is None:
+            entry = (hash_code,)
+            position = bisect_right(self._index, entry)
+        else:
+            entry = (hash_code, key)
+            position = bisect_left(self._index, entry)
+        self._index.insert(position, entry)
+        self._nodes.insert(position, SLNode(key, value, None, hash_code))
+
+    def remove(self, key: str, hash_code: int) -> bool:
+        """
+        Remove node with matching key.
+        Return True if removal was successful, False otherwise.
+        """
+        position = self._position(key, hash_code)
+        if position == -1:
+            return False
+        del self._index[position]
+        del self._nodes[position]
+        return True
+
+    def contains(self, key: str, hash_code: int) -> SLNode:
+        """Return node with matching key, or None if no match."""
+        position = self._position(key, hash_code)
+        return self._nodes[position] if position != -1 else None
+
+    def length(self) -> int:
+        """Return the number of nodes in the bucket."""
+        return len(self._nodes)
 
 
 class HashMap:
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 max_load: float = 1.0,
+                 min_load: float = 0.0,
+                 incremental_resize: bool = False,
+                 rehash_step: int = 4,
+                 power_of_two: bool = False) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        :param capacity: initial number of buckets, rounded up to a prime
+                         or to a power of two
+        :param function: hash function applied to keys
+        :param max_load: load factor above which put doubles the table
+        :param min_load: load factor below which remove halves the table,
+                         0 disables shrinking
+        :param incremental_resize: when True, automatic resizes move the
+                                   entries over a little at a time instead of
+                                   all at once
+        :param rehash_step: number of old buckets moved by each put, get,
+                            contains_key and remove during an incremental resize
+        :param power_of_two: when True, keep the capacity a power of two, mix
+                             each hash with fibonacci_mix and pick buckets with
+                             a bit mask instead of a remainder
         """
-        self._buckets = DynamicArray()
+        # Shrinking must leave the table below max_load and growing must leave
+        # it above min_load, otherwise the table would flip between two sizes
+        if max_load <= 0:
+            raise ValueError("max_load must be positive")
+        if min_load < 0 or min_load * 2 >= max_load:
+            raise ValueError("min_load must be at least 0 and less than half of max_load")
+        if rehash_step < 1:
+            raise ValueError("rehash_step must be at least 1")
+
+        self._power_of_two = power_of_two
+
+        # capacity must be a prime number, or a power of two in power-of-two mode
+        if self._power_of_two:
+            self._capacity = next_power_of_two(capacity)
+        else:
+            self._capacity = self._next_prime(capacity)
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        # Buckets stay None until their first insert, and _empty counts
+        # the empty buckets of the current table. _max_chain is the longest
+        # chain the current table has had.
+        self._buckets = DynamicArray([None] * self._capacity)
+        self._empty = self._capacity
+        self._max_chain = 0
+
+        # Bumped by every insert, removal, resize and clear so iterators can
+        # detect that the map changed under them
+        self._mod_count = 0
 
         self._hash_function = function
         self._size = 0
 
+        self._max_load = max_load
+        self._min_load = min_load
+        self._min_capacity = self._capacity
+
+        # During an incremental resize the old table stays here until every
+        # bucket below _rehash_index has been moved into _buckets
+        self._incremental_resize = incremental_resize
+        self._rehash_step = rehash_step
+        self._old_buckets = None
+        self._rehash_index = 0
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -44,36 +201,43 @@ class HashMap:
 
     def _next_prime(self, capacity: int) -> int:
         """
-        Increment from given number and the find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Increment from given number to find the closest prime number
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
+        return next_prime(capacity)
 
     @staticmethod
     def _is_prime(capacity: int) -> bool:
         """
         Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity == 2 or capacity == 3:
-            return True
+        return is_prime(capacity)
 
-        if capacity == 1 or capacity % 2 == 0:
-            return False
+    def _round_capacity(self, capacity: int) -> int:
+        """
+        Round a capacity up to a prime, or to a power of two in power-of-two mode
+        """
+        if self._power_of_two:
+            return next_power_of_two(capacity)
+        if self._is_prime(capacity) is False:
+            return self._next_prime(capacity)
+        return capacity
 
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
+    def _grow_capacity(self, capacity: int) -> int:
+        """
+        Return the capacity to grow a table to: exactly double in
+        power-of-two mode, otherwise the first prime past double
+        """
+        if self._power_of_two:
+            return capacity * 2
+        return grow_capacity(capacity)
 
-        return True
+    def _shrink_capacity(self, capacity: int) -> int:
+        """
+        Return the capacity to shrink a table to, undoing one _grow_capacity step
+        """
+        if self._power_of_two:
+            return capacity // 2
+        return shrink_capacity(capacity)
 
     def get_size(self) -> int:
         """
@@ -101,17 +265,39 @@ class HashMap:
         return self._buckets
 
     def get_hash(self, key: str) -> int:
-        """Hash a key
+        """Hash a key, mixing the hash in power-of-two mode
         :param key: string of key to hash
         :return: int of index"""
+        if self._power_of_two:
+            return fibonacci_mix(self._hash_function(key))
         return self._hash_function(key)
 
+    def _bucket_index(self, hashed: int, number_buckets: int) -> int:
+        """Return the bucket a hash falls in
+        :param hashed: hash from get_hash
+        :param number_buckets: int of buckets in the table
+        :return: int of index"""
+        if self._power_of_two:
+            return hashed & (number_buckets - 1)
+        return hashed % number_buckets
+
+    def _bucket_indices(self, hashes: list, number_buckets: int) -> list:
+        """Return the bucket of every hash in a batch
+        :param hashes: list of hashes from get_hash or _hash_many
+        :param number_buckets: int of buckets in the table
+        :return: list of int indices"""
+        if self._power_of_two:
+            mask = number_buckets - 1
+            return [hashed & mask for hashed in hashes]
+        return [hashed % number_buckets for hashed in hashes]
+
     def get_linked_list(self, key: str) -> LinkedList:
         """Get linked list at key
         :param key: string of key to hash
-        :param return: LinkedList object at that index"""
+        :param return: LinkedList object at that index, or None if the
+                       bucket is empty"""
 
-        index = self.get_hash(key) % self.get_buckets().length()
+        index = self._bucket_index(self.get_hash(key), self.get_buckets().length())
         return self.get_buckets().get_at_index(index)
 
     def put(self, key: str, value: object) -> None:
@@ -120,41 +306,204 @@ class HashMap:
         :param key: key of new element
         :param value: value of new element
         """
+        self._put_hashed(key, self.get_hash(key), value)
 
-        # Initialize array size and index
-        array_size = self.get_buckets().length()
-        index = self.get_hash(key) % array_size
+    def _put_hashed(self, key: str, hashed: int, value: object) -> None:
+        """
+        Update key/value pair in hash map given the key's hash
+        :param key: key of new element
+        :param hashed: hash of key
+        :param value: value of new element
+        """
+        if self._old_buckets is not None:
+            self._rehash_some()
 
-        # Get linked list object at that dynamic array index
-        linked_list = self.get_buckets().get_at_index(index)
-        # Find if value already exists at that key
-        if linked_list.contains(key) is not None:
+        # Find if value already exists at that key, in either table
+        node = self._find_node(key, hashed)
+        if node is not None:
             # Replace value
-            linked_list.contains(key).value = value
+            node.value = value
             return
 
         # If key is not in hash map, add new key/value pair
         else:
-            linked_list.insert(key, value)
+            self._insert_new(self._bucket_index(hashed, self.get_buckets().length()), key, value, hashed)
             self.change_size(1)
 
-    def empty_buckets(self) -> int:
+        # Double the table once the load factor passes max_load
+        if self.table_load() > self._max_load:
+            self._resize(self._grow_capacity(self.get_capacity()))
+
+    def _find_node(self, key: str, hashed: int) -> SLNode:
         """
-        Return number of empty buckets in hash table
-        :return: int of empty buckets
+        Return node holding key, or None. During an incremental resize
+        the key may still be in the old table, so both are checked.
+        :param key: key to find
+        :param hashed: hash of key
+        :return: SLNode or None
+        """
+        if self._old_buckets is not None:
+            old_buckets = self._old_buckets
+            linked_list = old_buckets.get_at_index(self._bucket_index(hashed, old_buckets.length()))
+            if linked_list is not None:
+                node = linked_list.contains(key, hashed)
+                if node is not None:
+                    return node
+
+        buckets = self.get_buckets()
+        linked_list = buckets.get_at_index(self._bucket_index(hashed, buckets.length()))
+        return linked_list.contains(key, hashed) if linked_list is not None else None
+
+    def _insert_new(self, index: int, key: str, value: object, hashed: int) -> None:
+        """
+        Insert a key that is not in the table yet into the current table,
+        creating its bucket on first use
+        :param index: int of bucket index
+        :param key: key of new element
+        :param value: value of new element
+        :param hashed: hash of key
+        """
+        self._mod_count += 1
+        buckets = self._buckets
+        linked_list = buckets.get_at_index(index)
+        if linked_list is None:
+            linked_list = LinkedList()
+            buckets.set_at_index(index, linked_list)
+            self._empty -= 1
+        linked_list.insert(key, value, hashed)
+        if linked_list.length() > self._max_chain:
+            self._max_chain = linked_list.length()
+        self._treeify_bucket(buckets, index)
+
+    def _remove_from(self, buckets: DynamicArray, index: int, key: str, hashed: int) -> bool:
         """
+        Remove key from the bucket at index, dropping the bucket once it is empty
+        :param buckets: current or old DynamicArray of buckets
+        :param index: int of bucket index
+        :param key: key of element to remove
+        :param hashed: hash of key
+        :return: True if key was removed
+        """
+        linked_list = buckets.get_at_index(index)
+        if linked_list is None or not linked_list.remove(key, hashed):
+            return False
+        self._mod_count += 1
+
+        if linked_list.length() == 0:
+            buckets.set_at_index(index, None)
+            if buckets is self._buckets:
+                self._empty += 1
+        else:
+            self._untreeify_bucket(buckets, index)
+        return True
+
+    def _resize(self, new_capacity: int) -> None:
+        """
+        Resize the table automatically, all at once or incrementally
+        :param new_capacity: int of new hash table capacity
+        """
+        if not self._incremental_resize:
+            self.resize_table(new_capacity)
+            return
+
+        # Only one incremental resize runs at a time
+        self._finish_rehash()
+
+        new_capacity = self._round_capacity(new_capacity)
+
+        self._mod_count += 1
+        self._old_buckets = self._buckets
+        self._rehash_index = 0
+        self._buckets = DynamicArray([None] * new_capacity)
+        self._capacity = new_capacity
+        self._empty = new_capacity
+        self._max_chain = 0
 
-        # Initialize array size and return variable
+    def _rehash_some(self, count: int = None) -> None:
+        """
+        Move the next few buckets of the old table into the new table
+        :param count: number of old buckets to move, defaults to rehash_step
+        """
+        old_buckets = self._old_buckets
         array_size = self.get_buckets().length()
-        empty = 0
+        bucket_index = self._bucket_index
+        end = min(self._rehash_index + (count or self._rehash_step), old_buckets.length())
 
-        # Iterate through dynamic array
-        # If linked list length is 0, increment return variable
-        for x in range(array_size):
-            if self.get_buckets().get_at_index(x).length() == 0:
-                empty += 1
+        for x in range(self._rehash_index, end):
+            linked_list = old_buckets.get_at_index(x)
+            if linked_list is not None:
+                for node in linked_list:
+                    index = bucket_index(node.hash_code, array_size)
+                    self._insert_new(index, node.key, node.value, node.hash_code)
+                old_buckets.set_at_index(x, None)
+
+        self._rehash_index = end
+        if end == old_buckets.length():
+            self._old_buckets = None
+
+    def _finish_rehash(self) -> None:
+        """Move every remaining bucket of an incremental resize"""
+        if self._old_buckets is not None:
+            self._rehash_some(self._old_buckets.length())
+
+    @staticmethod
+    def _treeify_bucket(buckets: DynamicArray, index: int) -> None:
+        """
+        Replace the chain at index with a TreeBucket once it passes TREEIFY_THRESHOLD
+        :param buckets: DynamicArray holding the bucket
+        :param index: int of bucket index
+        """
+        bucket = buckets.get_at_index(index)
+        if bucket.length() > TREEIFY_THRESHOLD and not isinstance(bucket, TreeBucket):
+            buckets.set_at_index(index, TreeBucket(bucket))
+
+    @staticmethod
+    def _untreeify_bucket(buckets: DynamicArray, index: int) -> None:
+        """
+        Replace the TreeBucket at index with a LinkedList once it shrinks
+        to UNTREEIFY_THRESHOLD
+        :param buckets: DynamicArray holding the bucket
+        :param index: int of bucket index
+        """
+        bucket = buckets.get_at_index(index)
+        if isinstance(bucket, TreeBucket) and bucket.length() <= UNTREEIFY_THRESHOLD:
+            linked_list = LinkedList()
+            for node in bucket:
+                linked_list.insert(node.key, node.value, node.hash_code)
+            buckets.set_at_index(index, linked_list)
+
+    def treeified_buckets(self) -> int:
+        """
+        Return number of buckets currently stored as a TreeBucket,
+        in both tables during an incremental resize
+        :return: int of treeified buckets
+        """
+        tables = [self.get_buckets()]
+        if self._old_buckets is not None:
+            tables.append(self._old_buckets)
+        return sum(1 for buckets in tables for x in range(buckets.length())
+                   if isinstance(buckets.get_at_index(x), TreeBucket))
+
+    def empty_buckets(self) -> int:
+        """
+        Return number of empty buckets in hash table. During an incremental
+        resize this is the new table, which is still filling up.
+        :return: int of empty buckets
+        """
+
+        # Buckets are created and dropped with their first and last entry,
+        # and moving entries over inserts them like any other put, so the
+        # count is kept as the table changes
+        return self._empty
 
-        return empty
+    def stats(self) -> HashMapStats:
+        """
+        Return the maintained counters without touching the table. During an
+        incremental resize they describe the new table, which is still filling up.
+        :return: HashMapStats
+        """
+        return HashMapStats(self.get_capacity(), self.get_size(), self._empty,
+                            max_chain_length=self._max_chain)
 
     def table_load(self) -> float:
         """
@@ -177,11 +526,20 @@ class HashMap:
 
         # Iterate through dynamic array. Check if there are non-empty linked lists
         for x in range(array_size):
-            linked_list_length = self.get_buckets().get_at_index(x).length()
-            if linked_list_length != 0:
-                # Decrement size and clear linked list
-                self.change_size(-1 * linked_list_length)
-                self.get_buckets().set_at_index(x, LinkedList())
+            linked_list = self.get_buckets().get_at_index(x)
+            if linked_list is not None:
+                # Decrement size and drop linked list
+                self.change_size(-1 * linked_list.length())
+                self.get_buckets().set_at_index(x, None)
+        self._empty = array_size
+        self._max_chain = 0
+        self._mod_count += 1
+
+        # Drop any table an incremental resize was moving out of,
+        # along with the entries still in it
+        if self._old_buckets is not None:
+            self._old_buckets = None
+            self._size = 0
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -193,33 +551,32 @@ class HashMap:
         if new_capacity < 1:
             return
 
-        # Check if new_capacity is prime
-        if self._is_prime(new_capacity) is False:
-            new_capacity = self._next_prime(new_capacity)
+        # Finish any incremental resize so every entry is in one table
+        self._finish_rehash()
 
-        # Create new dynamic array with desired capacity
-        resized_array = DynamicArray()
-        for x in range(new_capacity):
-            resized_array.append(LinkedList())
+        # Check if new_capacity is prime (or a power of two)
+        new_capacity = self._round_capacity(new_capacity)
 
-        # Populate new dynamic array with items
-        array_length = self.get_buckets().length()
+        # Swap in a new dynamic array with desired capacity; its buckets
+        # are created as the entries arrive
+        self._mod_count += 1
+        old_buckets = self.get_buckets()
+        self._buckets = DynamicArray([None] * new_capacity)
+        self._capacity = new_capacity
+        self._empty = new_capacity
+        self._max_chain = 0
 
-        for x in range(array_length):
-            linked_list = self.get_buckets().get_at_index(x)
-            if linked_list.length() != 0:
+        # Populate new dynamic array with items
+        for x in range(old_buckets.length()):
+            linked_list = old_buckets.get_at_index(x)
+            if linked_list is not None:
 
-                # Rehash hash table links
+                # Rehash hash table links using each node's cached hash
                 for node in linked_list:
-                    key = node.key
-                    index = self.get_hash(key) % resized_array.length()
+                    index = self._bucket_index(node.hash_code, new_capacity)
 
                     # Insert node into rehashed key index
-                    resized_array.get_at_index(index).insert(key, node.value)
-
-        # Reassign hashmap's data
-        self._buckets = resized_array
-        self._capacity = new_capacity
+                    self._insert_new(index, node.key, node.value, node.hash_code)
 
     def get(self, key: str) -> object:
         """
@@ -228,13 +585,10 @@ class HashMap:
         :return: key's value
         """
 
-        # Get linked list at index
-        linked_list = self.get_linked_list(key)
-
-        # If key matches, return the element's value
-        for link in linked_list:
-            if link.key == key:
-                return link.value
+        # If hash and key match, return the element's value
+        node = self._find_hashed(key, self.get_hash(key))
+        if node is not None:
+            return node.value
 
         # If key not in hash map, return None
         return None
@@ -246,33 +600,70 @@ class HashMap:
         :return: bool whether key is present
         """
 
-        # Get linked list at index
-        linked_list = self.get_linked_list(key)
+        # If hash and key match, return True
+        return self._find_hashed(key, self.get_hash(key)) is not None
 
-        # If key matches, return True
-        for link in linked_list:
-            if link.key == key:
-                return True
+    def _find_hashed(self, key: str, hashed: int) -> SLNode:
+        """
+        Return node holding key, or None, given the key's hash, moving a
+        few buckets first if an incremental resize is running
+        :param key: key to find
+        :param hashed: hash from get_hash
+        :return: SLNode or None
+        """
+        if self._old_buckets is not None:
+            self._rehash_some()
 
-        # If key not in hash map, return False
-        return False
+        return self._find_node(key, hashed)
 
     def remove(self, key: str) -> None:
         """
         Remove given key and value from hash map
         :param key: key of element to remove
         """
+        self._remove_hashed(key, self.get_hash(key))
+
+    def _remove_hashed(self, key: str, hashed: int) -> None:
+        """
+        Remove given key and value from hash map given the key's hash
+        :param key: key of element to remove
+        :param hashed: hash from get_hash
+        """
+
+        if self._old_buckets is not None:
+            self._rehash_some()
+
+        # Get linked list at index, trying the old table first during an incremental resize
+        removed = False
+        if self._old_buckets is not None:
+            old_buckets = self._old_buckets
+            removed = self._remove_from(old_buckets, self._bucket_index(hashed, old_buckets.length()), key, hashed)
+        if not removed:
+            buckets = self.get_buckets()
+            removed = self._remove_from(buckets, self._bucket_index(hashed, buckets.length()), key, hashed)
 
-        # Get linked list at index
-        linked_list = self.get_linked_list(key)
+        # If hash and key match, remove
+        if removed:
 
-        # If key matches, remove
-        for link in linked_list:
-            if link.key == key:
-                linked_list.remove(key)
+            # Decrement hash map size
+            self.change_size(-1)
+            self._shrink_if_sparse()
 
-                # Decrement hash map size
-                self.change_size(-1)
+    def _shrink_if_sparse(self) -> None:
+        """
+        Halve the table while the load factor is below min_load,
+        never going below the capacity the map was created with,
+        then resize once
+        """
+        if self._min_load == 0:
+            return
+
+        capacity = self.get_capacity()
+        while capacity > self._min_capacity and self.get_size() < capacity * self._min_load:
+            capacity = max(self._shrink_capacity(capacity), self._min_capacity)
+
+        if capacity != self.get_capacity():
+            self._resize(capacity)
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -283,18 +674,289 @@ class HashMap:
         # Create keys and values array
         keys_and_values = DynamicArray()
 
+        # Include the old table while an incremental resize is running
+        tables = [self.get_buckets()]
+        if self._old_buckets is not None:
+            tables.append(self._old_buckets)
+
         # Check if nodes exist at each index
-        for x in range(self.get_buckets().length()):
+        for buckets in tables:
+            for x in range(buckets.length()):
 
-            # If the linked list is non-empty, append each key and value to new dynamic array
-            if self.get_buckets().get_at_index(x).length != 0:
-                linked_list = self.get_buckets().get_at_index(x)
-                for link in linked_list:
-                    keys_and_values.append((link.key, link.value))
+                # If the linked list is non-empty, append each key and value to new dynamic array
+                linked_list = buckets.get_at_index(x)
+                if linked_list is not None:
+                    for link in linked_list:
+                        keys_and_values.append((link.key, link.value))
 
         # Return new dynamic array
         return keys_and_values
 
+    def _nodes(self):
+        """
+        Yield every live node, finishing any incremental resize first.
+        Raise RuntimeError if the map is modified before the walk ends.
+        """
+        self._finish_rehash()
+        mod_count = self._mod_count
+        buckets = self.get_buckets()
+        for x in range(buckets.length()):
+            linked_list = buckets.get_at_index(x)
+            if linked_list is not None:
+                for node in linked_list:
+                    yield node
+                    if self._mod_count != mod_count:
+                        raise RuntimeError("HashMap changed during iteration")
+
+    def keys(self):
+        """
+        Return a generator over the keys, without copying them
+        :return: generator of keys
+        """
+        return (node.key for node in self._nodes())
+
+    def values(self):
+        """
+        Return a generator over the values, without copying them
+        :return: generator of values
+        """
+        return (node.value for node in self._nodes())
+
+    def items(self):
+        """
+        Return a generator over the (key, value) pairs, without copying them
+        :return: generator of tuples
+        """
+        return ((node.key, node.value) for node in self._nodes())
+
+    def __iter__(self):
+        """Iterate over the keys, like a dict"""
+        return self.keys()
+
+    def __len__(self) -> int:
+        """Return size of map"""
+        return self.get_size()
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if key is in hash map"""
+        return self.contains_key(key)
+
+    def __getitem__(self, key: str) -> object:
+        """
+        Return value associated with key
+        :param key: key to find value
+        :return: key's value
+        :raises KeyError: if key is not in hash map
+        """
+        node = self._find_hashed(key, self.get_hash(key))
+        if node is None:
+            raise KeyError(key)
+        return node.value
+
+    def _hash_many(self, keys: list) -> list:
+        """Hash a batch of keys, using the vectorized hash function when available
+        :param keys: list of keys
+        :return: list of int hashes"""
+
+        hashes = batch_hash(self._hash_function, keys)
+        if hashes is None:
+            hash_function = self._hash_function
+            hashes = [hash_function(key) for key in keys]
+        if self._power_of_two:
+            hashes = [fibonacci_mix(hashed) for hashed in hashes]
+        return hashes
+
+    def put_many(self, pairs) -> None:
+        """
+        Update every key/value pair from an iterable, growing the table
+        at most once for the whole batch
+        :param pairs: DynamicArray or iterable of (key, value) tuples
+        """
+        self._finish_rehash()
+        pairs = as_list(pairs)
+
+        # Grow once so the batch fits under max_load even if every key is new
+        capacity = self.get_capacity()
+        while self.get_size() + len(pairs) > capacity * self._max_load:
+            capacity = self._grow_capacity(capacity)
+        if capacity != self.get_capacity():
+            self.resize_table(capacity)
+
+        # Hash the whole batch up front and hoist lookups out of the loop;
+        # no load check is needed per pair
+        hashes = self._hash_many([pair[0] for pair in pairs])
+        bucket_at = self.get_buckets().get_at_index
+        array_size = self.get_buckets().length()
+        added = 0
+
+        for (key, value), hashed, index in zip(pairs, hashes, self._bucket_indices(hashes, array_size)):
+            linked_list = bucket_at(index)
+            node = linked_list.contains(key, hashed) if linked_list is not None else None
+            if node is not None:
+                node.value = value
+            else:
+                self._insert_new(index, key, value, hashed)
+                added += 1
+
+        self.change_size(added)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Return the value of every key, or None for missing keys
+        :param keys: DynamicArray or iterable of keys
+        :return: DynamicArray of values in the same order as keys
+        """
+        keys = as_list(keys)
+        return self._get_many_hashed(keys, self._hash_many(keys))
+
+    def _get_many_hashed(self, keys: list, hashes: list) -> DynamicArray:
+        """
+        Return the value of every key given the keys' hashes
+        :param keys: list of keys
+        :param hashes: list of hashes from get_hash, in the same order
+        :return: DynamicArray of values in the same order as keys
+        """
+        self._finish_rehash()
+        bucket_at = self.get_buckets().get_at_index
+        array_size = self.get_buckets().length()
+        values = []
+
+        for key, hashed, index in zip(keys, hashes, self._bucket_indices(hashes, array_size)):
+            linked_list = bucket_at(index)
+            node = linked_list.contains(key, hashed) if linked_list is not None else None
+            values.append(node.value if node is not None else None)
+
+        return DynamicArray(values)
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Return whether each key is in the hash map
+        :param keys: DynamicArray or iterable of keys
+        :return: DynamicArray of bools in the same order as keys
+        """
+        keys = as_list(keys)
+        return self._contains_many_hashed(keys, self._hash_many(keys))
+
+    def _contains_many_hashed(self, keys: list, hashes: list) -> DynamicArray:
+        """
+        Return whether each key is in the hash map given the keys' hashes
+        :param keys: list of keys
+        :param hashes: list of hashes from get_hash, in the same order
+        :return: DynamicArray of bools in the same order as keys
+        """
+        self._finish_rehash()
+        bucket_at = self.get_buckets().get_at_index
+        array_size = self.get_buckets().length()
+        found = []
+
+        for key, hashed, index in zip(keys, hashes, self._bucket_indices(hashes, array_size)):
+            linked_list = bucket_at(index)
+            found.append(linked_list is not None and linked_list.contains(key, hashed) is not None)
+
+        return DynamicArray(found)
+
+    def remove_many(self, keys) -> None:
+        """
+        Remove every given key, shrinking the table at most once afterwards
+        :param keys: DynamicArray or iterable of keys
+        """
+        keys = as_list(keys)
+        self._remove_many_hashed(keys, self._hash_many(keys))
+
+    def _remove_many_hashed(self, keys: list, hashes: list) -> None:
+        """
+        Remove every given key given the keys' hashes, shrinking the table
+        at most once afterwards
+        :param keys: list of keys
+        :param hashes: list of hashes from get_hash, in the same order
+        """
+        self._finish_rehash()
+        buckets = self.get_buckets()
+        array_size = buckets.length()
+        removed = 0
+
+        for key, hashed, index in zip(keys, hashes, self._bucket_indices(hashes, array_size)):
+            if self._remove_from(buckets, index, key, hashed):
+                removed += 1
+
+        self.change_size(-removed)
+        self._shrink_if_sparse()
+
+    def update(self, other) -> None:
+        """
+        Put every key/value pair of another map, replacing existing values.
+        The table grows at most once, and when other is a HashMap hashing
+        keys the same way its cached hashes are reused.
+        :param other: HashMap of either kind, dict or other object with items()
+        """
+        self._put_hashed_items(self._hashed_items_of(other), len(other))
+
+    def merge(self, other, combine_fn: callable) -> None:
+        """
+        Put every key/value pair of another map, combining values of keys
+        present in both, for example with operator.add to sum counters
+        :param other: HashMap of either kind, dict or other object with items()
+        :param combine_fn: function of (value in this map, value in other)
+                           returning the merged value
+        """
+        self._put_hashed_items(self._hashed_items_of(other), len(other), combine_fn)
+
+    def _hashed_items(self):
+        """
+        Yield (key, value, hash) for every live node, for another map to reuse
+        :return: generator of tuples
+        """
+        return ((node.key, node.value, node.hash_code) for node in self._nodes())
+
+    def _hashed_items_of(self, other):
+        """
+        Return (key, value, hash) for every pair of other, taking the hashes
+        from other when it hashes keys exactly as this map does
+        :param other: HashMap of either kind, dict or other object with items()
+        :return: iterator of tuples
+        """
+        if (hasattr(other, '_hashed_items') and other._hash_function is self._hash_function
+                and other._power_of_two == self._power_of_two):
+            return other._hashed_items()
+        get_hash = self.get_hash
+        return ((key, value, get_hash(key)) for key, value in other.items())
+
+    def _put_hashed_items(self, triples, count: int, combine_fn: callable = None) -> None:
+        """
+        Put (key, value, hash) tuples, growing the table at most once
+        :param triples: iterable of (key, value, hash) tuples with distinct keys
+        :param count: int of tuples, used to size the table
+        :param combine_fn: function merging the existing and new value of a
+                           key, None to replace the value
+        """
+        self._finish_rehash()
+
+        # Grow once so every new key fits under max_load
+        capacity = self.get_capacity()
+        while self.get_size() + count > capacity * self._max_load:
+            capacity = self._grow_capacity(capacity)
+        if capacity != self.get_capacity():
+            self.resize_table(capacity)
+
+        bucket_at = self.get_buckets().get_at_index
+        bucket_index = self._bucket_index
+        array_size = self.get_buckets().length()
+        added = 0
+
+        for key, value, hashed in triples:
+            index = bucket_index(hashed, array_size)
+            linked_list = bucket_at(index)
+            node = linked_list.contains(key, hashed) if linked_list is not None else None
+            if node is None:
+                self._insert_new(index, key, value, hashed)
+                added += 1
+            elif combine_fn is None:
+                node.value = value
+            else:
+                node.value = combine_fn(node.value, value)
+
+        self.change_size(added)
+
 
 def find_mode(da: DynamicArray) -> (DynamicArray, int):
     """
@@ -310,26 +972,19 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
     # Iterate through dynamic array
     for ele in range(length):
 
-        # Get hash map index of each dynamic array element
-        index = map.get_hash(da[ele]) % map.get_buckets().length()
-
-        # Check if element is already logged
-        if map.get_buckets().get_at_index(index).length() != 0:
-            linked_list = map.get_buckets().get_at_index(index)
+        # Hash each element once and find its bucket
+        key = da[ele]
+        hashed = map.get_hash(key)
+        linked_list = map.get_buckets().get_at_index(map._bucket_index(hashed, map.get_buckets().length()))
 
-            # Check if another key has the same index
-            # If so, create new node with that element's value as 1
-            if linked_list.contains(da[ele]) is None:
-                map.put(da[ele], 1)
-
-            # If key is already logged, increase frequency (value) by 1
-            else:
-                freq = linked_list.contains(da[ele]).value + 1
-                map.put(da[ele], freq)
+        # If key is already logged, increase frequency (value) by 1
+        node = linked_list.contains(key, hashed) if linked_list is not None else None
+        if node is not None:
+            node.value += 1
 
         # If element is unique, create new node with that element's frequency (value) as 1
         else:
-            map.put(da[ele], 1)
+            map._put_hashed(key, hashed, 1)
 
     # Find keys and values
     keys_and_values = map.get_keys_and_values()
@@ -357,6 +1012,67 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
     return modes, mode_freq
 
 
+def count_frequencies(iterable, function: callable = hash_function_1, capacity: int = 11) -> HashMap:
+    """
+    Count how often each element of an iterable occurs
+    :param iterable: DynamicArray, list, generator or any other iterable
+    :param function: hash function for the counting HashMap
+    :param capacity: initial capacity, such as the expected number of distinct elements
+    :return: HashMap from each distinct element to its count
+    """
+    map = HashMap(capacity, function)
+    for key in iter_items(iterable):
+
+        # Hash each element once; bump an existing count in place
+        hashed = map.get_hash(key)
+        node = map._find_node(key, hashed)
+        if node is not None:
+            node.value += 1
+        else:
+            map._put_hashed(key, hashed, 1)
+
+    return map
+
+
+def find_mode_stream(iterable, function: callable = hash_function_1) -> (DynamicArray, int):
+    """
+    Find mode of any iterable in a single pass. The modes are kept up to date
+    as the counts grow, so the counts are never scanned afterwards. Memory
+    grows with the number of distinct elements; for a fixed memory cap see
+    frequency_sketches.approximate_mode.
+    :param iterable: DynamicArray, list, generator or any other iterable
+    :param function: hash function for the counting HashMap
+    :return: tuple consisting of (dynamic array with modes in the order they
+             reached the mode frequency, int with their frequency);
+             the frequency is 0 for an empty iterable
+    """
+    map = HashMap(11, function)
+    modes = DynamicArray()
+    mode_freq = 0
+
+    for key in iter_items(iterable):
+
+        # Count the element, hashing it once
+        hashed = map.get_hash(key)
+        node = map._find_node(key, hashed)
+        if node is not None:
+            node.value += 1
+            count = node.value
+        else:
+            map._put_hashed(key, hashed, 1)
+            count = 1
+
+        # Counts only grow by one, so a key joins the modes exactly when it
+        # ties the mode frequency and replaces them when it passes it
+        if count > mode_freq:
+            mode_freq = count
+            modes = DynamicArray([key])
+        elif count == mode_freq:
+            modes.append(key)
+
+    return modes, mode_freq
+
+
 # ------------------- BASIC TESTING ---------------------------------------- #
 
 if __name__ == "__main__":
@@ -471,6 +1187,130 @@ if __name__ == "__main__":
             result &= not m.contains_key(str(key + 1))
         print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
 
+    print("\nShrink example")
+    print("--------------")
+    # Growing 53 -> 107 leaves the load near 1/2, so one remove right after
+    # a grow must not shrink the table back
+    m = HashMap(53, hash_function_1, min_load=0.45)
+    for i in range(54):
+        m.put('str' + str(i), i)
+    grown = m.get_capacity()
+    m.remove('str0')
+    print(grown, m.get_capacity(), m.get_capacity() == grown)
+    for i in range(1, 54):
+        m.remove('str' + str(i))
+    print(m.get_size(), m.get_capacity())
+
+    print("\nIncremental resize example")
+    print("--------------------------")
+    m = HashMap(11, hash_function_2, incremental_resize=True, rehash_step=2)
+    result = True
+    for i in range(300):
+        m.put('str' + str(i), i)
+        if i % 60 == 59:
+            print(m.get_size(), m.get_capacity(), m._old_buckets is not None)
+    for i in range(300):
+        result &= m.get('str' + str(i)) == i
+    print(result, m.get_keys_and_values().length())
+
+    print("\nMixed operations during an incremental resize")
+    print("---------------------------------------------")
+    from hash_map_checks import compare_during_rehash
+    for seed, power_of_two in enumerate((False, True)):
+        m = HashMap(53, hash_function_2, incremental_resize=True, rehash_step=1, power_of_two=power_of_two)
+        print(power_of_two, *compare_during_rehash(m, seed))
+
+    print("\nStatistics example")
+    print("------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(100):
+        m.put('str' + str(i), i)
+    print(m.stats())
+    for i in range(0, 100, 2):
+        m.remove('str' + str(i))
+    print(m.stats())
+    print(m.stats().empty_buckets == m.empty_buckets(), round(m.stats().table_load(), 2))
+
+    # Polling the counters leaves an incremental resize where it is
+    m = HashMap(11, hash_function_2, incremental_resize=True, rehash_step=1)
+    i = 0
+    while m._old_buckets is None:
+        m.put('str' + str(i), i)
+        i += 1
+    print(m.stats(), m.empty_buckets(), m.treeified_buckets(), m._old_buckets is not None)
+
+    print("\nIteration example")
+    print("-----------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(5):
+        m.put('key' + str(i), i * 10)
+    print(len(m), 'key3' in m, 'key9' in m, m['key3'], sorted(m), sorted(m.values()))
+    try:
+        m['key9']
+    except KeyError as error:
+        print("KeyError:", error)
+    try:
+        for key in m:
+            m.remove(key)
+    except RuntimeError as error:
+        print("RuntimeError:", error, len(m))
+
+    print("\nupdate / merge example")
+    print("----------------------")
+    from operator import add
+    m = HashMap(11, hash_function_2)
+    partition = HashMap(11, hash_function_2)
+    for i in range(6):
+        m.put('key' + str(i), 1)
+        partition.put('key' + str(i + 3), 10)
+    m.merge(partition, add)
+    print(sorted(m.items()))
+    m.update({'key0': 0, 'new': 5})
+    print(sorted(m.items()), m.get_size())
+
+    print("\nPower-of-two example")
+    print("--------------------")
+    for power_of_two in (False, True):
+        m = HashMap(8, hash_function_1, power_of_two=power_of_two)
+        capacities = [m.get_capacity()]
+        for i in range(500):
+            m.put('str' + str(i), i)
+            if m.get_capacity() != capacities[-1]:
+                capacities.append(m.get_capacity())
+        result = all(m.get('str' + str(i)) == i for i in range(500))
+        print(power_of_two, capacities, m.empty_buckets(), result)
+
+    print("\nTreeify example")
+    print("---------------")
+    # Every permutation has the same hash_function_1 value, so all of
+    # them land in one bucket
+    from itertools import permutations
+    keys = [''.join(p) for p in permutations('abcde')]
+    for incremental_resize in (False, True):
+        m = HashMap(11, hash_function_1, incremental_resize=incremental_resize)
+        for i, key in enumerate(keys):
+            m.put(key, i)
+        print(m.treeified_buckets(), m.get_size(),
+              all(m.get(key) == i for i, key in enumerate(keys)))
+        for key in keys[5:]:
+            m.remove(key)
+        print(m.treeified_buckets(), m.get_size(),
+              all(m.get(key) == i for i, key in enumerate(keys[:5])), m.get(keys[5]))
+
+    # Keys sharing a hash need not be orderable: strings next to an int,
+    # and frozensets, which compare by subset rather than by order
+    m = HashMap(11, lambda key: 0)
+    mixed = ['str' + str(i) for i in range(12)] + [5]
+    subsets = [frozenset(range(i)) for i in range(7)] + [frozenset([i + 10]) for i in range(6)]
+    for group in (mixed, subsets):
+        for i, key in enumerate(group):
+            m.put(key, i)
+        print(m.treeified_buckets(), all(m.get(key) == i for i, key in enumerate(group)))
+    for key in subsets[::2]:
+        m.remove(key)
+    print(m.get_size(), all(m.get(key) == i for i, key in enumerate(subsets) if i % 2),
+          all(not m.contains_key(key) for key in subsets[::2]))
+
     print("\nPDF - get example 1")
     print("-------------------")
     m = HashMap(31, hash_function_1)
@@ -560,3 +1400,11 @@ if __name__ == "__main__":
         da = DynamicArray(case)
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\nfind_mode_stream example")
+    print("------------------------")
+    for case in test_cases:
+        stream_mode, stream_frequency = find_mode_stream(word for word in case)
+        mode, frequency = find_mode(DynamicArray(case))
+        print(f"Mode : {stream_mode}, Frequency: {stream_frequency}, "
+              f"matches find_mode: {sorted(as_list(stream_mode)) == sorted(as_list(mode)) and stream_frequency == frequency}")
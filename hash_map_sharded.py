@@ -0,0 +1,357 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - Hashmap Implementation
+# Description: HashMap split into N independent shards, each an instance of
+# one of the HashMap classes. A key is hashed once: the high bits of its
+# mixed hash pick the shard, and the hash itself is passed down to the shard,
+# so each shard grows and shrinks on its own and a resize only pauses the
+# keys of one shard. Batch methods group keys by shard and can run the
+# shards in a thread pool, and shard_stats reports every shard's counters
+# for spotting imbalance.
+
+
+from concurrent.futures import ThreadPoolExecutor
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from collection_utils import as_list
+from hash_functions import fibonacci_mix
+import hash_map_separate_chaining
+
+
+class ShardedHashMap:
+    def __init__(self,
+                 shards: int = 8,
+                 map_class: type = hash_map_separate_chaining.HashMap,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 workers: int = 1,
+                 **options) -> None:
+        """
+        Initialize new HashMap split over several shards
+        :param shards: number of independent shards
+        :param map_class: HashMap class of each shard, from
+                          hash_map_separate_chaining or hash_map_open_addressing
+        :param capacity: initial capacity over all shards
+        :param function: hash function applied to keys, by the shards as well
+        :param workers: threads used by the batch methods. The shards' work
+                        is pure Python and holds the GIL, so more than one
+                        only pays off on a free-threaded build of Python.
+        :param options: further keyword arguments for map_class,
+                        such as max_load or power_of_two
+        """
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        self._shards = [map_class(max(capacity // shards, 1), function, **options)
+                        for _ in range(shards)]
+        self._hash_function = function
+        self._workers = workers
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        return ''.join(f"shard {number}:\n{shard}" for number, shard in enumerate(self._shards))
+
+    def get_hash(self, key: str) -> int:
+        """Hash a key the way every shard does
+        :param key: string of key to hash
+        :return: int of hash"""
+        return self._shards[0].get_hash(key)
+
+    def _shard_index(self, hashed: int) -> int:
+        """Return the shard holding a hash. The shards index their buckets
+        with the low bits of the hash, so the shard comes from the high bits.
+        :param hashed: hash from get_hash
+        :return: int of shard index"""
+        return (fibonacci_mix(hashed) >> 32) % len(self._shards)
+
+    def _route(self, key: str):
+        """Return the shard holding a key and the key's hash
+        :param key: key to route
+        :return: tuple of (HashMap, int of hash)"""
+        hashed = self.get_hash(key)
+        return self._shards[self._shard_index(hashed)], hashed
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return sum(shard.get_size() for shard in self._shards)
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map, the buckets of every shard together
+        """
+        return sum(shard.get_capacity() for shard in self._shards)
+
+    def table_load(self) -> float:
+        """
+        Return current hash table load factor
+        :return: float of load factor
+        """
+        return self.get_size() / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        Return number of empty buckets
+        :return: int of empty buckets
+        """
+        return sum(shard.empty_buckets() for shard in self._shards)
+
+    def shard_stats(self) -> DynamicArray:
+        """
+        Return the counters of every shard, in shard order
+        :return: DynamicArray of HashMapStats
+        """
+        return DynamicArray([shard.stats() for shard in self._shards])
+
+    def imbalance(self) -> float:
+        """
+        Return the size of the largest shard divided by the mean shard size,
+        1.0 when the keys are spread evenly
+        :return: float of imbalance
+        """
+        size = self.get_size()
+        if size == 0:
+            return 1.0
+        return max(shard.get_size() for shard in self._shards) * len(self._shards) / size
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update key/value pair in hash map
+        :param key: key of new element
+        :param value: value of new element
+        """
+        shard, hashed = self._route(key)
+        shard._put_hashed(key, hashed, value)
+
+    def get(self, key: str) -> object:
+        """
+        Return value associated with key
+        :param key: key to find value
+        :return: key's value, or None if key is absent
+        """
+        shard, hashed = self._route(key)
+        node = shard._find_hashed(key, hashed)
+        return None if node is None else node.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if key is in hash map, otherwise return False
+        :param key: key to find
+        :return: bool whether key is present
+        """
+        shard, hashed = self._route(key)
+        return shard._find_hashed(key, hashed) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Remove given key and value from hash map
+        :param key: key of element to remove
+        """
+        shard, hashed = self._route(key)
+        shard._remove_hashed(key, hashed)
+
+    def clear(self) -> None:
+        """
+        Clear contents of every shard without changing capacity
+        """
+        for shard in self._shards:
+            shard.clear()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return Dynamic Array where each index has a tuple of pair stored there
+        :return: dynamic array object
+        """
+        return DynamicArray([pair for shard in self._shards for pair in shard.items()])
+
+    def keys(self):
+        """
+        Return a generator over the keys of every shard
+        :return: generator of keys
+        """
+        return (key for shard in self._shards for key in shard.keys())
+
+    def values(self):
+        """
+        Return a generator over the values of every shard
+        :return: generator of values
+        """
+        return (value for shard in self._shards for value in shard.values())
+
+    def items(self):
+        """
+        Return a generator over the (key, value) pairs of every shard
+        :return: generator of tuples
+        """
+        return (pair for shard in self._shards for pair in shard.items())
+
+    def __iter__(self):
+        """Iterate over the keys, like a dict"""
+        return self.keys()
+
+    def __len__(self) -> int:
+        """Return size of map"""
+        return self.get_size()
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if key is in hash map"""
+        return self.contains_key(key)
+
+    def __getitem__(self, key: str) -> object:
+        """
+        Return value associated with key
+        :param key: key to find value
+        :return: key's value
+        :raises KeyError: if key is not in hash map
+        """
+        shard, hashed = self._route(key)
+        node = shard._find_hashed(key, hashed)
+        if node is None:
+            raise KeyError(key)
+        return node.value
+
+    def _group(self, items: list, keys: list) -> list:
+        """
+        Hash a batch once and split it by shard, remembering where each
+        item came from
+        :param items: list of keys or pairs
+        :param keys: list of the key of each item
+        :return: list holding, for each shard, a tuple of (list of
+                 positions in items, list of items, list of their hashes)
+        """
+        groups = [([], [], []) for _ in self._shards]
+        shard_index = self._shard_index
+        for position, (item, hashed) in enumerate(zip(items, self._shards[0]._hash_many(keys))):
+            positions, shard_items, hashes = groups[shard_index(hashed)]
+            positions.append(position)
+            shard_items.append(item)
+            hashes.append(hashed)
+        return groups
+
+    def _run(self, call, groups: list) -> list:
+        """
+        Call a function on every shard with its part of the batch,
+        one shard per thread when there is more than one worker
+        :param call: function of (shard, items, hashes)
+        :param groups: list of (positions, items, hashes) tuples from _group
+        :return: list of each shard's result, None for shards with no items
+        """
+        work = [(shard, shard_items, hashes) if shard_items else None
+                for shard, (_, shard_items, hashes) in zip(self._shards, groups)]
+
+        def run(args):
+            return None if args is None else call(*args)
+
+        if self._workers == 1:
+            return [run(args) for args in work]
+        with ThreadPoolExecutor(self._workers) as pool:
+            return list(pool.map(run, work))
+
+    def _gather(self, groups: list, results: list, count: int) -> DynamicArray:
+        """
+        Put the per-shard results of a batch back in the batch's order
+        :param groups: list of (positions, items, hashes) tuples from _group
+        :param results: list of DynamicArrays returned by the shards
+        :param count: int of items in the batch
+        :return: DynamicArray of results in the same order as the batch
+        """
+        ordered = [None] * count
+        for (positions, _, _), result in zip(groups, results):
+            for i, position in enumerate(positions):
+                ordered[position] = result[i]
+        return DynamicArray(ordered)
+
+    def put_many(self, pairs) -> None:
+        """
+        Update every key/value pair, each shard's pairs in one call
+        :param pairs: DynamicArray or iterable of (key, value) tuples
+        """
+        pairs = as_list(pairs)
+
+        def put(shard, shard_pairs, hashes):
+            shard._put_hashed_items([(key, value, hashed) for (key, value), hashed in zip(shard_pairs, hashes)],
+                                    len(shard_pairs))
+
+        self._run(put, self._group(pairs, [pair[0] for pair in pairs]))
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Return the value of every key, or None for missing keys
+        :param keys: DynamicArray or iterable of keys
+        :return: DynamicArray of values in the same order as keys
+        """
+        keys = as_list(keys)
+        groups = self._group(keys, keys)
+        return self._gather(groups, self._run(lambda shard, *batch: shard._get_many_hashed(*batch), groups),
+                            len(keys))
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Return whether each key is in the hash map
+        :param keys: DynamicArray or iterable of keys
+        :return: DynamicArray of bools in the same order as keys
+        """
+        keys = as_list(keys)
+        groups = self._group(keys, keys)
+        return self._gather(groups, self._run(lambda shard, *batch: shard._contains_many_hashed(*batch), groups),
+                            len(keys))
+
+    def remove_many(self, keys) -> None:
+        """
+        Remove every given key, each shard's keys in one call
+        :param keys: DynamicArray or iterable of keys
+        """
+        keys = as_list(keys)
+        self._run(lambda shard, *batch: shard._remove_many_hashed(*batch), self._group(keys, keys))
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    import hash_map_open_addressing
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = ShardedHashMap(4, capacity=53, function=hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nShard statistics example")
+    print("------------------------")
+    for map_class in (hash_map_separate_chaining.HashMap, hash_map_open_addressing.HashMap):
+        m = ShardedHashMap(4, map_class, capacity=40, function=hash_function_2)
+        m.put_many(('key' + str(i), i) for i in range(1000))
+        shard_stats = m.shard_stats()
+        for number in range(shard_stats.length()):
+            stats = shard_stats[number]
+            print(number, stats.size, round(stats.table_load(), 2), stats.empty_buckets)
+        print("imbalance", round(m.imbalance(), 2))
+
+    print("\nRouting skew example")
+    print("--------------------")
+    # Hashes that only differ above bit 20 share every low bit the shards
+    # index their buckets with, yet still spread evenly over the shards
+    def high_bits_hash(key: str) -> int:
+        return int(key[3:]) << 20
+
+    m = ShardedHashMap(8, capacity=64, function=high_bits_hash)
+    m.put_many(('key' + str(i), i) for i in range(4000))
+    print(round(m.imbalance(), 2) < 1.2, len({high_bits_hash('key' + str(i)) % 8 for i in range(4000)}),
+          all(m.get('key' + str(i)) == i for i in range(4000)))
+
+    from hash_map_checks import print_dict_comparison
+
+    def random_map(rng):
+        map_class = rng.choice([hash_map_separate_chaining.HashMap, hash_map_open_addressing.HashMap])
+        return ShardedHashMap(rng.choice([1, 3, 8]), map_class, rng.choice([1, 11, 53]),
+                              rng.choice([hash_function_1, hash_function_2]), workers=rng.choice([1, 4]),
+                              power_of_two=rng.random() < 0.5)
+
+    print_dict_comparison(random_map, seeds=range(10))
@@ -0,0 +1,644 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - Hashmap Implementation
+# Description: Open addressing HashMap modeled on SwissTable. Next to the
+# slots it keeps one control byte per slot: EMPTY, DELETED, or for a live
+# slot the low 7 bits of the key's hash (H2). Slots are probed in groups of
+# 16, and one integer bitmask operation over the 16 control bytes of a group
+# finds every slot whose H2 matches, so keys are only compared in the rare
+# slots where 7 bits of hash already agree. It has the same public methods
+# as hash_map_open_addressing.HashMap.
+
+
+from a6_include import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2)
+from collection_utils import as_list
+from hash_functions import batch_hash, fibonacci_mix
+from primes import next_power_of_two
+
+
+# Slots per group; capacities are a power of two and at least one group
+GROUP_WIDTH = 16
+
+# Control bytes. A live slot holds its H2, which is below 0x80
+EMPTY = 0x80
+DELETED = 0xFE
+
+# At most 7/8 of the slots may be live or deleted, so every probe
+# sequence meets a group with an empty slot
+MAX_LOAD = 7 / 8
+
+# A 1 or a 0x80 in every byte of a group word
+_LSBS = int.from_bytes(b'\x01' * GROUP_WIDTH, 'little')
+_MSBS = _LSBS * 0x80
+
+
+def _match_h2(word: int, h2: int) -> int:
+    """
+    Find the control bytes of a group equal to h2. A byte after a true match
+    may also be reported, so callers still compare hashes.
+    :param word: the 16 control bytes of a group as a little-endian int
+    :param h2: int of 7-bit hash
+    :return: int with the high bit set in each matching byte
+    """
+    x = word ^ (_LSBS * h2)
+    return (x - _LSBS) & ~x & _MSBS
+
+
+def _match_empty(word: int) -> int:
+    """Find the EMPTY control bytes of a group: high bit set, bit 1 clear"""
+    return word & ~(word << 6) & _MSBS
+
+
+def _match_empty_or_deleted(word: int) -> int:
+    """Find the control bytes of a group that are not live: high bit set"""
+    return word & _MSBS
+
+
+def _lowest_byte(mask: int) -> int:
+    """Return the position in its group of the lowest byte flagged in a match"""
+    return ((mask & -mask).bit_length() >> 3) - 1
+
+
+class HashMap:
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that probes groups of control bytes
+        :param capacity: initial number of slots, rounded up to a power
+                         of two and to at least one group
+        :param function: hash function applied to keys
+        """
+        self._capacity = self._round_capacity(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._ctrl[i] == EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                tombstone = self._ctrl[i] == DELETED
+                out += f"{i}: K: {self._keys[i]} V: {self._values[i]} TS: {tombstone}\n"
+        return out
+
+    @staticmethod
+    def _round_capacity(capacity: int) -> int:
+        """
+        Round a capacity up to a power of two holding at least one group
+        """
+        return next_power_of_two(max(capacity, GROUP_WIDTH))
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replace the table with empty arrays of the given capacity
+        :param capacity: int of slots to allocate, a power of two
+        """
+        self._ctrl = bytearray([EMPTY]) * capacity
+        self._hashes = [0] * capacity
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._tombstones = 0
+
+        # Empty slots that may still be filled before the table must rehash
+        self._growth_left = int(capacity * MAX_LOAD)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def get_array(self) -> DynamicArray:
+        """Build a DynamicArray of HashEntry objects mirroring the table.
+        This copies the whole table and is only meant for inspection.
+        :return: DynamicArray of HashEntry or None per slot"""
+
+        entries = DynamicArray()
+        for x in range(self._capacity):
+            if self._ctrl[x] == EMPTY:
+                entries.append(None)
+            else:
+                entry = HashEntry(self._keys[x], self._values[x], self._hashes[x])
+                entry.is_tombstone = self._ctrl[x] == DELETED
+                entries.append(entry)
+        return entries
+
+    def get_hash(self, key: str) -> int:
+        """Run the hash function and mix the result, since the group comes
+        from the high bits and H2 from the low 7 bits
+        :param key: key to hash
+        :return: int of 64-bit hash"""
+
+        return fibonacci_mix(self._hash_function(key))
+
+    def _find_slot(self, key: str, hashed: int) -> int:
+        """Probe the groups of a key, stopping at the first group with an empty slot
+        :param key: key to search for
+        :param hashed: hash from get_hash
+        :return: index of the live slot holding key or -1"""
+
+        ctrl, hashes, keys = self._ctrl, self._hashes, self._keys
+        group_mask = (self._capacity // GROUP_WIDTH) - 1
+        group = (hashed >> 7) & group_mask
+        pattern = _LSBS * (hashed & 0x7f)
+
+        # Steps of 1, 2, 3, ... groups visit every group of a power-of-two table
+        for step in range(1, group_mask + 2):
+            start = group * GROUP_WIDTH
+            word = int.from_bytes(ctrl[start:start + GROUP_WIDTH], 'little')
+
+            # Only slots whose H2 matches need a hash and key comparison
+            x = word ^ pattern
+            matches = (x - _LSBS) & ~x & _MSBS
+            while matches:
+                index = start + _lowest_byte(matches)
+                if hashes[index] == hashed and keys[index] == key:
+                    return index
+                matches &= matches - 1
+
+            # A group with an empty slot ends the probe sequence
+            if _match_empty(word):
+                return -1
+
+            group = (group + step) & group_mask
+
+        return -1
+
+    def _find_free(self, hashed: int) -> int:
+        """Return the first empty or deleted slot in the probe sequence of a hash
+        :param hashed: hash from get_hash
+        :return: int of index"""
+
+        ctrl = self._ctrl
+        group_mask = (self._capacity // GROUP_WIDTH) - 1
+        group = (hashed >> 7) & group_mask
+
+        for step in range(1, group_mask + 2):
+            start = group * GROUP_WIDTH
+            free = _match_empty_or_deleted(int.from_bytes(ctrl[start:start + GROUP_WIDTH], 'little'))
+            if free:
+                return start + _lowest_byte(free)
+            group = (group + step) & group_mask
+
+        return -1
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update key/value pair in hash map
+        :param key: key to update
+        :param value: value to update
+        """
+        self._put_hashed(key, self.get_hash(key), value)
+
+    def _put_hashed(self, key: str, hashed: int, value: object) -> None:
+        """
+        Update key/value pair in hash map given the key's hash
+        :param key: key to update
+        :param hashed: hash from get_hash
+        :param value: value to update
+        """
+
+        # Overwrite in place when the key already exists
+        index = self._find_slot(key, hashed)
+        if index != -1:
+            self._values[index] = value
+            return
+
+        index = self._find_free(hashed)
+        if self._ctrl[index] == EMPTY and self._growth_left == 0:
+            # Out of room: grow if the live entries fill half of the allowed
+            # slots, otherwise rehash at the same capacity to clear tombstones
+            if self._size >= self._capacity * MAX_LOAD / 2:
+                self.resize_table(self._capacity * 2)
+            else:
+                self.resize_table(self._capacity)
+            index = self._find_free(hashed)
+
+        self._insert_at(index, key, hashed, value)
+
+    def _insert_at(self, index: int, key: str, hashed: int, value: object) -> None:
+        """
+        Fill an empty or deleted slot
+        :param index: int of slot from _find_free
+        :param key: key to insert
+        :param hashed: hash from get_hash
+        :param value: value to insert
+        """
+        if self._ctrl[index] == DELETED:
+            self._tombstones -= 1
+        else:
+            self._growth_left -= 1
+
+        self._ctrl[index] = hashed & 0x7f
+        self._hashes[index] = hashed
+        self._keys[index] = key
+        self._values[index] = value
+        self._size += 1
+
+    def table_load(self) -> float:
+        """
+        Return current hash table load factor
+        :return: float of load factor
+        """
+
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Return number of empty buckets
+        :return: int of empty buckets
+        """
+
+        return self._capacity - self._size - self._tombstones
+
+    def tombstone_count(self) -> int:
+        """
+        Return number of buckets holding a removed entry
+        :return: int of tombstones
+        """
+
+        return self._tombstones
+
+    def probe_length(self, key: str) -> int:
+        """
+        Return number of groups examined to find key
+        :param key: key to search for
+        :return: int of groups probed, or 0 if key is absent
+        """
+
+        hashed = self.get_hash(key)
+        index = self._find_slot(key, hashed)
+        if index == -1:
+            return 0
+
+        # Walk the group sequence until it reaches the key's group
+        group_mask = (self._capacity // GROUP_WIDTH) - 1
+        group = (hashed >> 7) & group_mask
+        length = 1
+        while group != index // GROUP_WIDTH:
+            group = (group + length) & group_mask
+            length += 1
+        return length
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change capacity of hash table and rehash live entries
+        using their cached hashes
+        :param new_capacity: int of new capacity
+        """
+
+        # Check if new_capacity is less than number of elements
+        if new_capacity < self._size:
+            return
+
+        # Keep the live entries within the allowed load
+        new_capacity = self._round_capacity(new_capacity)
+        while self._size > new_capacity * MAX_LOAD:
+            new_capacity *= 2
+
+        old_ctrl, old_hashes = self._ctrl, self._hashes
+        old_keys, old_values = self._keys, self._values
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+        self._size = 0
+
+        # The new table has no deleted slots or duplicate keys,
+        # so each entry goes in the first empty slot of its probe sequence
+        find_free, insert_at = self._find_free, self._insert_at
+        for x in range(len(old_ctrl)):
+            if old_ctrl[x] < EMPTY:
+                hashed = old_hashes[x]
+                insert_at(find_free(hashed), old_keys[x], hashed, old_values[x])
+
+    def get(self, key: str) -> object:
+        """
+        Return value associated with key
+        :param key: key to find value
+        :return: object of value found
+        """
+
+        index = self._find_slot(key, self.get_hash(key))
+        if index == -1:
+            return None
+        return self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if key is in hash map. Otherwise return False
+        :param key: key to search for
+        :return: bool if key is present
+        """
+
+        return self._find_slot(key, self.get_hash(key)) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes given key and value from hash map
+        :param key: key of element to remove
+        """
+        self._remove_hashed(key, self.get_hash(key))
+
+    def _remove_hashed(self, key: str, hashed: int) -> None:
+        """
+        Removes given key and value from hash map given the key's hash
+        :param key: key of element to remove
+        :param hashed: hash from get_hash
+        """
+
+        index = self._find_slot(key, hashed)
+        if index == -1:
+            return
+
+        self._keys[index] = None
+        self._values[index] = None
+        self._size -= 1
+
+        # Probes only continue past a group that had no empty slot when they
+        # ran, so if this group has one no probe passes through it and the
+        # slot can be emptied. Otherwise leave a tombstone.
+        start = index - index % GROUP_WIDTH
+        if _match_empty(int.from_bytes(self._ctrl[start:start + GROUP_WIDTH], 'little')):
+            self._ctrl[index] = EMPTY
+            self._growth_left += 1
+        else:
+            self._ctrl[index] = DELETED
+            self._tombstones += 1
+
+    def clear(self) -> None:
+        """
+        Clear contents of hash map. Does not change capacity.
+        """
+
+        self._allocate(self._capacity)
+        self._size = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return DynamicArray where each index is a tuple of a key/value pair
+        :return: DynamicArray object of key/value tuples
+        """
+
+        keys_values = DynamicArray()
+        ctrl, keys, values = self._ctrl, self._keys, self._values
+        for x in range(self._capacity):
+            if ctrl[x] < EMPTY:
+                keys_values.append((keys[x], values[x]))
+
+        return keys_values
+
+    def _hash_many(self, keys: list) -> list:
+        """Hash a batch of keys, using the vectorized hash function when available
+        :param keys: list of keys
+        :return: list of int hashes from get_hash"""
+
+        hashes = batch_hash(self._hash_function, keys)
+        if hashes is None:
+            hash_function = self._hash_function
+            hashes = [hash_function(key) for key in keys]
+        return [fibonacci_mix(hashed) for hashed in hashes]
+
+    def put_many(self, pairs) -> None:
+        """
+        Update every key/value pair from an iterable, growing the table
+        at most once for the whole batch
+        :param pairs: DynamicArray or iterable of (key, value) tuples
+        """
+        pairs = as_list(pairs)
+
+        # Grow once so the batch fits even if every key is new
+        capacity = self._capacity
+        while self._size + self._tombstones + len(pairs) > capacity * MAX_LOAD:
+            capacity *= 2
+        if capacity != self._capacity:
+            self.resize_table(capacity)
+
+        put_hashed = self._put_hashed
+        for (key, value), hashed in zip(pairs, self._hash_many([pair[0] for pair in pairs])):
+            put_hashed(key, hashed, value)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Return the value of every key, or None for missing keys
+        :param keys: DynamicArray or iterable of keys
+        :return: DynamicArray of values in the same order as keys
+        """
+        keys = as_list(keys)
+        find_slot, values = self._find_slot, self._values
+        found = []
+
+        for key, hashed in zip(keys, self._hash_many(keys)):
+            index = find_slot(key, hashed)
+            found.append(values[index] if index != -1 else None)
+
+        return DynamicArray(found)
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Return whether each key is in the hash map
+        :param keys: DynamicArray or iterable of keys
+        :return: DynamicArray of bools in the same order as keys
+        """
+        keys = as_list(keys)
+        find_slot = self._find_slot
+        return DynamicArray([find_slot(key, hashed) != -1
+                             for key, hashed in zip(keys, self._hash_many(keys))])
+
+    def remove_many(self, keys) -> None:
+        """
+        Remove every given key
+        :param keys: DynamicArray or iterable of keys
+        """
+        keys = as_list(keys)
+        remove_hashed = self._remove_hashed
+        for key, hashed in zip(keys, self._hash_many(keys)):
+            remove_hashed(key, hashed)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - put example 2")
+    print("-------------------")
+    m = HashMap(41, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - table_load example 1")
+    print("--------------------------")
+    m = HashMap(101, hash_function_1)
+    print(round(m.table_load(), 2))
+    m.put('key1', 10)
+    print(round(m.table_load(), 2))
+    m.put('key2', 20)
+    print(round(m.table_load(), 2))
+    m.put('key1', 30)
+    print(round(m.table_load(), 2))
+
+    print("\nPDF - empty_buckets example 1")
+    print("-----------------------------")
+    m = HashMap(101, hash_function_1)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key2', 20)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key1', 30)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key4', 40)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+
+    print("\nPDF - resize example 2")
+    print("----------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        if m.table_load() > MAX_LOAD:
+            print(f"Check that the load factor is acceptable after the call to resize_table().\n"
+                  f"Your load factor is {round(m.table_load(), 2)} and should be less than or equal to {MAX_LOAD}")
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nPDF - get example 2")
+    print("-------------------")
+    m = HashMap(151, hash_function_2)
+    for i in range(200, 300, 7):
+        m.put(str(i), i * 10)
+    print(m.get_size(), m.get_capacity())
+    for i in range(200, 300, 21):
+        print(i, m.get(str(i)), m.get(str(i)) == i * 10)
+        print(i + 1, m.get(str(i + 1)), m.get(str(i + 1)) == (i + 1) * 10)
+
+    print("\nPDF - contains_key example 1")
+    print("----------------------------")
+    m = HashMap(11, hash_function_1)
+    print(m.contains_key('key1'))
+    m.put('key1', 10)
+    m.put('key2', 20)
+    m.put('key3', 30)
+    print(m.contains_key('key1'))
+    print(m.contains_key('key4'))
+    print(m.contains_key('key2'))
+    print(m.contains_key('key3'))
+    m.remove('key3')
+    print(m.contains_key('key3'))
+
+    print("\nPDF - remove example 1")
+    print("----------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\nPDF - clear example 2")
+    print("---------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    print(m.get_size(), m.get_capacity())
+    m.put('key2', 20)
+    print(m.get_size(), m.get_capacity())
+    m.resize_table(100)
+    print(m.get_size(), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\nPDF - get_keys_and_values example 1")
+    print("------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
+
+    print("\nGroup matching example")
+    print("----------------------")
+    word = int.from_bytes(bytes([5, EMPTY, 5, DELETED] + [EMPTY] * 12), 'little')
+    print([x for x in range(GROUP_WIDTH) if _match_h2(word, 5) >> (8 * x + 7) & 1])
+    print([x for x in range(GROUP_WIDTH) if _match_empty(word) >> (8 * x + 7) & 1][:3])
+    print([x for x in range(GROUP_WIDTH) if _match_empty_or_deleted(word) >> (8 * x + 7) & 1][:3])
+
+    print("\nProbe wraparound example")
+    print("------------------------")
+    # Keys homed in the last group fill it and continue in group 0
+    m = HashMap(64, hash_function_1)
+    last = m.get_capacity() // GROUP_WIDTH - 1
+    homed_last = (key for key in ('w' + str(i) for i in range(10000))
+                  if (m.get_hash(key) >> 7) & last == last)
+    keys = [next(homed_last) for _ in range(GROUP_WIDTH + 4)]
+    for key in keys:
+        m.put(key, key)
+    slots = [m._find_slot(key, m.get_hash(key)) for key in keys]
+    wrapped = [key for key, index in zip(keys, slots) if index < GROUP_WIDTH]
+    print(len(wrapped), [m.probe_length(key) for key in wrapped])
+
+    # Emptying a slot of the full last group leaves a tombstone, so the
+    # wrapped keys stay reachable, and the next key homed there reuses it
+    m.remove(keys[0])
+    print(m.tombstone_count(), all(m.get(key) == key for key in keys[1:]))
+    extra = next(homed_last)
+    m.put(extra, extra)
+    print(m.tombstone_count(), m._find_slot(extra, m.get_hash(extra)) // GROUP_WIDTH == last,
+          m.get_size(), m.get_capacity())
+
+    from hash_map_checks import print_dict_comparison
+
+    def random_map(rng):
+        return HashMap(rng.choice([3, 16, 53]), rng.choice([hash_function_1, hash_function_2]))
+
+    def counts_agree(m):
+        """Every slot is live, deleted or empty, and growth_left tracks the empty ones"""
+        return (m.empty_buckets() == m._ctrl.count(EMPTY)
+                and m.tombstone_count() == m._ctrl.count(DELETED)
+                and m._growth_left + m.get_size() + m.tombstone_count() == int(m.get_capacity() * MAX_LOAD))
+
+    print_dict_comparison(random_map, check=counts_agree)
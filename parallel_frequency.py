@@ -0,0 +1,199 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - Hashmap Implementation
+# Description: Frequency counting and find_mode across several processes,
+# as a map-reduce. Each worker counts one chunk of the input in its own
+# HashMap and splits its counts into partitions by a hash of the key. Each
+# partition is then merged by its own worker, so the reduce is spread over
+# the pool as well and the parent only combines one result per partition.
+
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from os import cpu_count
+from zlib import crc32
+
+from a6_include import DynamicArray
+from collection_utils import iter_items
+from hash_functions import get_hash_function
+from hash_map_separate_chaining import HashMap, count_frequencies
+
+
+def _partition(key: object, partitions: int) -> int:
+    """
+    Return the partition of a key. Unlike the built-in hash of a string,
+    CRC-32 is the same in every process.
+    :param key: element being counted
+    :param partitions: int of partitions
+    :return: int of partition index
+    """
+    return crc32(str(key).encode('utf-8', 'surrogatepass')) % partitions
+
+
+def _count_chunk(chunk: list, partitions: int) -> list:
+    """
+    Map step: count one chunk and split the counts by partition
+    :param chunk: list of elements
+    :param partitions: int of partitions
+    :return: list holding a list of (key, count) tuples for each partition
+    """
+    counts = count_frequencies(chunk, get_hash_function('builtin'), len(chunk) // 2)
+    split = [[] for _ in range(partitions)]
+    for pair in counts.items():
+        split[_partition(pair[0], partitions)].append(pair)
+    return split
+
+
+def _merge_partition(pair_lists: list) -> HashMap:
+    """
+    Add up the counts of one partition from every chunk
+    :param pair_lists: list of lists of (key, count) tuples
+    :return: HashMap from key to total count
+    """
+    counts = HashMap(max(len(pairs) for pairs in pair_lists), get_hash_function('builtin'))
+    for pairs in pair_lists:
+        for key, count in pairs:
+            counts.put(key, (counts.get(key) or 0) + count)
+    return counts
+
+
+def _reduce_counts(pair_lists: list) -> list:
+    """
+    Reduce step for parallel_frequencies
+    :param pair_lists: list of lists of (key, count) tuples for one partition
+    :return: list of (key, total count) tuples
+    """
+    return list(_merge_partition(pair_lists).items())
+
+
+def _reduce_mode(pair_lists: list) -> (list, int):
+    """
+    Reduce step for parallel_find_mode: only the modes of a partition
+    need to go back to the parent
+    :param pair_lists: list of lists of (key, count) tuples for one partition
+    :return: tuple of (list of modes, int of their frequency)
+    """
+    modes, mode_freq = [], 0
+    for key, count in _merge_partition(pair_lists).items():
+        if count > mode_freq:
+            modes, mode_freq = [key], count
+        elif count == mode_freq:
+            modes.append(key)
+    return modes, mode_freq
+
+
+def _map_reduce(iterable, reduce, workers: int, chunk_size: int) -> list:
+    """
+    Count every chunk, then reduce every partition that received counts
+    :param iterable: DynamicArray, list, generator or any other iterable
+    :param reduce: reduce step taking the pair lists of one partition
+    :param workers: int of processes, None for one per CPU
+    :param chunk_size: int of elements counted by each map step
+    :return: list of the reduce step's results
+    """
+    workers = workers or cpu_count() or 1
+    if workers < 1 or chunk_size < 1:
+        raise ValueError("workers and chunk_size must be at least 1")
+
+    partitions = workers
+    partition_lists = [[] for _ in range(partitions)]
+    elements = iter_items(iterable)
+
+    def collect(split: list) -> None:
+        for index, pairs in enumerate(split):
+            if pairs:
+                partition_lists[index].append(pairs)
+
+    # One worker needs no pool; this is also the serial baseline
+    if workers == 1:
+        for chunk in iter(lambda: list(islice(elements, chunk_size)), []):
+            collect(_count_chunk(chunk, partitions))
+        return [reduce(pair_lists) for pair_lists in partition_lists if pair_lists]
+
+    with ProcessPoolExecutor(workers) as pool:
+
+        # Keep only two chunks per worker in flight so a generator is never
+        # read much further ahead than the workers can count
+        pending = set()
+        for chunk in iter(lambda: list(islice(elements, chunk_size)), []):
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future.result())
+            pending.add(pool.submit(_count_chunk, chunk, partitions))
+        for future in pending:
+            collect(future.result())
+
+        # Every key lives in exactly one partition, so they reduce independently
+        return list(pool.map(reduce, [pair_lists for pair_lists in partition_lists if pair_lists]))
+
+
+def parallel_frequencies(iterable, workers: int = None, chunk_size: int = 65536) -> HashMap:
+    """
+    Count how often each element occurs, using several processes
+    :param iterable: DynamicArray, list, generator or any other iterable of
+                     picklable elements
+    :param workers: int of processes, None for one per CPU
+    :param chunk_size: int of elements counted by each map step
+    :return: HashMap from each distinct element to its count
+    """
+    results = _map_reduce(iterable, _reduce_counts, workers, chunk_size)
+
+    # Partitions share no keys, so their counts are added without lookups
+    counts = HashMap(sum(len(pairs) for pairs in results), get_hash_function('builtin'))
+    for pairs in results:
+        counts.put_many(pairs)
+    return counts
+
+
+def parallel_find_mode(iterable, workers: int = None, chunk_size: int = 65536) -> (DynamicArray, int):
+    """
+    Find mode using several processes
+    :param iterable: DynamicArray, list, generator or any other iterable of
+                     picklable elements
+    :param workers: int of processes, None for one per CPU
+    :param chunk_size: int of elements counted by each map step
+    :return: tuple consisting of (dynamic array with modes, int with their
+             frequency); the frequency is 0 for an empty iterable
+    """
+    modes, mode_freq = DynamicArray(), 0
+    for partition_modes, frequency in _map_reduce(iterable, _reduce_mode, workers, chunk_size):
+        if frequency > mode_freq:
+            modes, mode_freq = DynamicArray(partition_modes), frequency
+        elif frequency == mode_freq:
+            for key in partition_modes:
+                modes.append(key)
+    return modes, mode_freq
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    from hash_map_separate_chaining import find_mode
+
+    print("\nparallel_find_mode example")
+    print("--------------------------")
+    test_cases = (
+        ["Arch", "Manjaro", "Manjaro", "Mint", "Mint", "Mint", "Ubuntu", "Ubuntu", "Ubuntu", "Ubuntu"],
+        ["2", "4", "2", "6", "8", "4", "1", "3", "4", "5", "7", "3", "3", "2"]
+    )
+    for case in test_cases:
+        mode, frequency = parallel_find_mode(DynamicArray(case), workers=2, chunk_size=3)
+        print(f"Mode : {sorted(mode.get_at_index(i) for i in range(mode.length()))}, Frequency: {frequency}")
+
+    print("\nRandomized comparison with find_mode")
+    print("------------------------------------")
+    import random
+    from collections import Counter
+    for seed in range(10):
+        rng = random.Random(seed)
+        elements = [str(rng.randint(0, rng.choice([5, 100, 5000]))) for _ in range(rng.randint(1, 20000))]
+        workers, chunk_size = rng.choice([1, 2, 3]), rng.choice([1, 100, 65536])
+        mode, frequency = parallel_find_mode(elements, workers, chunk_size)
+        expected_mode, expected_frequency = find_mode(DynamicArray(elements))
+        result = (frequency == expected_frequency and
+                  sorted(mode.get_at_index(i) for i in range(mode.length())) ==
+                  sorted(expected_mode.get_at_index(i) for i in range(expected_mode.length())))
+        counts = parallel_frequencies(iter(elements), workers, chunk_size)
+        result &= sorted(counts.items()) == sorted(Counter(elements).items())
+        print(seed, result)
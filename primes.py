@@ -0,0 +1,124 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - Hashmap Implementation
+# Description: Prime helpers used to size both HashMaps. Table growth doubles
+# to the next prime, stepping along a precomputed ladder of such primes where
+# it can, and any other capacity is checked with a deterministic Miller-Rabin
+# test instead of trial division. shrink_capacity undoes one growth step.
+# Tables indexed by bit mask are sized with next_power_of_two instead.
+
+
+from bisect import bisect_left
+
+
+# Each prime is the smallest prime at or above twice the one before it
+PRIME_LADDER = (
+    5, 11, 23, 47, 97, 197, 397, 797, 1597, 3203, 6421, 12853, 25717,
+    51437, 102877, 205759, 411527, 823117, 1646237, 3292489, 6584983,
+    13169977, 26339969, 52679969, 105359939, 210719881, 421439783,
+    842879579, 1685759167, 3371518343, 6743036717, 13486073473,
+    26972146961, 53944293929, 107888587883, 215777175787, 431554351609,
+    863108703229, 1726217406467,
+)
+_LADDER_SET = frozenset(PRIME_LADDER)
+
+# Trial division by these catches most composites before Miller-Rabin runs
+_SMALL_PRIMES = (3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+# Testing against these bases is exact for every n < 3.3 * 10**24
+_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def is_prime(number: int) -> bool:
+    """
+    Determine if given integer is a prime number
+    :param number: int to test
+    :return: bool whether number is prime
+    """
+    if number in _LADDER_SET:
+        return True
+
+    if number < 2:
+        return False
+
+    if number % 2 == 0:
+        return number == 2
+
+    for prime in _SMALL_PRIMES:
+        if number % prime == 0:
+            return number == prime
+
+    # Write number - 1 as d * 2^s with d odd
+    d, s = number - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    for base in _WITNESSES:
+        x = pow(base, d, number)
+        if x == 1 or x == number - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % number
+            if x == number - 1:
+                break
+        else:
+            return False
+
+    return True
+
+
+def next_prime(number: int) -> int:
+    """
+    Return the smallest odd prime greater than or equal to number
+    :param number: int to start searching from
+    :return: int of prime
+    """
+    if number % 2 == 0:
+        number += 1
+
+    while not is_prime(number):
+        number += 2
+
+    return number
+
+
+def grow_capacity(capacity: int) -> int:
+    """
+    Return the capacity to grow a table to: the smallest prime that is
+    at least twice the current capacity. Capacities on the ladder step
+    to the next rung without a search.
+    :param capacity: int of current capacity
+    :return: int of prime capacity
+    """
+    index = bisect_left(PRIME_LADDER, capacity)
+    if index + 1 < len(PRIME_LADDER) and PRIME_LADDER[index] == capacity:
+        return PRIME_LADDER[index + 1]
+
+    # Off the ladder, or past its end, search from double
+    return next_prime(capacity * 2)
+
+
+def shrink_capacity(capacity: int) -> int:
+    """
+    Return the capacity to shrink a table to, the inverse of grow_capacity:
+    the rung below on the ladder, otherwise the smallest prime that is at
+    least half the current capacity
+    :param capacity: int of current capacity
+    :return: int of prime capacity
+    """
+    index = bisect_left(PRIME_LADDER, capacity)
+    if 0 < index < len(PRIME_LADDER) and PRIME_LADDER[index] == capacity:
+        return PRIME_LADDER[index - 1]
+
+    return next_prime(max(capacity // 2, 2))
+
+
+def next_power_of_two(number: int) -> int:
+    """
+    Return the smallest power of two greater than or equal to number
+    :param number: int to round up
+    :return: int power of two
+    """
+    if number <= 1:
+        return 1
+    return 1 << (number - 1).bit_length()
@@ -0,0 +1,150 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - Hashmap Implementation
+# Description: Probe sequences for the open addressing HashMap. A strategy
+# yields the slots to examine for a key, in order, starting at its home
+# slot: linear probing, quadratic probing on prime tables, triangular-number
+# quadratic probing on power-of-two tables and double hashing. Each strategy
+# also states which table sizes and load factors it supports.
+
+
+from itertools import chain
+
+from hash_functions import fibonacci_mix
+
+
+class ProbeStrategy:
+    """
+    Base class for probe sequences
+    name: str the strategy is registered under
+    power_of_two: True if the table capacity must be a power of two
+    prime: True if the table capacity must be a prime
+    max_load: highest load factor at which the sequence still finds
+              a free slot
+    """
+
+    name = None
+    power_of_two = False
+    prime = False
+    max_load = 1.0
+
+    def sequence(self, home: int, key: object, capacity: int, hashed: int = None):
+        """
+        Return the slots to examine for a key, in order
+        :param home: home index of key
+        :param key: key being probed for
+        :param capacity: int of table capacity
+        :param hashed: full hash of key the home index was taken from,
+                       cached by the HashMap
+        :return: iterable of int indices
+        """
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        """Override repr method to provide more readable output"""
+        return f"{type(self).__name__}()"
+
+
+class LinearProbing(ProbeStrategy):
+    """Examine the slots one after another: home, home + 1, home + 2, ..."""
+
+    name = 'linear'
+
+    def sequence(self, home: int, key: object, capacity: int, hashed: int = None):
+        # Neighbouring slots share cache lines, and range runs in C
+        return chain(range(home, capacity), range(home))
+
+
+class QuadraticProbing(ProbeStrategy):
+    """Examine home + j*j for j = 0, 1, 2, ... on a prime table"""
+
+    name = 'quadratic'
+    prime = True
+
+    # Only half of a prime table is reachable, so keep it at most half full
+    max_load = 0.5
+
+    def sequence(self, home: int, key: object, capacity: int, hashed: int = None):
+        # On a prime table j and capacity - j reach the same slot,
+        # so the first half of the sequence covers every reachable slot
+        for j in range((capacity + 1) // 2):
+            yield (home + j * j) % capacity
+
+
+class TriangularProbing(ProbeStrategy):
+    """Examine home + j*(j+1)/2 for j = 0, 1, 2, ... on a power-of-two table.
+    Steps of 1, 2, 3, ... visit every slot exactly once."""
+
+    name = 'triangular'
+    power_of_two = True
+
+    def sequence(self, home: int, key: object, capacity: int, hashed: int = None):
+        mask = capacity - 1
+        index = home
+        for j in range(1, capacity + 1):
+            yield index
+            index = (index + j) & mask
+
+
+class DoubleHashing(ProbeStrategy):
+    """Examine home + j*step, where a second hash of the key picks the step.
+    Keys that share a home slot usually take different paths.
+    Works on prime and power-of-two tables."""
+
+    name = 'double'
+
+    def __init__(self, function=None) -> None:
+        """
+        :param function: second hash function, which should not be the one
+                         the HashMap uses. By default the step is mixed from
+                         the key's cached hash instead, so probing costs no
+                         second hash of the key.
+        """
+        self.function = function
+
+    def sequence(self, home: int, key: object, capacity: int, hashed: int = None):
+        if capacity == 1:
+            return (home,)
+
+        # The home index comes from the low bits of the hash, or its
+        # remainder; fibonacci_mix makes the step depend on all of its bits
+        if self.function is not None or hashed is None:
+            second = (self.function or hash)(key)
+        else:
+            second = fibonacci_mix(hashed)
+
+        # Any step from 1 to capacity - 1 visits every slot of a prime table,
+        # and any odd step visits every slot of a power-of-two table
+        if capacity & (capacity - 1) == 0:
+            step = (second | 1) & (capacity - 1)
+        else:
+            step = 1 + second % (capacity - 1)
+        return (
+            (home + j * step) % capacity for j in range(capacity)
+        )
+
+    def __repr__(self) -> str:
+        """Override repr method to provide more readable output"""
+        if self.function is None:
+            return "DoubleHashing()"
+        return f"DoubleHashing({self.function.__name__})"
+
+
+# Classes building each strategy with its default arguments
+PROBE_STRATEGIES = {
+    'linear': LinearProbing,
+    'quadratic': QuadraticProbing,
+    'triangular': TriangularProbing,
+    'double': DoubleHashing,
+}
+
+
+def get_probe_strategy(name: str) -> ProbeStrategy:
+    """
+    Look up a registered probe strategy
+    :param name: str the strategy was registered under
+    :return: ProbeStrategy
+    """
+    if name not in PROBE_STRATEGIES:
+        raise KeyError(f"unknown probe strategy {name!r}, "
+                       f"choose from {', '.join(PROBE_STRATEGIES)}")
+    return PROBE_STRATEGIES[name]()